@@ -0,0 +1,9 @@
+"""python -m ai_battle で対戦を起動する
+
+実行方法:
+    python -m ai_battle                                   # メニューから対戦
+    python -m ai_battle --aivsai --rounds 10000 --quiet   # メニューなしでAI対AI
+"""
+from ai_battle.battle import run
+
+run()
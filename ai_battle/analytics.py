@@ -0,0 +1,389 @@
+"""記録した対戦の統計を、チャンクごとに NumPy で集計するモジュール
+
+対戦ログ（ai_battle.round_log の形式）や JankenBattle.history を先頭から一定のラウンド数ずつ読み、
+次の統計を1回の走査で集計する。ログはメモリマップで少しずつ読むので、メモリに載らない大きさでも扱える。
+
+    勝率の推移      window ラウンドごとの勝率と95%信頼区間（Wilson の方法）
+    手の頻度        両者の手ごとの回数
+    遷移行列        直前のラウンドの手（自分 / 相手）ごとの次の手の回数と条件付き確率
+    連続記録        勝ち・負け・引き分けがそれぞれ何ラウンド続いたかの分布と最長記録
+    予測の正解率    各AIの手が勝った割合（AIは相手の手を予測してそれに勝つ手を出すので、予測が当たった割合になる）と、
+                    直前のラウンドの手から相手の手を当てる最良の固定の予測（1次のマルコフ連鎖）の正解率
+
+各チャンクでは、両者の手を hand1 * 3 + hand2 のコード（9通り）にして、コードの回数と
+（直前のコード, コード）の回数（81通り）を np.bincount で数え、遷移行列や頻度はそこから求める。
+ラウンド番号が途切れたところ（別の対戦）をまたぐ遷移と連続記録は数えない。
+
+実行方法:
+    python -m ai_battle.analytics battle.jklg --window 100000 --json report.json --csv report.csv
+"""
+import csv
+import json
+import math
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from janken_core.hands import HANDS, OUTCOME_BY_CODE
+
+# 1回に集計するラウンド数の既定値
+CHUNK_ROUNDS = 1 << 22
+# 連続記録の分布で個別に数える最大の長さ（これより長いものはまとめて数える）
+MAX_STREAK_BIN = 64
+# 95%信頼区間の z 値
+Z95 = 1.959963984540054
+
+HAND_NAMES = tuple(hand.name.lower() for hand in HANDS)
+# コードから勝敗コードへの変換表
+_CODE_RESULT = np.array(OUTCOME_BY_CODE, dtype=np.int8)
+
+
+def wilson_interval(successes: float, trials: float, z: float = Z95) -> Tuple[float, float]:
+    """二項分布の比率の信頼区間（Wilson の方法、trials が0の場合は (0, 1)）"""
+    if trials <= 0:
+        return 0.0, 1.0
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+class MatchAnalyzer:
+    """対戦のラウンドをチャンクごとに受け取り、統計を集計するクラス"""
+
+    def __init__(self, sides: Sequence[str] = ('ai1', 'ai2'), window: int = 100_000):
+        """
+        初期化
+
+        Args:
+            sides: 1つ目と2つ目の手のプレイヤーの名前（レポートのキーに使う）
+            window: 勝率の推移を集計するラウンド数
+        """
+        if window < 1:
+            raise ValueError("window は1以上を指定してください")
+        self.sides = tuple(sides)
+        self.window = window
+        self.rounds = 0
+
+        # code = hand1 * 3 + hand2 ごとの回数と、(直前の code) * 9 + code ごとの回数
+        self._codes = np.zeros(9, dtype=np.int64)
+        self._pairs = np.zeros(81, dtype=np.int64)
+        # window ごとの勝敗コード（引き分け, 1つ目の勝ち, 2つ目の勝ち）の回数
+        self._windows: List[np.ndarray] = []
+        self._open_window = np.zeros(3, dtype=np.int64)
+        # 勝敗コードごとの連続記録の長さの分布（インデックス MAX_STREAK_BIN はそれ以上）と最長記録
+        self._streaks = np.zeros((3, MAX_STREAK_BIN + 1), dtype=np.int64)
+        self._longest = np.zeros(3, dtype=np.int64)
+
+        # 前のチャンクから続いているもの: 最後のコードとラウンド番号、終わっていない連続記録
+        self._last_code: Optional[int] = None
+        self._last_round: Optional[int] = None
+        self._run_result = -1
+        self._run_length = 0
+
+    def update(self, hand1: Any, hand2: Any, rounds: Any = None) -> None:
+        """連続したラウンドのチャンクを集計
+
+        Args:
+            hand1: 1つ目の手の配列（整数コード）
+            hand2: 2つ目の手の配列（整数コード）
+            rounds: ラウンド番号の配列（Noneの場合は前のチャンクから途切れずに続いているものとする）
+        """
+        hand1 = np.asarray(hand1, dtype=np.int8)
+        hand2 = np.asarray(hand2, dtype=np.int8)
+        self.update_codes(hand1 * np.int8(3) + hand2, rounds)
+
+    def update_codes(self, codes: Any, rounds: Any = None) -> None:
+        """hand1 * 3 + hand2 のコードのチャンクを集計（引数は update と同じ）"""
+        codes = np.asarray(codes, dtype=np.int8)
+        n = len(codes)
+        if not n:
+            return
+        if codes.min() < 0 or codes.max() > 8:
+            raise ValueError("手のコードが不正です")
+
+        # 直前のラウンドから続いていないラウンド（別の対戦の始まり）
+        breaks = np.zeros(n, dtype=bool)
+        if rounds is None:
+            breaks[0] = self._last_code is None
+            last_round = None
+        else:
+            rounds = np.asarray(rounds, dtype=np.int64)
+            breaks[0] = self._last_round is None or rounds[0] != self._last_round + 1
+            np.not_equal(rounds[1:], rounds[:-1] + 1, out=breaks[1:])
+            last_round = int(rounds[-1])
+        break_positions = np.flatnonzero(breaks)
+
+        # 頻度と遷移: 全ラウンドの (直前のコード, コード) を数え、途切れたところの分を引く
+        self._codes += np.bincount(codes, minlength=9)
+        previous = np.empty(n, dtype=np.int8)
+        previous[0] = 0 if self._last_code is None else self._last_code
+        previous[1:] = codes[:-1]
+        pairs = previous * np.int8(9) + codes
+        self._pairs += np.bincount(pairs, minlength=81)
+        if len(break_positions):
+            self._pairs -= np.bincount(pairs[break_positions], minlength=81)
+
+        results = _CODE_RESULT[codes]
+        self._count_windows(results)
+        self._count_streaks(results, breaks)
+
+        self._last_code = int(codes[-1])
+        self._last_round = last_round
+        self.rounds += n
+
+    def _count_windows(self, results: np.ndarray) -> None:
+        """window ラウンドごとの勝敗の回数を集計"""
+        window = self.window
+        filled = self.rounds % window
+        # このチャンクの各ラウンドが、まだ終わっていない window から数えて何番目の window に入るか
+        index = (np.arange(len(results), dtype=np.int64) + filled) // window
+        counts = np.bincount(index * 3 + results, minlength=3 * (int(index[-1]) + 1)).reshape(-1, 3)
+        counts[0] += self._open_window
+        if (filled + len(results)) % window:
+            self._open_window = counts[-1].copy()
+            counts = counts[:-1]
+        else:
+            self._open_window = np.zeros(3, dtype=np.int64)
+        if len(counts):
+            self._windows.append(counts)
+
+    def _count_streaks(self, results: np.ndarray, breaks: np.ndarray) -> None:
+        """勝敗が同じまま続いたラウンド数を集計（最後の連続記録は次のチャンクに持ち越す）"""
+        n = len(results)
+        starts_mask = np.empty(n, dtype=bool)
+        starts_mask[0] = True
+        np.not_equal(results[1:], results[:-1], out=starts_mask[1:])
+        starts_mask |= breaks
+        starts = np.flatnonzero(starts_mask)
+        lengths = np.diff(np.append(starts, n))
+        run_results = results[starts].astype(np.int64)
+
+        if self._run_length:
+            if not breaks[0] and results[0] == self._run_result:
+                # 前のチャンクから続いている
+                lengths[0] += self._run_length
+            else:
+                self._add_streaks(np.array([self._run_result]), np.array([self._run_length]))
+        # 最後の連続記録はまだ終わっていない
+        self._run_result = int(run_results[-1])
+        self._run_length = int(lengths[-1])
+        self._add_streaks(run_results[:-1], lengths[:-1])
+
+    def _add_streaks(self, run_results: np.ndarray, lengths: np.ndarray) -> None:
+        """終わった連続記録を分布と最長記録に加える"""
+        if not len(lengths):
+            return
+        bins = np.minimum(lengths, MAX_STREAK_BIN + 1) - 1
+        self._streaks += np.bincount(run_results * (MAX_STREAK_BIN + 1) + bins,
+                                     minlength=3 * (MAX_STREAK_BIN + 1)).reshape(3, -1)
+        for result in range(3):
+            selected = lengths[run_results == result]
+            if len(selected):
+                self._longest[result] = max(self._longest[result], int(selected.max()))
+
+    def report(self) -> Dict[str, Any]:
+        """集計結果を JSON にできる辞書で返す（集計の途中でも呼べる）"""
+        side1, side2 = self.sides
+        result_keys = ('draw', side1, side2)
+        rounds = self.rounds
+        codes = self._codes.reshape(3, 3)
+        outcomes = [int(self._codes[_CODE_RESULT == result].sum()) for result in range(3)]
+
+        # (直前のコード, コード) の回数から4種類の遷移行列を作る
+        pairs = self._pairs.reshape(3, 3, 3, 3)  # [直前の hand1, 直前の hand2, hand1, hand2]
+        transitions = {
+            f"{side1}->{side1}": pairs.sum(axis=(1, 3)),
+            f"{side1}->{side2}": pairs.sum(axis=(1, 2)),
+            f"{side2}->{side1}": pairs.sum(axis=(0, 3)),
+            f"{side2}->{side2}": pairs.sum(axis=(0, 2)),
+        }
+
+        # 終わっていない連続記録も含める（集計の状態は変えない）
+        streaks = self._streaks.copy()
+        longest = self._longest.copy()
+        if self._run_length:
+            streaks[self._run_result, min(self._run_length, MAX_STREAK_BIN + 1) - 1] += 1
+            longest[self._run_result] = max(longest[self._run_result], self._run_length)
+
+        windows = self._windows + ([self._open_window[None, :]] if self._open_window.any() else [])
+        windows = np.concatenate(windows) if windows else np.zeros((0, 3), dtype=np.int64)
+        window_rounds = windows.sum(axis=1)
+        intervals = [wilson_interval(int(wins), int(total)) for wins, total in zip(windows[:, 1], window_rounds)]
+
+        return {
+            'rounds': rounds,
+            'sides': [side1, side2],
+            'outcomes': dict(zip(result_keys, outcomes)),
+            'win_rate': {side: _rate(outcomes[result], rounds) for result, side in ((1, side1), (2, side2))},
+            'hand_frequency': {
+                side1: dict(zip(HAND_NAMES, codes.sum(axis=1).tolist())),
+                side2: dict(zip(HAND_NAMES, codes.sum(axis=0).tolist())),
+            },
+            'transitions': {name: _transition(matrix) for name, matrix in transitions.items()},
+            'streaks': {
+                key: {
+                    'longest': int(longest[result]),
+                    'count': int(streaks[result].sum()),
+                    # 連続記録の長さの合計はその勝敗のラウンド数
+                    'mean': round(outcomes[result] / int(streaks[result].sum()), 6) if streaks[result].any() else 0.0,
+                    # histogram[i] = 長さ i + 1 の回数（最後の要素は長さ MAX_STREAK_BIN + 1 以上）
+                    'histogram': _trim(streaks[result].tolist()),
+                }
+                for result, key in enumerate(result_keys)
+            },
+            'prediction_accuracy': {
+                side: {
+                    # 手が勝った割合（相手の手の予測が当たった割合）
+                    'hit_rate': round(outcomes[result] / rounds, 6) if rounds else 0.0,
+                    # 直前のラウンドの自分か相手の手から、相手の手を当てる最良の固定の予測の正解率
+                    'best_markov': max(_best_fixed_accuracy(transitions[f"{side}->{opponent}"]),
+                                       _best_fixed_accuracy(transitions[f"{opponent}->{opponent}"])),
+                }
+                for result, side, opponent in ((1, side1, side2), (2, side2, side1))
+            },
+            'windows': {
+                'size': self.window,
+                'rounds': window_rounds.tolist(),
+                'draws': windows[:, 0].tolist(),
+                f"{side1}_wins": windows[:, 1].tolist(),
+                f"{side2}_wins": windows[:, 2].tolist(),
+                f"{side1}_win_rate": [round(int(wins) / int(total), 6) if total else 0.0
+                                      for wins, total in zip(windows[:, 1], window_rounds)],
+                'ci95_low': [round(low, 6) for low, _ in intervals],
+                'ci95_high': [round(high, 6) for _, high in intervals],
+            },
+        }
+
+
+def _rate(successes: int, trials: int) -> Dict[str, Any]:
+    """比率と95%信頼区間"""
+    low, high = wilson_interval(successes, trials)
+    return {'rate': round(successes / trials, 6) if trials else 0.0, 'ci95': [round(low, 6), round(high, 6)]}
+
+
+def _transition(matrix: np.ndarray) -> Dict[str, Any]:
+    """遷移の回数（行: 直前の手, 列: 次の手）と、行ごとの条件付き確率"""
+    totals = matrix.sum(axis=1, keepdims=True)
+    probabilities = np.divide(matrix, totals, out=np.zeros(matrix.shape), where=totals > 0)
+    return {
+        'hands': list(HAND_NAMES),
+        'counts': matrix.tolist(),
+        'probabilities': np.round(probabilities, 6).tolist(),
+    }
+
+
+def _best_fixed_accuracy(matrix: np.ndarray) -> float:
+    """直前の手ごとに最も多い次の手を予測したときの正解率"""
+    total = int(matrix.sum())
+    return round(int(matrix.max(axis=1).sum()) / total, 6) if total else 0.0
+
+
+def _trim(histogram: List[int]) -> List[int]:
+    """末尾の0を取り除く"""
+    while histogram and not histogram[-1]:
+        histogram.pop()
+    return histogram
+
+
+def analyze_log(path, window: int = 100_000, chunk_rounds: int = CHUNK_ROUNDS,
+                sides: Sequence[str] = ('ai1', 'ai2')) -> Dict[str, Any]:
+    """対戦ログのファイルを集計（メモリマップから chunk_rounds ラウンドずつ読む）"""
+    from ai_battle.round_log import read_round_log
+
+    records = read_round_log(path)
+    analyzer = MatchAnalyzer(sides, window)
+    for start in range(0, len(records), chunk_rounds):
+        chunk = records[start:start + chunk_rounds]
+        analyzer.update(chunk['hand1'], chunk['hand2'], chunk['round'])
+    return analyzer.report()
+
+
+def analyze_history(history, window: int = 100_000, chunk_rounds: int = CHUNK_ROUNDS) -> Dict[str, Any]:
+    """JankenBattle.history（RoundHistory）を集計"""
+    sides = tuple(key[:-len('_hand')] if key.endswith('_hand') else key for key in history.keys)
+    analyzer = MatchAnalyzer(sides, window)
+    codes = np.frombuffer(history.packed(), dtype=np.int8)
+    for start in range(0, len(codes), chunk_rounds):
+        analyzer.update_codes(codes[start:start + chunk_rounds])
+    return analyzer.report()
+
+
+def write_json(report: Dict[str, Any], path) -> None:
+    """レポートを JSON で書き出す"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _csv_rows(report: Dict[str, Any]) -> Iterable[Tuple[str, str, Any]]:
+    """レポートを (区分, 項目, 値) の行に展開"""
+    yield 'summary', 'rounds', report['rounds']
+    for key, count in report['outcomes'].items():
+        yield 'outcomes', key, count
+    for side, rate in report['win_rate'].items():
+        yield f"win_rate.{side}", 'rate', rate['rate']
+        yield f"win_rate.{side}", 'ci95_low', rate['ci95'][0]
+        yield f"win_rate.{side}", 'ci95_high', rate['ci95'][1]
+    for side, frequency in report['hand_frequency'].items():
+        for hand, count in frequency.items():
+            yield f"hand_frequency.{side}", hand, count
+    for name, transition in report['transitions'].items():
+        hands = transition['hands']
+        for prev, row in zip(hands, transition['probabilities']):
+            for curr, probability in zip(hands, row):
+                yield f"transition.{name}", f"{prev}->{curr}", probability
+    for key, streak in report['streaks'].items():
+        for item in ('longest', 'count', 'mean'):
+            yield f"streak.{key}", item, streak[item]
+    for side, accuracy in report['prediction_accuracy'].items():
+        for item, value in accuracy.items():
+            yield f"prediction_accuracy.{side}", item, value
+    windows = report['windows']
+    columns = [column for column in windows if column != 'size']
+    for index in range(len(windows['rounds'])):
+        for column in columns:
+            yield f"window.{index}", column, windows[column][index]
+
+
+def write_csv(report: Dict[str, Any], path) -> None:
+    """レポートを section,key,value の3列の CSV で書き出す"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('section', 'key', 'value'))
+        writer.writerows(_csv_rows(report))
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="対戦ログの統計を集計")
+    parser.add_argument('path', help="対戦ログ（python -m ai_battle --log で書き出したファイル）")
+    parser.add_argument('--window', type=int, default=100_000, help="勝率の推移を集計するラウンド数")
+    parser.add_argument('--chunk-rounds', type=int, default=CHUNK_ROUNDS, help="1回に読み込むラウンド数")
+    parser.add_argument('--json', default=None, metavar='PATH', help="レポートを JSON で書き出すファイル")
+    parser.add_argument('--csv', default=None, metavar='PATH', help="レポートを CSV で書き出すファイル")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    report = analyze_log(args.path, window=args.window, chunk_rounds=args.chunk_rounds)
+    elapsed = time.perf_counter() - start
+    if args.json:
+        write_json(report, args.json)
+    if args.csv:
+        write_csv(report, args.csv)
+
+    side1, side2 = report['sides']
+    print(f"ラウンド数: {report['rounds']:,} ({elapsed:.2f}秒)")
+    for side in (side1, side2):
+        rate = report['win_rate'][side]
+        low, high = rate['ci95']
+        print(f"{side} の勝率: {rate['rate']:.4f}（95%信頼区間 {low:.4f} 〜 {high:.4f}）"
+              f" 最長連勝 {report['streaks'][side]['longest']}")
+    print(f"引き分け: {report['outcomes']['draw']:,} 最長 {report['streaks']['draw']['longest']}")
+    print(f"勝率の推移: {len(report['windows']['rounds'])}区間（{args.window:,}ラウンドごと）")
+
+
+if __name__ == "__main__":
+    main()
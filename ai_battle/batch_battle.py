@@ -0,0 +1,247 @@
+"""ベイズAI vs パターンAI の対戦を多数まとめて NumPy の配列演算で進めるエンジン
+
+ゲームごとの状態（ベイズAIの3x3の重み・減衰のリングバッファ・直前の手、パターンAIの表の位置）を
+ゲーム数 B の配列で持ち、1ラウンドを全ゲームまとめて1ステップで進める（BatchJankenAI / BatchPatternAI）。
+
+乱数の使い方は2通り。
+
+    seeds を指定した場合
+        ゲームごとに JankenBattle(seed=seed) と同じ random.Random を作り、ランダムに手を選ぶゲームだけ
+        その乱数生成器から選ぶ。JankenBattle.play_round と1手ずつ同じ手になる（verify で確認できる）
+    seeds を省略した場合
+        全ゲームで1つの numpy.random.Generator を使う。ゲームごとの乱数生成器を持たないので、
+        数百万ゲームでもメモリに収まり速い（結果の分布は同じだが、JankenBattle と手は一致しない）
+
+実行方法:
+    python -m ai_battle.batch_battle --games 1000000 --rounds 1000 --workers 8
+    python -m ai_battle.batch_battle --verify 200 --rounds 2000   # JankenBattle と同じ手になるかを確認
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bayesian_ai.batch_ai import BatchJankenAI
+from janken_core.hands import HANDS
+from janken_core.rng import derive_seed, make_rng
+from pattern_ai.batch_ai import BatchPatternAI
+
+# 勝敗コード（ベイズAIから見た結果）をパターンAIから見た結果に変換
+_REVERSED_OUTCOME = np.array([0, 2, 1], dtype=np.int64)
+
+
+def _seeded_chooser(seeds: Sequence[int], key: str):
+    """ゲームごとに JankenBattle.reseed と同じ乱数生成器を作り、指定したゲームの手を選ぶ関数を返す"""
+    choices = [make_rng(seed, key).choice for seed in seeds]
+
+    def random_hands(missing):
+        return np.array([choices[game](HANDS) for game in np.flatnonzero(missing)], dtype=np.int8)
+    return random_hands
+
+
+class BatchBattle:
+    """ベイズAI（ai1）とパターンAI（ai2）の対戦を多数まとめて進めるクラス"""
+
+    def __init__(self, n_games: Optional[int] = None, seeds: Optional[Sequence[int]] = None,
+                 rng: Any = None, max_history: int = 30, decay_start: int = 20,
+                 schedule: str = 'linear', decay_rate: Optional[float] = None, patterns: Any = None):
+        """
+        初期化
+
+        Args:
+            n_games: 同時に対戦するゲーム数（seeds を指定した場合は省略できる）
+            seeds: ゲームごとのマスターシード（JankenBattle(seed=...) と同じ手にする場合）
+            rng: seeds を省略したときに使う numpy.random.Generator（省略時は新規作成）
+            max_history, decay_start, schedule, decay_rate: ベイズAIの設定（JankenAI と同じ）
+            patterns: パターンAIのパターン（PatternJankenAI と同じ）
+        """
+        if seeds is not None:
+            n_games = len(seeds)
+        if not n_games:
+            raise ValueError("n_games か seeds を指定してください")
+        self.n_games = n_games
+        rng = rng if rng is not None else np.random.default_rng()
+
+        self.ai1 = BatchJankenAI(n_games, max_history=max_history, decay_start=decay_start, rng=rng,
+                                 schedule=schedule, decay_rate=decay_rate)
+        self.ai2 = BatchPatternAI(n_games, patterns=patterns, rng=rng)
+        if seeds is not None:
+            self._random1 = _seeded_chooser(seeds, 'ai1')
+            self._random2 = _seeded_chooser(seeds, 'ai2')
+        else:
+            self._random1 = self._random2 = None
+
+        # ゲームごとの勝敗数（列は勝敗コード: 引き分け, ai1の勝ち, ai2の勝ち）
+        self.counts = np.zeros((n_games, 3), dtype=np.int64)
+        self._offsets = np.arange(n_games, dtype=np.int64) * 3
+        self.rounds_played = 0
+
+    def step(self):
+        """全ゲームを1ラウンド進める
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: 各ゲームの ai1 と ai2 の手
+        """
+        hand1 = self.ai1.predict(self._random1)
+        hand2 = self.ai2.choose(self._random2)
+        outcome = (hand2.astype(np.int64) - hand1) % 3
+        self.counts.reshape(-1)[self._offsets + outcome] += 1
+
+        self.ai1.observe(hand1, hand2)
+        self.ai2.observe(hand2, _REVERSED_OUTCOME[outcome])
+        self.rounds_played += 1
+        return hand1, hand2
+
+    def run(self, n_rounds: int) -> Dict[str, int]:
+        """全ゲームを n_rounds ラウンド進めて、全ゲームの合計のスコアを返す"""
+        for _ in range(n_rounds):
+            self.step()
+        return self.scores()
+
+    def scores(self) -> Dict[str, int]:
+        """全ゲームの合計のスコア（JankenBattle.scores と同じキー）"""
+        draw, ai1, ai2 = (int(total) for total in self.counts.sum(axis=0))
+        return {'ai1': ai1, 'ai2': ai2, 'draw': draw}
+
+
+def _run_batch(index: int, size: int, n_rounds: int, seed: Optional[int],
+               options: Dict[str, Any]) -> Tuple[np.ndarray, float, float]:
+    """1つのバッチを対戦させる（ワーカープロセスで実行）
+
+    Returns:
+        Tuple[勝敗コードごとの合計, ゲームごとのベイズAIの勝率の合計, 勝率の2乗の合計]
+    """
+    rng = np.random.default_rng(None if seed is None else derive_seed(seed, 'batch', index))
+    battle = BatchBattle(size, rng=rng, **options)
+    battle.run(n_rounds)
+    # 0ラウンドの場合は勝率を0とする（tournament と同じ）
+    rates = battle.counts[:, 1] / n_rounds if n_rounds else np.zeros(size)
+    return battle.counts.sum(axis=0), float(rates.sum()), float((rates * rates).sum())
+
+
+def simulate_matchup(n_games: int, n_rounds: int, batch_games: int = 4096,
+                     seed: Optional[int] = None, workers: Optional[int] = 1, **options) -> Dict[str, Any]:
+    """ベイズAI vs パターンAI を n_games ゲーム対戦させ、ベイズAIの勝率と95%信頼区間を返す
+
+    batch_games ゲームずつ対戦させる（配列が CPU のキャッシュに収まる数千ゲームが最も速い）。
+    バッチごとの乱数はマスターシードとバッチの番号から導出するため、ワーカー数によらず結果は同じになる。
+    ゲームは独立なので、信頼区間はゲームごとの勝率の平均の標準誤差から求める。
+
+    Args:
+        n_games: ゲーム数
+        n_rounds: 1ゲームのラウンド数
+        batch_games: 同時に対戦させるゲーム数
+        seed: マスターシード
+        workers: ワーカープロセス数（Noneの場合はCPUコア数、1の場合はこのプロセスで実行）
+        **options: BatchBattle に渡すAIの設定
+    """
+    sizes = [min(batch_games, n_games - first) for first in range(0, n_games, batch_games)]
+    tasks = [(index, size, n_rounds, seed, options) for index, size in enumerate(sizes)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        results = [_run_batch(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            results = list(executor.map(_run_batch, *zip(*tasks)))
+
+    totals = sum(result[0] for result in results)
+    rate_sum = sum(result[1] for result in results)
+    rate_square_sum = sum(result[2] for result in results)
+    mean = rate_sum / n_games
+    variance = max(0.0, rate_square_sum / n_games - mean * mean) * n_games / max(1, n_games - 1)
+    margin = 1.96 * math.sqrt(variance / n_games)
+    return {
+        'games': n_games,
+        'rounds': n_games * n_rounds,
+        'scores': {'ai1': int(totals[1]), 'ai2': int(totals[2]), 'draw': int(totals[0])},
+        'win_rate': mean,
+        'ci95': (mean - margin, mean + margin),
+    }
+
+
+def verify(seeds: Sequence[int], n_rounds: int, **options) -> List[int]:
+    """JankenBattle.play_round と1手ずつ同じ手になるかを確認し、一致しなかったシードのリストを返す
+
+    Args:
+        seeds: 確認するマスターシード（ゲームごとに1つ）
+        n_rounds: 対戦するラウンド数
+        **options: BatchBattle に渡すAIの設定
+    """
+    from ai_battle.battle import JankenBattle
+    from bayesian_ai.janken_ai import JankenAI
+    from pattern_ai.janken_ai import PatternJankenAI
+
+    bayesian_options = {key: options[key] for key in ('max_history', 'decay_start', 'schedule', 'decay_rate')
+                        if key in options}
+    bayesian_options.setdefault('max_history', 30)
+    bayesian_options.setdefault('decay_start', 20)
+
+    batch = BatchBattle(seeds=seeds, **options)
+    batch_hands = np.empty((len(seeds), n_rounds, 2), dtype=np.int8)
+    for round_index in range(n_rounds):
+        batch_hands[:, round_index, 0], batch_hands[:, round_index, 1] = batch.step()
+
+    mismatched = []
+    for game, seed in enumerate(seeds):
+        battle = JankenBattle(mode='aivsai', ai1=JankenAI(**bayesian_options),
+                              ai2=PatternJankenAI(patterns=options.get('patterns')),
+                              keep_history=False, seed=seed)
+        hands = [battle.play_round()[1:] for _ in range(n_rounds)]
+        if not np.array_equal(np.array(hands, dtype=np.int8), batch_hands[game]):
+            mismatched.append(seed)
+    return mismatched
+
+
+def main(argv=None):
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="ベイズAI vs パターンAI の対戦を多数まとめて実行")
+    parser.add_argument('--games', type=int, default=100_000, help="ゲーム数")
+    parser.add_argument('--rounds', type=int, default=1_000, help="1ゲームのラウンド数")
+    parser.add_argument('--batch', type=int, default=4096, help="同時に対戦させるゲーム数")
+    parser.add_argument('--workers', type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument('--seed', type=int, default=None, help="マスターシード")
+    parser.add_argument('--bayesian', default='30:20', metavar='MAX_HISTORY:DECAY_START',
+                        help="ベイズAIの設定")
+    parser.add_argument('--schedule', default='linear', help="ベイズAIの減衰スケジュール")
+    parser.add_argument('--patterns', default=None,
+                        help="パターンAIのパターン（登録された名前、または {\"win\": \"210\"} のような JSON）")
+    parser.add_argument('--verify', type=int, default=None, metavar='N',
+                        help="シード 0〜N-1 で JankenBattle と同じ手になるかを確認する")
+    args = parser.parse_args(argv)
+
+    max_history, decay_start = (int(value) for value in args.bayesian.split(':'))
+    patterns = args.patterns
+    if patterns is not None and patterns.lstrip().startswith('{'):
+        patterns = json.loads(patterns)
+    options = {'max_history': max_history, 'decay_start': decay_start,
+               'schedule': args.schedule, 'patterns': patterns}
+
+    start = time.perf_counter()
+    if args.verify is not None:
+        mismatched = verify(range(args.verify), args.rounds, **options)
+        elapsed = time.perf_counter() - start
+        if mismatched:
+            print(f"一致しませんでした: シード {mismatched[:10]} など {len(mismatched)}件")
+            raise SystemExit(1)
+        print(f"{args.verify}ゲーム × {args.rounds}ラウンドで JankenBattle と同じ手になりました ({elapsed:.2f}秒)")
+        return
+
+    result = simulate_matchup(args.games, args.rounds, batch_games=args.batch, seed=args.seed,
+                              workers=args.workers, **options)
+    elapsed = time.perf_counter() - start
+    scores = result['scores']
+    low, high = result['ci95']
+    print(f"{result['games']:,}ゲーム × {args.rounds:,}ラウンド: "
+          f"ベイズAI {scores['ai1']:,}勝 パターンAI {scores['ai2']:,}勝 引き分け {scores['draw']:,}")
+    print(f"ベイズAIの勝率: {result['win_rate']:.6f}（95%信頼区間 {low:.6f} 〜 {high:.6f}）")
+    if elapsed > 0:
+        print(f"速度: {result['rounds'] / elapsed:,.0f} ラウンド/秒 ({elapsed:.2f}秒)")
+
+
+if __name__ == "__main__":
+    main()
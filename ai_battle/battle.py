@@ -1,53 +1,108 @@
-import random
-import argparse
-import sys
-from pathlib import Path
-from typing import Optional, Tuple, Dict, Any
+import time
+from array import array
+from time import perf_counter_ns
+from typing import TYPE_CHECKING, Optional, Tuple, Dict, Any
 
-# 親ディレクトリをパスに追加
-project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+if __name__ == "__main__" and not __package__:
+    # エディタの実行ボタンなどで battle.py を直接実行したときだけ、プロジェクトのルートをパスに追加
+    # （python -m ai_battle やインストールしたコマンドから起動した場合は何もしない）
+    import os
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-try:
-    from bayesian_ai.janken_ai import JankenAI as BayesianAI
-    from pattern_ai.janken_ai import PatternJankenAI as PatternAI
-except ImportError as e:
-    print(f"エラー: 必要なモジュールのインポートに失敗しました: {e}")
-    print("プロジェクトのルートディレクトリが正しく設定されているか確認してください。")
-    sys.exit(1)
+from ai_battle.history import RoundHistory
+from ai_battle.instrumentation import BattleStats, allocated_blocks
+from janken_core.hands import INPUT_TO_HAND, OUTCOME, OUTCOME_BY_CODE, hand_label
+from janken_core.rng import derive_seed
+from janken_core.strategy import resolve_strategy, strategy_name
+
+if TYPE_CHECKING:
+    import argparse
+
+# 名前でAIを指定したときの既定の設定
+DEFAULT_STRATEGY_OPTIONS = {
+    'bayesian': {'max_history': 30, 'decay_start': 20},
+}
+
+# 勝敗コード（1つ目の手から見た結果）を2つ目の手から見た結果に変換
+REVERSED_OUTCOME = (0, 2, 1)
 
 class JankenBattle:
-    def __init__(self, mode: str = 'aivsai', player_ai: str = 'pattern'):
+    def __init__(self, mode: str = 'aivsai', player_ai: str = 'pattern',
+                 ai1: Any = None, ai2: Any = None,
+                 history_limit: Optional[int] = None, keep_history: bool = True,
+                 round_log: Any = None, seed: Optional[int] = None,
+                 stats: Optional[BattleStats] = None):
         """じゃんけんバトルを初期化
         
         Args:
             mode: 対戦モード ('aivsai' または 'playervsai')
-            player_ai: プレイヤーが対戦するAI ('bayesian' または 'pattern')
+            player_ai: プレイヤーが対戦するAI ('bayesian' や 'pattern' などの戦略の名前)
+            ai1: AI vs AI モードで使うAI1（戦略の名前またはインスタンス、省略時はベイズAI）
+            ai2: AI vs AI モードで使うAI2（戦略の名前またはインスタンス、省略時はパターンAI）
+            history_limit: 履歴に残す直近のラウンド数（Noneの場合は全ラウンド）
+            keep_history: Falseの場合は各ラウンドの履歴を残さずスコアだけを集計
+            round_log: 各ラウンドを書き出すログ（RoundLogWriter など、Noneの場合は書き出さない）
+            seed: マスターシード（指定した場合、各AIの乱数生成器をここから導出したシードで初期化する）
+            stats: フェーズごとの時間などを記録する BattleStats（指定した場合だけ計測つきで対戦する）
         """
         self.rounds_played = 0
         self.mode = mode
         self.player_ai = player_ai
         
-        # AIを初期化
-        self.bayesian_ai = BayesianAI(max_history=30, decay_start=20)
-        self.pattern_ai = PatternAI()
-        
-        # 対戦モードに応じてAIを設定
+        # 対戦モードに応じてAIを設定（レジストリからの解決はここで一度だけ行う）
         if mode == 'aivsai':
-            self.ai1 = self.bayesian_ai
-            self.ai2 = self.pattern_ai
+            self.ai1 = self._resolve(ai1 if ai1 is not None else 'bayesian')
+            self.ai2 = self._resolve(ai2 if ai2 is not None else 'pattern')
         else:  # playervsai
-            if player_ai == 'bayesian':
-                self.ai1 = self.pattern_ai  # プレイヤーは常にai1、対戦AIはai2
-                self.ai2 = self.bayesian_ai
-            else:
-                self.ai1 = self.bayesian_ai
-                self.ai2 = self.pattern_ai
+            self.ai1 = None  # プレイヤーは常にai1、対戦AIはai2
+            self.ai2 = self._resolve(player_ai)
+        
+        # 毎ラウンド呼ぶメソッドは束縛済みのものを保持しておく
+        self._choose1 = self.ai1.choose if self.ai1 is not None else self.get_player_hand
+        self._observe1 = self.ai1.observe if self.ai1 is not None else None
+        self._choose2 = self.ai2.choose
+        self._observe2 = self.ai2.observe
         
         self.scores = {'player': 0, 'ai': 0, 'draw': 0} if mode == 'playervsai' else {'ai1': 0, 'ai2': 0, 'draw': 0}
-        self.history = []
+        # 勝敗コード（引き分け, 1つ目の手の勝ち, 2つ目の手の勝ち）から結果への対応
+        self._result_names = ('draw', 'player', 'ai') if mode == 'playervsai' else ('draw', 'ai1', 'ai2')
+        # 履歴は1ラウンド1バイトで保持し、参照時に辞書として返す
+        history_keys = ('player_hand', 'ai_hand') if mode == 'playervsai' else ('ai1_hand', 'ai2_hand')
+        self.history = RoundHistory(history_keys, self._result_names,
+                                    max_rounds=history_limit, keep_rounds=keep_history)
+        self.round_log = round_log
+        self.stats = stats
+        
+        if seed is not None:
+            self.reseed(seed)
+    
+    def reseed(self, seed: int) -> None:
+        """マスターシードから各AIのシードを導出して乱数生成器を初期化し直す
+        
+        AIごとに別の乱数列になり、同じマスターシードならどのプロセスで実行しても同じ結果になる
+        （seed メソッドを持たないAIはそのまま）
+        
+        Args:
+            seed: マスターシード
+        """
+        for key, ai in (('ai1', self.ai1), ('ai2', self.ai2)):
+            if ai is not None and callable(getattr(ai, 'seed', None)):
+                ai.seed(derive_seed(seed, key))
+    
+    @staticmethod
+    def _resolve(spec: Any):
+        """戦略の名前またはインスタンスから対戦に使うAIを決める"""
+        if isinstance(spec, str):
+            return resolve_strategy(spec, **DEFAULT_STRATEGY_OPTIONS.get(spec, {}))
+        return resolve_strategy(spec)
+    
+    @property
+    def ai_name(self) -> str:
+        """プレイヤー vs AI モードの対戦AIの表示名"""
+        return strategy_name(self.ai2)
     
-    def judge(self, hand1: str, hand2: str) -> str:
+    def judge(self, hand1: int, hand2: int) -> str:
         """勝敗を判定
         
         Args:
@@ -57,56 +112,9 @@ class JankenBattle:
         Returns:
             str: 勝敗結果 ('player', 'ai', 'draw' または 'ai1', 'ai2', 'draw')
         """
-        # 絵文字を除いた部分で比較
-        hand1_plain = hand1.split()[-1]
-        hand2_plain = hand2.split()[-1]
-        
-        if hand1_plain == hand2_plain:
-            return 'draw'
-            
-        if (hand1_plain == 'グー' and hand2_plain == 'チョキ') or \
-           (hand1_plain == 'チョキ' and hand2_plain == 'パー') or \
-           (hand1_plain == 'パー' and hand2_plain == 'グー'):
-            return 'player' if self.mode == 'playervsai' else 'ai1'
-        else:
-            return 'ai' if self.mode == 'playervsai' else 'ai2'
+        return self._result_names[OUTCOME[hand1][hand2]]
     
-    def play_round(self):
-        """1ラウンド対戦"""
-        # AI1（ベイズ推論）の手を予測
-        ai1_hand = self.ai1.predict_next_hand()
-        
-        # AI2（パターン認識）の手を予測
-        ai2_hand = self.ai2.get_next_hand()
-        
-        # 勝敗を判定
-        result = self.judge(ai1_hand, ai2_hand)
-        
-        # スコアを更新
-        self.scores[result] += 1
-        
-        # 履歴に記録
-        self.history.append({
-            'ai1_hand': ai1_hand,
-            'ai2_hand': ai2_hand,
-            'result': result
-        })
-        
-        # AIに結果を学習させる
-        self.ai1.update_model(ai2_hand)  # AI1はAI2の手を学習
-        self.ai2.last_hand = ai2_hand    # AI2は自分の手を記録
-        
-        # 勝敗に応じてAI2のシーケンスを更新
-        if result == 'ai1':
-            self.ai2.update_sequence('lose')
-        elif result == 'ai2':
-            self.ai2.update_sequence('win')
-        else:
-            self.ai2.update_sequence('draw')
-        
-        return result, ai1_hand, ai2_hand
-    
-    def print_result(self, round_num: int, result: str, hand1: str, hand2: str) -> None:
+    def print_result(self, round_num: int, result: str, hand1: int, hand2: int) -> None:
         """結果を表示
         
         Args:
@@ -118,9 +126,9 @@ class JankenBattle:
         print(f"\n--- ラウンド {round_num} ---")
         
         if self.mode == 'playervsai':
-            print(f"あなた: {hand1}")
-            ai_name = "ベイズAI" if self.player_ai == 'bayesian' else "パターンAI"
-            print(f"{ai_name}: {hand2}")
+            print(f"あなた: {hand_label(hand1)}")
+            ai_name = self.ai_name
+            print(f"{ai_name}: {hand_label(hand2)}")
             
             if result == 'draw':
                 print("結果: 引き分け")
@@ -129,13 +137,14 @@ class JankenBattle:
             else:
                 print(f"結果: {ai_name}の勝ち！")
         else:  # AI vs AIモード
-            print(f"ベイズAI: {hand1 if hasattr(self.ai1, 'predict_next_hand') else hand2}")
-            print(f"パターンAI: {hand2 if hasattr(self.ai2, 'get_next_hand') else hand1}")
+            ai1_name, ai2_name = strategy_name(self.ai1), strategy_name(self.ai2)
+            print(f"{ai1_name}: {hand_label(hand1)}")
+            print(f"{ai2_name}: {hand_label(hand2)}")
             
             if result == 'draw':
                 print("結果: 引き分け")
             else:
-                winner = "ベイズAI" if result == 'ai1' else "パターンAI"
+                winner = ai1_name if result == 'ai1' else ai2_name
                 print(f"結果: {winner}の勝ち！")
     
     def print_summary(self) -> None:
@@ -144,7 +153,7 @@ class JankenBattle:
         print(f"総ラウンド数: {self.rounds_played}")
         
         if self.mode == 'playervsai':
-            ai_name = "ベイズAI" if self.player_ai == 'bayesian' else "パターンAI"
+            ai_name = self.ai_name
             print(f"あなたの勝利: {self.scores['player']}回")
             print(f"{ai_name}の勝利: {self.scores['ai']}回")
             print(f"引き分け: {self.scores['draw']}回")
@@ -156,22 +165,23 @@ class JankenBattle:
             else:
                 print("\n🤝 現在は引き分けです")
         else:  # AI vs AIモード
-            print(f"ベイズAIの勝利: {self.scores['ai1']}回")
-            print(f"パターンAIの勝利: {self.scores['ai2']}回")
+            ai1_name, ai2_name = strategy_name(self.ai1), strategy_name(self.ai2)
+            print(f"{ai1_name}の勝利: {self.scores['ai1']}回")
+            print(f"{ai2_name}の勝利: {self.scores['ai2']}回")
             print(f"引き分け: {self.scores['draw']}回")
             
             if self.scores['ai1'] > self.scores['ai2']:
-                print("\n🎉 現在のリーダー: ベイズAI")
+                print(f"\n🎉 現在のリーダー: {ai1_name}")
             elif self.scores['ai2'] > self.scores['ai1']:
-                print("\n🎉 現在のリーダー: パターンAI")
+                print(f"\n🎉 現在のリーダー: {ai2_name}")
             else:
                 print("\n🤝 現在は引き分けです")
     
-    def get_player_hand(self) -> str:
+    def get_player_hand(self) -> Optional[int]:
         """プレイヤーの手を取得
         
         Returns:
-            str: プレイヤーの手、またはNone（中断時）
+            int: プレイヤーの手、またはNone（中断時）
         """
         while True:
             print("\n手を選んでください:")
@@ -184,112 +194,176 @@ class JankenBattle:
             if choice == '0':
                 return None  # 中断を表す
                 
-            if choice in ['1', '2', '3']:
-                hands = {
-                    '1': '✊ グー',
-                    '2': '✌️ チョキ',
-                    '3': '✋ パー'
-                }
-                return hands[choice]
+            if choice in INPUT_TO_HAND:
+                return INPUT_TO_HAND[choice]
                 
             print("無効な入力です。0から3の数字を入力してください。")
 
-    def play_round(self) -> Tuple[str, str, str]:
+    def play_round(self) -> Tuple[str, int, int]:
         """1ラウンド対戦して結果を返す
         
         Returns:
             Tuple[result, hand1, hand2]: 勝敗結果と両者の手
             or None: プレイヤーが中断を選択した場合
         """
-        if self.mode == 'playervsai':
-            # プレイヤー vs AIモード
-            player_hand = self.get_player_hand()
-            if player_hand is None:  # プレイヤーが中断を選択
-                return None, None, None
-                
-            ai_hand = self.ai2.get_next_hand() if hasattr(self.ai2, 'get_next_hand') else self.ai2.predict_next_hand()
-            
-            # 勝敗を判定
-            result = self.judge(player_hand, ai_hand)
-            
-            # スコアを更新
-            self.scores[result] += 1
-            self.rounds_played += 1
-            
-            # 履歴に記録
-            self.history.append({
-                'player_hand': player_hand,
-                'ai_hand': ai_hand,
-                'result': result
-            })
-            
-            # AIに結果を学習させる
-            if hasattr(self.ai2, 'update_model'):
-                self.ai2.update_model(player_hand)
-            if hasattr(self.ai2, 'last_hand'):
-                self.ai2.last_hand = ai_hand
-            
-            # 勝敗に応じてAIのシーケンスを更新
-            if hasattr(self.ai2, 'update_sequence'):
-                if result == 'player':
-                    self.ai2.update_sequence('lose')
-                elif result == 'ai':
-                    self.ai2.update_sequence('win')
-                else:
-                    self.ai2.update_sequence('draw')
-            
-            return result, player_hand, ai_hand
-            
-        else:  # AI vs AIモード
-            # AI1の手を予測
-            ai1_hand = self.ai1.predict_next_hand() if hasattr(self.ai1, 'predict_next_hand') else self.ai1.get_next_hand()
-            
-            # AI2の手を予測
-            ai2_hand = self.ai2.get_next_hand() if hasattr(self.ai2, 'get_next_hand') else self.ai2.predict_next_hand()
-            
-            # 勝敗を判定
-            result = self.judge(ai1_hand, ai2_hand)
-            
-            # スコアを更新
-            self.scores[result] += 1
-            self.rounds_played += 1
+        if self.stats is not None:
+            return self._play_round_timed()
+        
+        # 1つ目の手（プレイヤーまたはAI1）
+        hand1 = self._choose1()
+        if hand1 is None:  # プレイヤーが中断を選択
+            return None, None, None
+        return self.play_hand(hand1)
+    
+    def play_hand(self, hand1: int) -> Tuple[str, int, int]:
+        """1つ目の手（プレイヤーの手など）を指定して1ラウンド対戦
+        
+        Args:
+            hand1: 1つ目の手（整数コード）
             
-            # 履歴に記録
-            self.history.append({
-                'ai1_hand': ai1_hand,
-                'ai2_hand': ai2_hand,
-                'result': result
-            })
+        Returns:
+            Tuple[result, hand1, hand2]: 勝敗結果と両者の手
+        """
+        if self.stats is not None:
+            return self._play_hand_timed(hand1, 0)
+        
+        # 2つ目の手（AI2）
+        hand2 = self._choose2()
+        
+        # 勝敗を判定
+        outcome = OUTCOME[hand1][hand2]
+        result = self._result_names[outcome]
+        
+        # スコアを更新
+        self.scores[result] += 1
+        self.rounds_played += 1
+        
+        # 履歴に記録
+        self.history.append(hand1, hand2)
+        if self.round_log is not None:
+            self.round_log.write(self.rounds_played, hand1, hand2)
+        
+        # AIに結果を学習させる
+        if self._observe1 is not None:
+            self._observe1(hand1, hand2, outcome)
+        self._observe2(hand2, hand1, REVERSED_OUTCOME[outcome])
+        
+        return result, hand1, hand2
+    
+    def _play_round_timed(self) -> Tuple[str, int, int]:
+        """play_round の計測つき版（プレイヤーの入力を待つ時間は choose に含めない）"""
+        start = perf_counter_ns()
+        hand1 = self._choose1()
+        if hand1 is None:
+            return None, None, None
+        choose_ns = perf_counter_ns() - start if self.ai1 is not None else 0
+        return self._play_hand_timed(hand1, choose_ns)
+    
+    def _play_hand_timed(self, hand1: int, choose_ns: int) -> Tuple[str, int, int]:
+        """play_hand の計測つき版（各フェーズの時間とメモリブロック数の増減を stats に記録）
+        
+        Args:
+            hand1: 1つ目の手（整数コード）
+            choose_ns: 1つ目の手を選ぶのにかかった時間（ナノ秒）
+        """
+        stats = self.stats
+        t0 = perf_counter_ns()
+        blocks = allocated_blocks()
+        hand2 = self._choose2()
+        t1 = perf_counter_ns()
+        
+        outcome = OUTCOME[hand1][hand2]
+        result = self._result_names[outcome]
+        self.scores[result] += 1
+        self.rounds_played += 1
+        t2 = perf_counter_ns()
+        
+        self.history.append(hand1, hand2)
+        if self.round_log is not None:
+            self.round_log.write(self.rounds_played, hand1, hand2)
+        t3 = perf_counter_ns()
+        
+        if self._observe1 is not None:
+            self._observe1(hand1, hand2, outcome)
+        self._observe2(hand2, hand1, REVERSED_OUTCOME[outcome])
+        blocks = allocated_blocks() - blocks
+        t4 = perf_counter_ns()
+        
+        stats.record(choose_ns + t1 - t0, t2 - t1, t3 - t2, t4 - t3, blocks)
+        if self.rounds_played % stats.sample_every == 0:
+            stats.sample_models(self)
+        return result, hand1, hand2
+
+    def simulate(self, n_rounds: int, seed: Optional[int] = None) -> Dict[str, int]:
+        """AI vs AI の対戦を入出力なしでまとめて実行
+        
+        両者の手は一定ラウンドごとにまとめて履歴に記録する（keep_history=False の場合はラウンド数だけを数える）
+        round_log が設定されている場合は、同じまとまりごとにログにも書き出す
+        
+        Args:
+            n_rounds: 対戦するラウンド数
+            seed: マスターシード（指定した場合は reseed してから対戦する）
             
-            # AIに結果を学習させる
-            if hasattr(self.ai1, 'update_model'):
-                self.ai1.update_model(ai2_hand)
-            if hasattr(self.ai2, 'update_model'):
-                self.ai2.update_model(ai1_hand)
+        Returns:
+            Dict[str, int]: 対戦後のスコア
+        """
+        if self.mode != 'aivsai':
+            raise ValueError("simulate は AI vs AI モードでのみ使用できます")
+        
+        if seed is not None:
+            self.reseed(seed)
+        
+        if self.stats is not None:
+            # 計測する場合は1ラウンドずつ対戦する（乱数の使い方は同じなので結果も同じ）
+            for _ in range(n_rounds):
+                self._play_round_timed()
+            return dict(self.scores)
+        
+        choose1, choose2 = self._choose1, self._choose2
+        observe1, observe2 = self._observe1, self._observe2
+        reversed_outcome = REVERSED_OUTCOME
+        
+        # 履歴に残すかログに書き出す場合は hand1 * 3 + hand2 のコードをブロック単位で溜める
+        round_log = self.round_log
+        history = self.history
+        keep_rounds = history.keep_rounds
+        log_codes = array('b')
+        log_code = log_codes.append if round_log is not None or keep_rounds else None
+        if round_log is not None:
+            block_size = getattr(round_log, 'flush_every', 65536)
+        else:
+            block_size = 65536 if keep_rounds else n_rounds
+        
+        outcome_counts = [0, 0, 0]
+        played = 0
+        while played < n_rounds:
+            block = min(n_rounds - played, block_size)
+            for _ in range(block):
+                ai1_hand = choose1()
+                ai2_hand = choose2()
+                code = ai1_hand * 3 + ai2_hand
+                outcome = OUTCOME_BY_CODE[code]
+                outcome_counts[outcome] += 1
+                if log_code is not None:
+                    log_code(code)
                 
-            if hasattr(self.ai1, 'last_hand'):
-                self.ai1.last_hand = ai1_hand
-            if hasattr(self.ai2, 'last_hand'):
-                self.ai2.last_hand = ai2_hand
+                observe1(ai1_hand, ai2_hand, outcome)
+                observe2(ai2_hand, ai1_hand, reversed_outcome[outcome])
             
-            # 勝敗に応じてAIのシーケンスを更新
-            if hasattr(self.ai1, 'update_sequence'):
-                if result == 'ai1':
-                    self.ai1.update_sequence('win')
-                elif result == 'ai2':
-                    self.ai1.update_sequence('lose')
-                else:
-                    self.ai1.update_sequence('draw')
-                    
-            if hasattr(self.ai2, 'update_sequence'):
-                if result == 'ai2':
-                    self.ai2.update_sequence('win')
-                elif result == 'ai1':
-                    self.ai2.update_sequence('lose')
-                else:
-                    self.ai2.update_sequence('draw')
-            
-            return result, ai1_hand, ai2_hand
+            if round_log is not None:
+                round_log.write_codes(self.rounds_played + played + 1, log_codes)
+            if keep_rounds:
+                history.extend_codes(log_codes)
+            del log_codes[:]
+            played += block
+        
+        if not keep_rounds:
+            history.total_rounds += n_rounds
+        for outcome, count in enumerate(outcome_counts):
+            self.scores[self._result_names[outcome]] += count
+        self.rounds_played += n_rounds
+        
+        return dict(self.scores)
 
 def print_main_menu() -> str:
     """メインメニューを表示"""
@@ -366,11 +440,18 @@ def battle_loop(battle, mode: str) -> None:
         if choice == '1':  # 10回連続対戦
             for _ in range(10):
                 result, hand1, hand2 = battle.play_round()
+                # プレイヤーが中断を選択した場合はメニューに戻る
+                if result is None:
+                    print("\n対戦を中断します。")
+                    break
                 battle.print_result(battle.rounds_played, result, hand1, hand2)
             
         elif choice == '2':  # 1回ずつ対戦
             result, hand1, hand2 = battle.play_round()
-            battle.print_result(battle.rounds_played, result, hand1, hand2)
+            if result is None:
+                print("\n対戦を中断します。")
+            else:
+                battle.print_result(battle.rounds_played, result, hand1, hand2)
         
         elif choice == '3':  # 無制限対戦
             print("\n無制限対戦を開始します。")
@@ -408,5 +489,78 @@ def battle_loop(battle, mode: str) -> None:
         else:
             print("\n無効な選択です。もう一度選択してください。")
 
+def run_headless(rounds: int, seed: Optional[int] = None, quiet: bool = False,
+                 log_path: Optional[str] = None, stats_every: Optional[int] = None) -> None:
+    """AI vs AI の対戦をメニューなしで実行し、結果と速度を表示
+    
+    Args:
+        rounds: 対戦するラウンド数
+        seed: 乱数のシード
+        quiet: Trueの場合は各ラウンドの結果を表示しない
+        log_path: 対戦ログを書き出すファイルのパス（Noneの場合は書き出さない）
+        stats_every: 指定した場合は計測つきで対戦し、このラウンド数ごとに計測結果を1行表示する
+    """
+    round_log = None
+    if log_path is not None:
+        from ai_battle.round_log import RoundLogWriter
+        round_log = RoundLogWriter(log_path)
+    stats = BattleStats() if stats_every else None
+    battle = JankenBattle(mode='aivsai', keep_history=not quiet, round_log=round_log, seed=seed,
+                          stats=stats)
+    
+    start = time.perf_counter()
+    if quiet:
+        played = 0
+        while played < rounds:
+            block = min(rounds - played, stats_every or rounds)
+            battle.simulate(block)
+            played += block
+            if stats is not None:
+                stats.sample_models(battle)
+                print(stats.summary_line())
+    else:
+        for _ in range(rounds):
+            result, hand1, hand2 = battle.play_round()
+            battle.print_result(battle.rounds_played, result, hand1, hand2)
+            if stats is not None and battle.rounds_played % stats_every == 0:
+                stats.sample_models(battle)
+                print(stats.summary_line())
+    elapsed = time.perf_counter() - start
+    if round_log is not None:
+        round_log.close()
+    
+    battle.print_summary()
+    if elapsed > 0:
+        print(f"速度: {rounds / elapsed:,.0f} ラウンド/秒 ({elapsed:.2f}秒)")
+
+def parse_args(argv=None) -> 'argparse.Namespace':
+    """コマンドライン引数を解析"""
+    # argparse はコマンドラインから起動したときだけ必要なので、ここで読み込む
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="AIじゃんけんバトル")
+    parser.add_argument('--aivsai', action='store_true',
+                        help="メニューを表示せずに AI vs AI 対戦を実行")
+    parser.add_argument('--rounds', type=int, default=10,
+                        help="AI vs AI 対戦のラウンド数")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="乱数のシード")
+    parser.add_argument('--quiet', action='store_true',
+                        help="各ラウンドの結果を表示しない")
+    parser.add_argument('--log', default=None, metavar='PATH',
+                        help="対戦ログをバイナリ形式で書き出すファイル")
+    parser.add_argument('--stats-every', type=int, default=None, metavar='N',
+                        help="フェーズごとの時間などを計測し、Nラウンドごとに1行表示する")
+    return parser.parse_args(argv)
+
+def run(argv=None) -> None:
+    """コマンドラインから起動（python -m ai_battle や janken コマンドの入り口）"""
+    args = parse_args(argv)
+    if args.aivsai:
+        run_headless(args.rounds, seed=args.seed, quiet=args.quiet, log_path=args.log,
+                     stats_every=args.stats_every)
+    else:
+        main()
+
 if __name__ == "__main__":
-    main()
+    run()
@@ -0,0 +1,128 @@
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from janken_core.hands import HANDS, OUTCOME
+
+class RoundHistory:
+    """対戦履歴を1ラウンド1バイトで保持するクラス
+
+    両者の手を hand1 * 3 + hand2 の整数コードとして array('b') に詰めて保存する。
+    勝敗は手から決まるので保存しない。max_rounds を指定すると直近のラウンドだけを
+    リングバッファに残し、keep_rounds=False の場合はラウンド数だけを数える。
+
+    既存の呼び出し元のために、インデックスや反復では従来と同じ辞書を返す。
+    """
+
+    def __init__(self, keys: Tuple[str, str], result_names: Sequence[str],
+                 max_rounds: Optional[int] = None, keep_rounds: bool = True):
+        """
+        初期化
+
+        Args:
+            keys: 辞書で返すときの手のキー（例: ('ai1_hand', 'ai2_hand')）
+            result_names: 勝敗コード（引き分け, 1つ目の手の勝ち, 2つ目の手の勝ち）ごとの結果
+            max_rounds: 保持する最大ラウンド数（Noneの場合は無制限、0の場合は keep_rounds=False と同じ）
+            keep_rounds: Falseの場合は各ラウンドの手を保存しない
+        """
+        self.keys = keys
+        self.result_names = tuple(result_names)
+        self.max_rounds = max_rounds
+        self.keep_rounds = keep_rounds and max_rounds != 0
+
+        # これまでに追加した総ラウンド数
+        self.total_rounds = 0
+
+        if self.keep_rounds and max_rounds:
+            # リングバッファは最初に確保しておく
+            self._codes = array('b', bytes(max_rounds))
+        else:
+            self._codes = array('b')
+
+    def append(self, hand1: int, hand2: int) -> None:
+        """1ラウンド分の手を記録
+
+        Args:
+            hand1: 1つ目の手（整数コード）
+            hand2: 2つ目の手（整数コード）
+        """
+        if self.keep_rounds:
+            if self.max_rounds is None:
+                self._codes.append(hand1 * 3 + hand2)
+            else:
+                self._codes[self.total_rounds % self.max_rounds] = hand1 * 3 + hand2
+        self.total_rounds += 1
+
+    def extend_codes(self, codes: array) -> None:
+        """連続したラウンドを hand1 * 3 + hand2 のコードでまとめて記録
+
+        Args:
+            codes: 各ラウンドのコード（古い順）
+        """
+        count = len(codes)
+        if self.keep_rounds:
+            if self.max_rounds is None:
+                self._codes.extend(codes)
+            else:
+                max_rounds = self.max_rounds
+                start = self.total_rounds
+                if count > max_rounds:
+                    # 残るのは最後の max_rounds ラウンドだけ
+                    start += count - max_rounds
+                    codes = codes[count - max_rounds:]
+                slot = start % max_rounds
+                first = min(max_rounds - slot, len(codes))
+                self._codes[slot:slot + first] = codes[:first]
+                self._codes[:len(codes) - first] = codes[first:]
+        self.total_rounds += count
+
+    def clear(self) -> None:
+        """履歴を空にする"""
+        self.total_rounds = 0
+        if self.max_rounds is None:
+            self._codes = array('b')
+
+    def packed(self) -> array:
+        """保持しているラウンドの手を hand1 * 3 + hand2 のコードとして古い順に返す"""
+        if not self.keep_rounds:
+            return array('b')
+        size = len(self)
+        if self.max_rounds is None or self.total_rounds <= self.max_rounds:
+            return self._codes[:size]
+        start = self.total_rounds % self.max_rounds
+        return self._codes[start:] + self._codes[:start]
+
+    def _round(self, code: int) -> Dict[str, Any]:
+        """コードを従来の辞書形式に変換"""
+        hand1, hand2 = divmod(code, 3)
+        return {
+            self.keys[0]: HANDS[hand1],
+            self.keys[1]: HANDS[hand2],
+            'result': self.result_names[OUTCOME[hand1][hand2]],
+        }
+
+    def _code_at(self, index: int) -> int:
+        """古い順のインデックスから保存位置のコードを取り出す"""
+        if self.max_rounds is None or self.total_rounds <= self.max_rounds:
+            return self._codes[index]
+        return self._codes[(self.total_rounds + index) % self.max_rounds]
+
+    def __len__(self) -> int:
+        if not self.keep_rounds:
+            return 0
+        if self.max_rounds is None:
+            return len(self._codes)
+        return min(self.total_rounds, self.max_rounds)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("履歴の範囲外です")
+        return self._round(self._code_at(index))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for code in self.packed():
+            yield self._round(code)
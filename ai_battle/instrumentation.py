@@ -0,0 +1,184 @@
+"""対戦ループの計測（フェーズごとの時間・メモリブロック数・モデルの大きさ）
+
+JankenBattle(stats=BattleStats()) のように統計オブジェクトを渡したときだけ、
+計測つきの対戦ループに切り替わる。渡さない場合の対戦ループには手を加えないので、
+計測しない対戦の速度には影響しない。
+
+計測するフェーズ:
+    choose   AIが手を選ぶ（predict_next_hand / get_next_hand）
+    judge    勝敗の判定とスコアの更新
+    history  履歴と対戦ログへの追加
+    update   AIの学習（update_model / update_sequence）
+
+時間は perf_counter_ns で測り、2のべき乗ごとの区間のヒストグラムに数える。
+メモリは sys.getallocatedblocks()（Python が確保しているメモリブロックの数）の
+ラウンド前後の増減で数える（計測用の時刻の分は差し引く）。
+"""
+import sys
+from time import perf_counter_ns
+from typing import Any, Dict, List
+
+# 計測するフェーズ（対戦ループでの順番）
+PHASES = ('choose', 'judge', 'history', 'update')
+
+# 現在 Python が確保しているメモリブロックの数を返す関数（対応していない実装では常に0）
+allocated_blocks = getattr(sys, 'getallocatedblocks', lambda: 0)
+
+
+def _timer_blocks() -> int:
+    """計測用の値（最初のブロック数と途中の時刻3つ）の分だけ増えるメモリブロック数
+
+    対戦ループと同じ順番で読み取り、記録するときにこの分を差し引く
+    """
+    before = allocated_blocks()
+    t1 = perf_counter_ns()
+    t2 = perf_counter_ns()
+    t3 = perf_counter_ns()
+    blocks = allocated_blocks() - before
+    del t1, t2, t3
+    return blocks
+
+
+TIMER_BLOCKS = _timer_blocks()
+
+# ヒストグラムの区間の数（区間 i は [2^(i-1), 2^i) ナノ秒、最後の区間は約0.5秒以上）
+_BUCKETS = 32
+
+
+class PhaseHistogram:
+    """1つのフェーズの所要時間のヒストグラム（ナノ秒、2のべき乗ごとの区間）"""
+
+    __slots__ = ('buckets', 'count', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.buckets = [0] * _BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def add(self, ns: int) -> None:
+        """所要時間を1件追加"""
+        self.buckets[min(ns.bit_length(), _BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> int:
+        """q パーセンタイルが入っている区間の上限（ナノ秒）を返す"""
+        if not self.count:
+            return 0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(1 << index, self.max_ns)
+        return self.max_ns
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'mean_ns': self.mean_ns,
+            'p50_ns': self.percentile(50),
+            'p99_ns': self.percentile(99),
+            'max_ns': self.max_ns,
+            'buckets': list(self.buckets),
+        }
+
+
+def model_size(ai: Any) -> Dict[str, int]:
+    """AIのモデルの大きさ（get_history_info の整数の項目）を返す"""
+    get_info = getattr(ai, 'get_history_info', None)
+    if not callable(get_info):
+        return {}
+    return {key: value for key, value in get_info().items()
+            if isinstance(value, int) and not isinstance(value, bool)}
+
+
+class BattleStats:
+    """対戦ループの計測結果
+
+    Attributes:
+        phases: フェーズの名前 -> PhaseHistogram
+        rounds: 計測したラウンド数
+        allocated_blocks: 計測したラウンドでのメモリブロック数の増減の合計
+        max_round_blocks: 1ラウンドで増えたメモリブロック数の最大
+        model_sizes: 最後にサンプリングしたモデルの大きさ（'history', 'ai1', 'ai2' ごと）
+    """
+
+    def __init__(self, sample_every: int = 1024):
+        """
+        初期化
+
+        Args:
+            sample_every: モデルの大きさを調べるラウンドの間隔
+        """
+        self.sample_every = sample_every
+        self.phases = {phase: PhaseHistogram() for phase in PHASES}
+        self.rounds = 0
+        self.allocated_blocks = 0
+        self.max_round_blocks = 0
+        self.model_sizes: Dict[str, Dict[str, int]] = {}
+        # 前回 summary_line を呼んだときのラウンド数と合計時間（区間ごとの平均を出すため）
+        self._last_rounds = 0
+        self._last_total_ns = 0
+
+    def record(self, choose_ns: int, judge_ns: int, history_ns: int, update_ns: int,
+               blocks: int) -> None:
+        """1ラウンド分の計測結果を追加"""
+        phases = self.phases
+        phases['choose'].add(choose_ns)
+        phases['judge'].add(judge_ns)
+        phases['history'].add(history_ns)
+        phases['update'].add(update_ns)
+        self.rounds += 1
+        blocks -= TIMER_BLOCKS
+        self.allocated_blocks += blocks
+        if blocks > self.max_round_blocks:
+            self.max_round_blocks = blocks
+
+    def sample_models(self, battle: Any) -> None:
+        """対戦中のモデルの大きさを記録"""
+        sizes = {'history': {'rounds': len(battle.history)}}
+        for key in ('ai1', 'ai2'):
+            ai = getattr(battle, key, None)
+            if ai is not None:
+                sizes[key] = model_size(ai)
+        self.model_sizes = sizes
+
+    def total_ns(self) -> int:
+        """全フェーズの合計時間（ナノ秒）"""
+        return sum(histogram.total_ns for histogram in self.phases.values())
+
+    def summary_line(self) -> str:
+        """前回呼んだときからの区間の平均と、ここまでの p99 を1行にまとめる"""
+        rounds = self.rounds - self._last_rounds
+        total_ns = self.total_ns()
+        interval_ns = total_ns - self._last_total_ns
+        self._last_rounds, self._last_total_ns = self.rounds, total_ns
+
+        parts: List[str] = [f"[stats] {self.rounds:,}ラウンド"]
+        if rounds:
+            parts.append(f"{interval_ns / rounds:,.0f}ns/ラウンド")
+        parts.extend(f"{phase} {histogram.mean_ns:.0f}/{histogram.percentile(99)}ns"
+                     for phase, histogram in self.phases.items())
+        parts.append(f"blocks {self.allocated_blocks:+,}")
+        for key, sizes in self.model_sizes.items():
+            if sizes:
+                parts.append(f"{key} " + ",".join(f"{name}={value}" for name, value in sizes.items()))
+        return " | ".join(parts)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'rounds': self.rounds,
+            'phases': {phase: histogram.as_dict() for phase, histogram in self.phases.items()},
+            'allocated_blocks': self.allocated_blocks,
+            'max_round_blocks': self.max_round_blocks,
+            'model_sizes': self.model_sizes,
+        }
+
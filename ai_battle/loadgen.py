@@ -0,0 +1,138 @@
+"""ゲームサーバー（ai_battle.server）の負荷試験クライアント
+
+多数のセッションを並行して接続し、各セッションで決まった手数だけ PLAY して
+1手あたりの応答時間（p50 / p99）と1秒あたりのセッション数を表示する。
+
+実行方法:
+    python -m ai_battle.loadgen --local --sessions 2000 --concurrency 500 --moves 20
+    python -m ai_battle.loadgen --port 8765 --sessions 2000
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """ソート済みの値から百分位数を返す"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def run_session(host: str, port: int, unix_path: Optional[str], ai: str,
+                      moves: int, rng: random.Random, latencies: List[float]) -> bool:
+    """1セッション分の対戦を行う
+
+    Returns:
+        bool: 最後まで対戦できた場合は True
+    """
+    if unix_path is not None:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        greeting = await reader.readline()
+        if not greeting.startswith(b"HELLO"):
+            return False
+
+        writer.write(f"AI {ai}\n".encode())
+        if not (await reader.readline()).startswith(b"OK"):
+            return False
+
+        for _ in range(moves):
+            start = time.perf_counter()
+            writer.write(f"PLAY {rng.randint(1, 3)}\n".encode())
+            response = await reader.readline()
+            latencies.append(time.perf_counter() - start)
+            if not response.startswith(b"RESULT"):
+                return False
+
+        writer.write(b"QUIT\n")
+        await reader.readline()
+        return True
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def run_load(host: str, port: int, unix_path: Optional[str], sessions: int,
+                   concurrency: int, moves: int, ai: str, seed: int = 0) -> Dict[str, Any]:
+    """sessions 個のセッションを最大 concurrency 並列で実行して結果を集計"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+    rng = random.Random(seed)
+
+    async def limited() -> None:
+        nonlocal failures
+        async with semaphore:
+            try:
+                if not await run_session(host, port, unix_path, ai, moves, rng, latencies):
+                    failures += 1
+            except (ConnectionError, OSError):
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(limited() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'sessions': sessions,
+        'failures': failures,
+        'moves': len(latencies),
+        'elapsed': elapsed,
+        'sessions_per_sec': (sessions - failures) / elapsed if elapsed else 0.0,
+        'moves_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1e3,
+        'p99_ms': percentile(latencies, 0.99) * 1e3,
+    }
+
+
+async def run_local(args: argparse.Namespace) -> Dict[str, Any]:
+    """同じプロセス内でサーバーを起動して負荷をかける"""
+    from ai_battle.server import GameServer
+
+    game_server = GameServer(max_sessions=max(args.concurrency, 1), idle_timeout=args.idle_timeout)
+    server = await game_server.start(args.host, 0, args.unix)
+    port = server.sockets[0].getsockname()[1] if args.unix is None else 0
+    async with server:
+        return await run_load(args.host, port, args.unix, args.sessions,
+                              args.concurrency, args.moves, args.ai, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ゲームサーバーの負荷試験")
+    parser.add_argument('--host', default='127.0.0.1', help="サーバーのアドレス")
+    parser.add_argument('--port', type=int, default=8765, help="サーバーのポート")
+    parser.add_argument('--unix', default=None, metavar='PATH', help="Unix ソケットのパス")
+    parser.add_argument('--local', action='store_true', help="同じプロセス内でサーバーを起動する")
+    parser.add_argument('--sessions', type=int, default=1000, help="総セッション数")
+    parser.add_argument('--concurrency', type=int, default=200, help="同時に接続するセッション数")
+    parser.add_argument('--moves', type=int, default=20, help="1セッションあたりの手数")
+    parser.add_argument('--ai', default='bayesian', help="対戦させるAI")
+    parser.add_argument('--seed', type=int, default=0, help="手を選ぶ乱数のシード")
+    parser.add_argument('--idle-timeout', type=float, default=60.0, help="--local のサーバーの無操作タイムアウト")
+    args = parser.parse_args(argv)
+
+    if args.local:
+        stats = asyncio.run(run_local(args))
+    else:
+        stats = asyncio.run(run_load(args.host, args.port, args.unix, args.sessions,
+                                     args.concurrency, args.moves, args.ai, args.seed))
+
+    print(f"セッション数: {stats['sessions']} (失敗 {stats['failures']})")
+    print(f"手数: {stats['moves']} ({stats['elapsed']:.2f}秒)")
+    print(f"セッション/秒: {stats['sessions_per_sec']:,.1f}")
+    print(f"手/秒: {stats['moves_per_sec']:,.0f}")
+    print(f"応答時間 p50: {stats['p50_ms']:.3f} ms, p99: {stats['p99_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""プレイヤーごとのAIの学習状態を保存するストア
+
+ディスクにはプレイヤーID・AIの種類ごとに1ファイルのスナップショット（janken_core.snapshot）を置き、
+その手前に最近使ったAIをそのまま持っておく LRU キャッシュを置く。
+戻ってきたプレイヤーのAIは、キャッシュにあればそのまま、なければスナップショットから復元する。
+get してから put するまでのAIは貸し出し中として扱い、同じプレイヤー・AIの種類を二重に取り出せないようにする
+（2つの対戦が1つのAIを同時に学習させると、直前の手や履歴が混ざって壊れるため）。
+
+    store = PlayerModelStore('player_models', cache_size=1024)
+    ai = store.get('alice', 'bayesian')
+    ...（対戦）...
+    store.put('alice', 'bayesian', ai)
+    store.close()
+"""
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from urllib.parse import quote
+
+from janken_core.snapshot import load_snapshot
+from janken_core.strategy import create_strategy
+
+SNAPSHOT_SUFFIX = '.jks'
+
+
+class PlayerModelStore:
+    """プレイヤーID -> AI のストア（ディスク + LRU キャッシュ）"""
+
+    def __init__(self, directory: str, cache_size: int = 1024, write_back: bool = True,
+                 strategy_options: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        初期化
+
+        Args:
+            directory: スナップショットを置くディレクトリ
+            cache_size: キャッシュに持っておくAIの最大数（0の場合はキャッシュしない）
+            write_back: True の場合はキャッシュから追い出すとき（と close のとき）にだけ書き込む。
+                False の場合は put のたびにすぐ書き込む
+            strategy_options: AIの種類ごとのコンストラクタ引数（新規作成・設定の変更に使う）
+        """
+        self.directory = directory
+        self.cache_size = cache_size
+        self.write_back = write_back
+        self.strategy_options = strategy_options or {}
+
+        # (プレイヤーID, AIの種類) -> [AI, 未保存の変更があるか]（末尾ほど最近使ったもの）
+        self._cache: 'OrderedDict[Tuple[str, str], list]' = OrderedDict()
+        # 貸し出し中（get してまだ put していない）の (プレイヤーID, AIの種類)
+        self._checked_out: Set[Tuple[str, str]] = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, player_id: str, strategy: str) -> str:
+        """スナップショットのファイルパスを返す（プレイヤーIDはファイル名に使える形にする）"""
+        return os.path.join(self.directory, f"{quote(player_id, safe='')}.{strategy}{SNAPSHOT_SUFFIX}")
+
+    def in_use(self, player_id: str, strategy: str) -> bool:
+        """プレイヤーのAIが貸し出し中（get してまだ put していない）かどうか"""
+        return (player_id, strategy) in self._checked_out
+
+    def get(self, player_id: str, strategy: str):
+        """プレイヤーのAIを取得して貸し出し中にする（キャッシュ -> ディスク -> 新規作成の順に探す）
+
+        Args:
+            player_id: プレイヤーID
+            strategy: AIの種類（'bayesian', 'pattern' など）
+
+        Raises:
+            RuntimeError: 同じプレイヤー・AIの種類がすでに貸し出し中の場合（先に in_use で確認する）
+        """
+        key = (player_id, strategy)
+        if key in self._checked_out:
+            raise RuntimeError(f"プレイヤー {player_id} のAI '{strategy}' は使用中です")
+        self._checked_out.add(key)
+        entry = self._cache.get(key)
+        if entry is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        self.misses += 1
+        ai = self._load(player_id, strategy)
+        self._insert(key, ai, dirty=False)
+        return ai
+
+    def put(self, player_id: str, strategy: str, ai) -> None:
+        """プレイヤーのAIを登録し、貸し出し中を解除する（対戦が終わったときなどに呼ぶ）"""
+        self._checked_out.discard((player_id, strategy))
+        if self.write_back and self.cache_size > 0:
+            self._insert((player_id, strategy), ai, dirty=True)
+        else:
+            self._save(player_id, strategy, ai)
+            if self.cache_size > 0:
+                self._insert((player_id, strategy), ai, dirty=False)
+
+    def flush(self) -> None:
+        """未保存のAIを全てディスクに書き込む"""
+        for (player_id, strategy), entry in self._cache.items():
+            if entry[1]:
+                self._save(player_id, strategy, entry[0])
+                entry[1] = False
+
+    def close(self) -> None:
+        """未保存のAIを書き込んでキャッシュを空にする"""
+        self.flush()
+        self._cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def _insert(self, key: Tuple[str, str], ai, dirty: bool) -> None:
+        """キャッシュに追加し、あふれた分を古い順に追い出す"""
+        if self.cache_size <= 0:
+            return
+        entry = self._cache.get(key)
+        if entry is not None:
+            entry[0] = ai
+            entry[1] = entry[1] or dirty
+            self._cache.move_to_end(key)
+        else:
+            self._cache[key] = [ai, dirty]
+
+        while len(self._cache) > self.cache_size:
+            (player_id, strategy), (old_ai, old_dirty) = self._cache.popitem(last=False)
+            self.evictions += 1
+            if old_dirty:
+                self._save(player_id, strategy, old_ai)
+
+    def _load(self, player_id: str, strategy: str):
+        """ディスクから復元（ファイルがない・読めない場合は新しいAIを作る）"""
+        options = self.strategy_options.get(strategy, {})
+        try:
+            with open(self.path(player_id, strategy), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return create_strategy(strategy, **options)
+
+        try:
+            # 現在の設定（max_history など）を渡して、保存時と違う場合は復元時に合わせる
+            return load_snapshot(data, **options)
+        except (ValueError, TypeError):
+            # 古い形式・壊れたファイルは使わずに学習し直す
+            return create_strategy(strategy, **options)
+
+    def _save(self, player_id: str, strategy: str, ai) -> None:
+        """スナップショットをディスクに書き込む（途中で止まっても壊れないように置き換える）"""
+        if not hasattr(ai, 'to_snapshot'):
+            return
+        path = self.path(player_id, strategy)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(ai.to_snapshot())
+        os.replace(temp_path, path)
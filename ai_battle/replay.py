@@ -0,0 +1,302 @@
+"""記録しておいたプレイヤーの手の並びを各AIと対戦させ直して勝率を調べるツール
+
+入力は次のどちらか。
+
+    テキスト / CSV（1行が1つの手の並び）
+        alice,1231231312       ID と手（1: グー, 2: チョキ, 3: パー）をカンマで区切る
+        2 3 1 1 2              ID を省略した場合は行番号が ID になる（手の間の空白は無視）
+        手以外の文字を含む行（見出し行など）と '#' で始まる行は読み飛ばす
+    対戦ログ（ai_battle.round_log の形式、NumPy が必要）
+        --side で指定した側の手を記録された手として使う。ラウンド番号が途切れたところで別の並びとする
+
+ファイルは少しずつ読み込み、chunk_size 個の並びごとにワーカープロセスへ渡すため、
+ファイル全体がメモリに載ることはない（1つの並びは1手1バイトで保持する）。
+
+記録された手はAIの手によらず決まっているものとして対戦させ直す（AIの手に反応して変えた手も、そのまま使う）。
+各並び・各AIの乱数は (seed, 並びの番号, AIの番号) から導出するため、ワーカー数やチャンクの大きさによらず結果は同じになる。
+
+実行方法:
+    python -m ai_battle.replay players.csv --bayesian 30:20 --bayesian 50:40 --pattern
+    python -m ai_battle.replay battle.jklg --format log --side 1 --workers 4
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ai_battle.tournament import DEFAULT_CONFIGS, config_name, create_ai
+from janken_core.hands import OUTCOME
+from janken_core.rng import derive_seed
+
+# キーボード入力の '1'〜'3' を手の整数コードに変換する表（区切りの空白類は削除する）
+_TEXT_TO_CODES = bytes.maketrans(b'123', b'\x00\x01\x02')
+_SEPARATORS = b' \t;'
+_CODES = b'\x00\x01\x02'
+
+# 並びごとの集計（AIから見た勝ち, 負け, 引き分け）
+Counts = List[int]
+
+
+def iter_text_sequences(path: str) -> Iterator[Tuple[str, bytes]]:
+    """テキスト / CSV ファイルから (ID, 手の並び) を1行ずつ読み込む
+
+    Yields:
+        Tuple[ID, 手の整数コードを1バイトずつ並べた bytes]
+    """
+    with open(path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith(b'#'):
+                continue
+            sequence_id, comma, moves = line.partition(b',')
+            if not comma:
+                sequence_id, moves = str(line_number).encode(), sequence_id
+            codes = moves.translate(_TEXT_TO_CODES, _SEPARATORS)
+            if not codes or codes.translate(None, _CODES):
+                # 手以外の文字を含む行（見出し行など）
+                continue
+            yield sequence_id.decode('utf-8', 'replace').strip(), codes
+
+
+def iter_log_sequences(path: str, side: int = 1, chunk_records: int = 1 << 20) -> Iterator[Tuple[str, bytes]]:
+    """対戦ログから (ID, 手の並び) を読み込む
+
+    ログはメモリマップで chunk_records 件ずつ読み、ラウンド番号が連続している範囲を1つの並びとする。
+
+    Args:
+        path: 対戦ログのパス
+        side: 記録された手として使う側（1: hand1, 2: hand2）
+        chunk_records: 一度に読むレコード数
+    """
+    import numpy as np
+    from ai_battle.round_log import read_round_log
+
+    if side not in (1, 2):
+        raise ValueError("side には 1 か 2 を指定してください")
+    records = read_round_log(path)
+    column = f'hand{side}'
+
+    current = bytearray()
+    current_start = None
+    previous_round = None
+    for start in range(0, len(records), chunk_records):
+        chunk = records[start:start + chunk_records]
+        rounds = chunk['round'].astype(np.int64)
+        hands = chunk[column].astype(np.uint8)
+
+        # このチャンクの中でラウンド番号が途切れる位置
+        breaks = np.flatnonzero(np.diff(rounds) != 1) + 1
+        if previous_round is not None and rounds[0] != previous_round + 1:
+            breaks = np.concatenate(([0], breaks))
+
+        if current_start is None:
+            current_start = int(rounds[0])
+        position = 0
+        for split in breaks.tolist():
+            current += hands[position:split].tobytes()
+            if current:
+                yield f"{current_start}", bytes(current)
+            current = bytearray()
+            current_start = int(rounds[split])
+            position = split
+        current += hands[position:].tobytes()
+        previous_round = int(rounds[-1])
+
+    if current:
+        yield f"{current_start}", bytes(current)
+
+
+def iter_sequences(path: str, fmt: str = 'auto', side: int = 1) -> Iterator[Tuple[str, bytes]]:
+    """ファイルの形式に応じて (ID, 手の並び) を読み込む
+
+    Args:
+        path: 入力ファイル
+        fmt: 'text', 'log' または 'auto'（ファイルの先頭で判断）
+        side: 対戦ログのときに使う側
+    """
+    if fmt == 'auto':
+        with open(path, 'rb') as f:
+            fmt = 'log' if f.read(4) == b'JKLG' else 'text'
+    if fmt == 'log':
+        return iter_log_sequences(path, side=side)
+    if fmt == 'text':
+        return iter_text_sequences(path)
+    raise ValueError(f"不明な入力形式です: {fmt}")
+
+
+def replay_sequence(ai, moves: bytes) -> Counts:
+    """1つの並びをAIと対戦させ直す
+
+    Args:
+        ai: choose / observe を持つAI
+        moves: 記録された手の並び
+
+    Returns:
+        Counts: [AIの勝利数, AIの敗北数, 引き分け数]
+    """
+    choose, observe = ai.choose, ai.observe
+    outcome_counts = [0, 0, 0]
+    for player_hand in moves:
+        ai_hand = choose()
+        outcome = OUTCOME[ai_hand][player_hand]
+        outcome_counts[outcome] += 1
+        observe(ai_hand, player_hand, outcome)
+    # 勝敗コード（DRAW, WIN, LOSE）の順から [勝ち, 負け, 引き分け] の順にする
+    return [outcome_counts[1], outcome_counts[2], outcome_counts[0]]
+
+
+def replay_chunk(configs: Sequence[Dict[str, Any]], first_index: int,
+                 sequences: Sequence[bytes], seed: int) -> Tuple[List[Counts], int, int]:
+    """並びのまとまりを全てのAIと対戦させ直す（ワーカープロセスで実行）
+
+    Args:
+        configs: AI設定のリスト
+        first_index: まとまりの最初の並びの通し番号（乱数のシードの導出に使う）
+        sequences: 手の並びのリスト
+        seed: マスターシード
+
+    Returns:
+        Tuple[AIごとの [勝ち, 負け, 引き分け], 並びの数, 手の数]
+    """
+    totals = [[0, 0, 0] for _ in configs]
+    for offset, moves in enumerate(sequences):
+        index = first_index + offset
+        for config_index, config in enumerate(configs):
+            ai = create_ai(config)
+            if callable(getattr(ai, 'seed', None)):
+                ai.seed(derive_seed(seed, index, config_index))
+            counts = replay_sequence(ai, moves)
+            total = totals[config_index]
+            total[0] += counts[0]
+            total[1] += counts[1]
+            total[2] += counts[2]
+    return totals, len(sequences), sum(len(moves) for moves in sequences)
+
+
+def _chunks(sequences: Iterator[Tuple[str, bytes]], chunk_size: int) -> Iterator[Tuple[int, List[bytes]]]:
+    """並びを chunk_size 個ずつまとめる"""
+    chunk: List[bytes] = []
+    first_index = 0
+    for index, (_, moves) in enumerate(sequences):
+        if not chunk:
+            first_index = index
+        chunk.append(moves)
+        if len(chunk) >= chunk_size:
+            yield first_index, chunk
+            chunk = []
+    if chunk:
+        yield first_index, chunk
+
+
+def run_replay(path: str, configs: Sequence[Dict[str, Any]] = DEFAULT_CONFIGS,
+               workers: Optional[int] = None, chunk_size: int = 256, seed: int = 0,
+               fmt: str = 'auto', side: int = 1) -> Dict[str, Any]:
+    """ファイルの全ての並びを全てのAIと対戦させ直して集計
+
+    Args:
+        path: 入力ファイル
+        configs: AI設定のリスト
+        workers: ワーカープロセス数（Noneの場合はCPU数、1の場合はこのプロセスで実行）
+        chunk_size: 1つのタスクで扱う並びの数
+        seed: マスターシード
+        fmt: 入力形式（'auto', 'text', 'log'）
+        side: 対戦ログのときに使う側
+
+    Returns:
+        Dict[str, Any]: 'sequences', 'moves', 'results'（AIごとの勝敗数と勝率）を持つ辞書
+    """
+    configs = list(configs)
+    totals = [[0, 0, 0] for _ in configs]
+    n_sequences = 0
+    n_moves = 0
+
+    def add(result: Tuple[List[Counts], int, int]) -> None:
+        nonlocal n_sequences, n_moves
+        chunk_totals, chunk_sequences, chunk_moves = result
+        for total, counts in zip(totals, chunk_totals):
+            for k in range(3):
+                total[k] += counts[k]
+        n_sequences += chunk_sequences
+        n_moves += chunk_moves
+
+    chunks = _chunks(iter_sequences(path, fmt=fmt, side=side), chunk_size)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for first_index, chunk in chunks:
+            add(replay_chunk(configs, first_index, chunk, seed))
+    else:
+        # 読み込んだまま処理待ちになるチャンクの数を抑えて、メモリ使用量を一定にする
+        max_pending = workers * 2
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for first_index, chunk in chunks:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        add(future.result())
+                pending.add(executor.submit(replay_chunk, configs, first_index, chunk, seed))
+            for future in pending:
+                add(future.result())
+
+    results = []
+    for config, (wins, losses, draws) in zip(configs, totals):
+        rounds = wins + losses + draws
+        results.append({
+            'name': config_name(config),
+            'wins': wins,
+            'losses': losses,
+            'draws': draws,
+            'win_rate': wins / rounds if rounds else 0.0,
+            'loss_rate': losses / rounds if rounds else 0.0,
+        })
+    return {'sequences': n_sequences, 'moves': n_moves, 'results': results}
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """AIごとの勝率を表示"""
+    print(f"\n=== リプレイ結果（{report['sequences']}件の並び, {report['moves']}手） ===")
+    for row in sorted(report['results'], key=lambda r: r['win_rate'], reverse=True):
+        print(f"{row['name']}: 勝率 {row['win_rate']:.3f}, 負け率 {row['loss_rate']:.3f} "
+              f"({row['wins']}勝 {row['losses']}敗 {row['draws']}分)")
+
+
+def main(argv=None):
+    import argparse
+    import time
+
+    from ai_battle.tournament import load_configs, parse_bayesian
+
+    parser = argparse.ArgumentParser(description="記録されたプレイヤーの手をAIと対戦させ直す")
+    parser.add_argument('path', help="入力ファイル（テキスト / CSV または対戦ログ）")
+    parser.add_argument('--format', default='auto', choices=['auto', 'text', 'log'], help="入力形式")
+    parser.add_argument('--side', type=int, default=1, choices=[1, 2], help="対戦ログのときに使う側")
+    parser.add_argument('--bayesian', type=parse_bayesian, action='append', default=[],
+                        metavar='MAX_HISTORY:DECAY_START', help="対戦させるベイズAIの設定")
+    parser.add_argument('--pattern', action='store_true', help="パターンAIと対戦させる")
+    parser.add_argument('--ai', action='append', default=[], metavar='NAME',
+                        help="その他の対戦させるAI（'ngram', 'ensemble' など）")
+    parser.add_argument('--config', default=None, metavar='PATH',
+                        help="対戦させるAI設定のリストを書いた JSON ファイル（独自のパターンAIなど）")
+    parser.add_argument('--workers', type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument('--chunk-size', type=int, default=256, help="1つのタスクで扱う並びの数")
+    parser.add_argument('--seed', type=int, default=0, help="マスターシード")
+    args = parser.parse_args(argv)
+
+    configs = load_configs(args.config) if args.config else []
+    configs.extend(args.bayesian)
+    if args.pattern:
+        configs.append({'type': 'pattern'})
+    configs.extend({'type': name} for name in args.ai)
+    if not configs:
+        configs = DEFAULT_CONFIGS
+
+    start = time.perf_counter()
+    report = run_replay(args.path, configs, workers=args.workers, chunk_size=args.chunk_size,
+                        seed=args.seed, fmt=args.format, side=args.side)
+    elapsed = time.perf_counter() - start
+    print_report(report)
+    if elapsed > 0:
+        print(f"速度: {report['moves'] * len(configs) / elapsed:,.0f} 手/秒 ({elapsed:.2f}秒)")
+
+
+if __name__ == "__main__":
+    main()
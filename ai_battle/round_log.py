@@ -0,0 +1,152 @@
+"""対戦ログをバイナリ形式でファイルに書き出す・読み込むモジュール
+
+ファイルは16バイトのヘッダのあとに、1ラウンド8バイトの固定長レコードが並ぶ。
+
+    ヘッダ: マジック b'JKLG', バージョン (uint16), レコード長 (uint16), 予約 8バイト
+    レコード: ラウンド番号 (uint32), 手1 (int8), 手2 (int8), 勝敗コード (int8), 予約 1バイト
+
+勝敗コードは janken_core.hands の DRAW / WIN / LOSE（手1から見た結果）。
+"""
+import struct
+from array import array
+from typing import Iterable
+
+import numpy as np
+
+from janken_core.hands import OUTCOME
+
+MAGIC = b'JKLG'
+VERSION = 1
+HEADER = struct.Struct('<4sHH8x')
+
+RECORD_DTYPE = np.dtype([
+    ('round', '<u4'),
+    ('hand1', 'i1'),
+    ('hand2', 'i1'),
+    ('result', 'i1'),
+    ('reserved', 'i1'),
+])
+
+# ラウンド番号の上限（uint32）
+MAX_ROUND = 0xFFFFFFFF
+
+# code = hand1 * 3 + hand2 から各列への変換表
+_CODE_HAND1 = np.array([code // 3 for code in range(9)], dtype=np.int8)
+_CODE_HAND2 = np.array([code % 3 for code in range(9)], dtype=np.int8)
+_CODE_RESULT = np.array([OUTCOME[code // 3][code % 3] for code in range(9)], dtype=np.int8)
+
+
+class RoundLogWriter:
+    """対戦ログを書き出すクラス
+
+    各ラウンドは hand1 * 3 + hand2 の1バイトとしてメモリに溜め、
+    flush_every ラウンドごとにまとめてレコードへ変換してファイルに書き出す。
+    """
+
+    def __init__(self, path, flush_every: int = 65536):
+        """
+        初期化
+
+        Args:
+            path: 書き出すファイルのパス
+            flush_every: ファイルに書き出す間隔（ラウンド数）
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.rounds_written = 0
+
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize))
+
+        # まだ書き出していないラウンド（連続したラウンド番号の範囲）
+        self._pending = array('b')
+        self._pending_start = 0
+
+    def write(self, round_number: int, hand1: int, hand2: int) -> None:
+        """1ラウンド分を記録
+
+        Args:
+            round_number: ラウンド番号
+            hand1: 1つ目の手（整数コード）
+            hand2: 2つ目の手（整数コード）
+        """
+        pending = self._pending
+        if not pending:
+            self._pending_start = round_number
+        elif round_number != self._pending_start + len(pending):
+            # ラウンド番号が連続していない場合はそこで区切る
+            self.flush()
+            pending = self._pending
+            self._pending_start = round_number
+        pending.append(hand1 * 3 + hand2)
+        if len(pending) >= self.flush_every:
+            self.flush()
+
+    def write_codes(self, first_round: int, codes: Iterable[int]) -> None:
+        """連続したラウンドを hand1 * 3 + hand2 のコードでまとめて記録
+
+        Args:
+            first_round: 最初のラウンド番号
+            codes: 各ラウンドのコード
+        """
+        self.flush()
+        self._write_block(first_round, np.asarray(codes, dtype=np.int8))
+        self._file.flush()
+
+    def flush(self) -> None:
+        """溜まっているラウンドをファイルに書き出す"""
+        if self._pending:
+            self._write_block(self._pending_start, np.frombuffer(self._pending, dtype=np.int8))
+            self._pending = array('b')
+        self._file.flush()
+
+    def _write_block(self, first_round: int, codes: np.ndarray) -> None:
+        """コードの配列をレコードに変換して書き出す"""
+        if not len(codes):
+            return
+        if first_round + len(codes) - 1 > MAX_ROUND:
+            raise ValueError("ラウンド番号がログ形式の上限を超えています")
+        records = np.zeros(len(codes), dtype=RECORD_DTYPE)
+        records['round'] = np.arange(first_round, first_round + len(codes), dtype=np.uint32)
+        records['hand1'] = _CODE_HAND1[codes]
+        records['hand2'] = _CODE_HAND2[codes]
+        records['result'] = _CODE_RESULT[codes]
+        self._file.write(records.tobytes())
+        self.rounds_written += len(codes)
+
+    def close(self) -> None:
+        """残りを書き出してファイルを閉じる"""
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_round_log(path) -> np.ndarray:
+    """対戦ログをメモリマップで読み込む
+
+    返り値はファイルを直接参照する構造化配列で、records['hand1'] などの各列も
+    コピーされないビューになる。
+
+    Args:
+        path: 読み込むファイルのパス
+
+    Returns:
+        numpy.memmap: RECORD_DTYPE のレコード配列
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("対戦ログのヘッダが不完全です")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("対戦ログのファイルではありません")
+    if version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"対応していない対戦ログのバージョンです: {version}")
+
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size)
@@ -0,0 +1,278 @@
+"""複数のプレイヤーが同時にAIと対戦できる asyncio のゲームサーバー
+
+1つの接続が1つのセッションで、セッションごとに JankenBattle（プレイヤー vs AI）を持つ。
+通信は UTF-8 の1行1コマンドのテキストで行う。
+
+    クライアント -> サーバー
+        PLAYER <ID>    プレイヤーIDを名乗る（--store を指定した場合、AIの学習状態が保存・復元される）
+        AI <名前>      対戦するAIを選ぶ（'bayesian', 'pattern' など。スコアはリセットされる）
+        PLAY <1-3>     手を出す（1: グー, 2: チョキ, 3: パー）
+        SCORE          現在のスコアを問い合わせる
+        QUIT           終了する
+
+    サーバー -> クライアント
+        HELLO <選べるAIの名前をカンマ区切り>
+        OK <AIの表示名>
+        RESULT <あなたの手> <AIの手> <win|lose|draw> <あなたの勝利数> <AIの勝利数> <引き分け数>
+        SCORE <あなたの勝利数> <AIの勝利数> <引き分け数>
+        ERR <理由>
+        BYE [timeout]
+
+手は入力と同じ 1〜3 の番号で返す。同時セッション数が上限に達している場合は
+接続直後に 'ERR busy' を返して切断し、一定時間コマンドがないセッションは 'BYE timeout' で切断する。
+--store を指定した場合、同じプレイヤーIDが同じAIと別のセッションで対戦中の間は、PLAY と AI に ERR を返す。
+
+実行方法:
+    python -m ai_battle.server --port 8765
+    python -m ai_battle.server --unix /tmp/janken.sock
+    python -m ai_battle.server --port 8765 --store player_models --cache-size 4096
+    python -m ai_battle.server --port 8765 --prior janken_prior --prior-file prior.npy
+"""
+import asyncio
+from typing import Any, Optional
+
+from ai_battle.battle import DEFAULT_STRATEGY_OPTIONS, JankenBattle
+from ai_battle.player_store import PlayerModelStore
+from janken_core.hands import INPUT_TO_HAND
+from janken_core.strategy import available_strategies
+
+# プレイヤーから見た結果の表記
+RESULT_WORDS = {'player': 'win', 'ai': 'lose', 'draw': 'draw'}
+
+
+class GameServer:
+    """プレイヤー vs AI のセッションを管理するサーバー"""
+
+    def __init__(self, max_sessions: int = 10_000, idle_timeout: float = 60.0,
+                 default_ai: str = 'pattern', store: Optional[PlayerModelStore] = None,
+                 prior: Any = None, prior_strength: float = 1.0):
+        """
+        初期化
+
+        Args:
+            max_sessions: 同時に扱う最大セッション数
+            idle_timeout: コマンドがないまま待つ最大秒数
+            default_ai: AIを選ばずに PLAY したときのAI
+            store: プレイヤーごとのAIを保存するストア（Noneの場合は保存しない）
+            prior: 集団の事前分布（PopulationPrior、指定した場合はベイズAIの予測に使い、
+                セッションが終わるたびにその対戦の遷移を足す）
+            prior_strength: 事前分布の強さ
+        """
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.default_ai = default_ai
+        self.store = store
+        self.prior = prior
+        self.prior_strength = prior_strength
+
+        self.live_sessions = 0
+        self.total_sessions = 0
+        self.rejected_sessions = 0
+        self.total_moves = 0
+
+        self._strategies = available_strategies()
+        self._hello = f"HELLO {','.join(self._strategies)}\n".encode()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """1つの接続（セッション）を処理"""
+        if self.live_sessions >= self.max_sessions:
+            self.rejected_sessions += 1
+            writer.write(b"ERR busy\n")
+            await self._close(writer)
+            return
+
+        self.live_sessions += 1
+        self.total_sessions += 1
+        try:
+            await self._serve(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.live_sessions -= 1
+            await self._close(writer)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """セッションのコマンドを順に処理"""
+        battle: Optional[JankenBattle] = None
+        ai_name = self.default_ai
+        player_id: Optional[str] = None
+        # 集団の事前分布に足す「AIの直前の手 -> プレイヤーの手」の遷移回数
+        transitions = [0] * 9
+        prev_ai_hand = None
+        writer.write(self._hello)
+        await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    writer.write(b"BYE timeout\n")
+                    break
+                if not line:
+                    break
+
+                command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+                command = command.upper()
+
+                if command == 'PLAY':
+                    hand = INPUT_TO_HAND.get(argument.strip())
+                    if hand is None:
+                        response = "ERR PLAY には 1〜3 を指定してください"
+                    else:
+                        if battle is None:
+                            battle = self._new_battle(ai_name, player_id)
+                            prev_ai_hand = None
+                        if battle is None:
+                            response = self._in_play_error(player_id)
+                        else:
+                            result, player_hand, ai_hand = battle.play_hand(hand)
+                            self.total_moves += 1
+                            if prev_ai_hand is not None:
+                                transitions[prev_ai_hand * 3 + player_hand] += 1
+                            prev_ai_hand = ai_hand
+                            scores = battle.scores
+                            response = (f"RESULT {player_hand + 1} {ai_hand + 1} {RESULT_WORDS[result]} "
+                                        f"{scores['player']} {scores['ai']} {scores['draw']}")
+                elif command == 'AI':
+                    name = argument.strip()
+                    if name not in self._strategies:
+                        response = f"ERR 不明なAIです: {name}"
+                    else:
+                        self._release(player_id, ai_name, battle)
+                        ai_name = name
+                        battle = self._new_battle(ai_name, player_id)
+                        prev_ai_hand = None
+                        response = f"OK {battle.ai_name}" if battle is not None else self._in_play_error(player_id)
+                elif command == 'PLAYER':
+                    if not argument.strip():
+                        response = "ERR PLAYER にはIDを指定してください"
+                    else:
+                        # 対戦中のAIはそれまでのプレイヤーの分として保存し、対戦をやり直す
+                        self._release(player_id, ai_name, battle)
+                        battle = None
+                        player_id = argument.strip()
+                        response = f"OK {player_id}"
+                elif command == 'SCORE':
+                    scores = battle.scores if battle is not None else {'player': 0, 'ai': 0, 'draw': 0}
+                    response = f"SCORE {scores['player']} {scores['ai']} {scores['draw']}"
+                elif command == 'QUIT':
+                    writer.write(b"BYE\n")
+                    break
+                else:
+                    response = f"ERR 不明なコマンドです: {command}"
+
+                writer.write(response.encode() + b"\n")
+                await writer.drain()
+        finally:
+            self._release(player_id, ai_name, battle)
+            if self.prior is not None and any(transitions):
+                self.prior.add_counts(transitions)
+
+    def _new_battle(self, ai_name: str, player_id: Optional[str]) -> Optional[JankenBattle]:
+        """セッション用の対戦を作成（履歴はスコアだけを残す）
+
+        ストアがあり、プレイヤーIDが分かっている場合は、そのプレイヤーのAIを復元して使う。
+        そのAIが別のセッションで対戦中の場合は None を返す。
+        """
+        ai = ai_name
+        if self.store is not None and player_id is not None:
+            if self.store.in_use(player_id, ai_name):
+                return None
+            ai = self.store.get(player_id, ai_name)
+        battle = JankenBattle(mode='playervsai', player_ai=ai, keep_history=False)
+        if self.prior is not None and hasattr(battle.ai2, 'prior'):
+            # 事前分布はスナップショットに含まれないので、対戦ごとに共有のものを設定する
+            battle.ai2.prior = self.prior
+            battle.ai2.prior_strength = self.prior_strength
+        return battle
+
+    @staticmethod
+    def _in_play_error(player_id: Optional[str]) -> str:
+        """同じプレイヤーが別のセッションで対戦中の場合の応答"""
+        return f"ERR プレイヤー {player_id} は別のセッションで対戦中です"
+
+    def _release(self, player_id: Optional[str], ai_name: str, battle: Optional[JankenBattle]) -> None:
+        """対戦を終えるときに、プレイヤーのAIをストアに戻す"""
+        if self.store is not None and player_id is not None and battle is not None:
+            self.store.put(player_id, ai_name, battle.ai2)
+
+    @staticmethod
+    async def _close(writer: asyncio.StreamWriter) -> None:
+        """接続を閉じる"""
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765,
+                    unix_path: Optional[str] = None) -> asyncio.AbstractServer:
+        """サーバーを起動（TCP または Unix ソケット）"""
+        if unix_path is not None:
+            return await asyncio.start_unix_server(self.handle_client, path=unix_path, backlog=4096)
+        return await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+
+
+async def serve(host: str, port: int, unix_path: Optional[str],
+                max_sessions: int, idle_timeout: float,
+                store: Optional[PlayerModelStore] = None, prior: Any = None,
+                prior_strength: float = 1.0) -> None:
+    """サーバーを起動して終了するまで待つ"""
+    game_server = GameServer(max_sessions=max_sessions, idle_timeout=idle_timeout, store=store,
+                             prior=prior, prior_strength=prior_strength)
+    server = await game_server.start(host, port, unix_path)
+    where = unix_path if unix_path is not None else f"{host}:{port}"
+    print(f"じゃんけんサーバーを {where} で起動しました（Ctrl+C で終了）")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    # ロードジェネレーターなどはこのモジュールを読み込むだけなので、argparse はここで読み込む
+    import argparse
+
+    parser = argparse.ArgumentParser(description="じゃんけんAIのゲームサーバー")
+    parser.add_argument('--host', default='127.0.0.1', help="待ち受けるアドレス")
+    parser.add_argument('--port', type=int, default=8765, help="待ち受けるポート")
+    parser.add_argument('--unix', default=None, metavar='PATH', help="TCPの代わりに使う Unix ソケットのパス")
+    parser.add_argument('--max-sessions', type=int, default=10_000, help="同時に扱う最大セッション数")
+    parser.add_argument('--idle-timeout', type=float, default=60.0, help="無操作で切断するまでの秒数")
+    parser.add_argument('--store', default=None, metavar='DIR', help="プレイヤーごとのAIを保存するディレクトリ")
+    parser.add_argument('--cache-size', type=int, default=1024, help="メモリに持っておくプレイヤーのAIの数")
+    parser.add_argument('--prior', default=None, metavar='NAME',
+                        help="集団の事前分布を置く共有メモリの名前（指定した場合はベイズAIの予測に使う、NumPy が必要）")
+    parser.add_argument('--prior-file', default=None, metavar='PATH',
+                        help="集団の事前分布の遷移回数を起動時に読み込み、終了時に保存するファイル（.npy）")
+    parser.add_argument('--prior-strength', type=float, default=1.0, help="集団の事前分布の強さ")
+    args = parser.parse_args(argv)
+
+    store = None
+    if args.store is not None:
+        store = PlayerModelStore(args.store, cache_size=args.cache_size,
+                                 strategy_options=DEFAULT_STRATEGY_OPTIONS)
+    prior = None
+    if args.prior is not None or args.prior_file is not None:
+        import os
+        from bayesian_ai.population_prior import PopulationPrior
+        counts = None
+        if args.prior_file is not None and os.path.exists(args.prior_file):
+            counts = PopulationPrior.load_counts(args.prior_file)
+        prior = PopulationPrior.create(args.prior, counts=counts)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_sessions, args.idle_timeout, store,
+                          prior=prior, prior_strength=args.prior_strength))
+    except KeyboardInterrupt:
+        print("\nサーバーを終了します。")
+    finally:
+        if store is not None:
+            store.close()
+        if prior is not None:
+            if args.prior_file is not None:
+                prior.save(args.prior_file)
+            prior.close()
+
+
+if __name__ == "__main__":
+    main()
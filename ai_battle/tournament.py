@@ -0,0 +1,223 @@
+"""複数のAI設定を総当たりで対戦させるトーナメント
+
+各組み合わせ×シードの対戦を ProcessPoolExecutor で並列に実行し、
+ワーカーからは勝敗数だけを受け取って親プロセスでリーダーボードにまとめる。
+各対戦のAIはそのシードから導出した独立した乱数列を使う（JankenBattle.reseed）ため、
+ワーカー数や実行順によらず結果は同じになる。
+
+実行方法:
+    python -m ai_battle.tournament --rounds 10000 --seeds 8 --bayesian 30:20 --bayesian 50:40 --pattern
+    python -m ai_battle.tournament --seeds 8 --master-seed 42   # シードをマスターシードから導出
+    python -m ai_battle.tournament --config configs.json   # AI設定を JSON ファイルから読み込む
+"""
+import inspect
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ai_battle.battle import JankenBattle
+from janken_core.rng import derive_seed
+from janken_core.strategy import create_strategy
+
+# 既定のパラメータグリッド
+DEFAULT_CONFIGS = [
+    {'type': 'bayesian', 'max_history': 30, 'decay_start': 20},
+    {'type': 'bayesian', 'max_history': 50, 'decay_start': 40},
+    {'type': 'bayesian', 'max_history': 100, 'decay_start': 50},
+    {'type': 'pattern'},
+]
+
+
+def config_name(config: Dict[str, Any]) -> str:
+    """AI設定の表示名を返す"""
+    if 'name' in config:
+        return config['name']
+    if config['type'] == 'bayesian':
+        from bayesian_ai.janken_ai import JankenAI
+        defaults = inspect.signature(JankenAI).parameters
+        max_history = config.get('max_history', defaults['max_history'].default)
+        decay_start = config.get('decay_start', defaults['decay_start'].default)
+        # スケジュールだけが違う設定が同じ名前にならないように、指定があれば名前に含める
+        extras = "".join(f", {config[key]}" for key in ('schedule', 'decay_rate') if config.get(key) is not None)
+        return f"ベイズAI({max_history}/{decay_start}{extras})"
+    if config['type'] == 'pattern':
+        patterns = config.get('patterns')
+        if patterns is None:
+            return "パターンAI"
+        if isinstance(patterns, dict):
+            patterns = ", ".join(f"{result}={''.join(map(str, sequence))}"
+                                 for result, sequence in patterns.items())
+        return f"パターンAI({patterns})"
+    options = ", ".join(f"{key}={value}" for key, value in config.items() if key != 'type')
+    return f"{config['type']}({options})" if options else config['type']
+
+
+def create_ai(config: Dict[str, Any]):
+    """AI設定からAIのインスタンスを作成
+
+    Args:
+        config: {'type': 'bayesian', 'max_history': 30, 'decay_start': 20} や {'type': 'pattern'} など
+            （'type' は戦略の名前、'type' と 'name' 以外はAIのコンストラクタに渡す）
+    """
+    options = {key: value for key, value in config.items() if key not in ('type', 'name')}
+    return create_strategy(config['type'], **options)
+
+
+def play_match(config1: Dict[str, Any], config2: Dict[str, Any],
+               n_rounds: int, seed: int) -> Tuple[int, int, int]:
+    """1つの組み合わせを1つのシードで対戦させる（ワーカープロセスで実行）
+
+    Returns:
+        Tuple[ai1の勝利数, ai2の勝利数, 引き分け数]
+    """
+    battle = JankenBattle(mode='aivsai', ai1=create_ai(config1), ai2=create_ai(config2))
+    scores = battle.simulate(n_rounds, seed=seed)
+    return scores['ai1'], scores['ai2'], scores['draw']
+
+
+def _play_task(task: Tuple[int, int, int, Dict[str, Any], Dict[str, Any], int, int]):
+    """ProcessPoolExecutor に渡すタスク（組み合わせの番号を付けて結果を返す）"""
+    i, j, seed_index, config1, config2, n_rounds, seed = task
+    return i, j, seed_index, play_match(config1, config2, n_rounds, seed)
+
+
+def run_tournament(configs: Sequence[Dict[str, Any]], n_rounds: int, seeds: Sequence[int],
+                   workers: Optional[int] = None) -> Dict[str, Any]:
+    """全ての組み合わせを全てのシードで対戦させて結果をまとめる
+
+    結果は各タスクのシードだけで決まるため、ワーカー数によらず同じになる。
+
+    Args:
+        configs: AI設定のリスト
+        n_rounds: 1試合あたりのラウンド数
+        seeds: 各組み合わせで使うシードのリスト
+        workers: ワーカープロセス数（Noneの場合はCPU数）
+
+    Returns:
+        Dict[str, Any]: 'leaderboard' と 'matches' を持つ辞書
+    """
+    tasks = [
+        (i, j, seed_index, configs[i], configs[j], n_rounds, seed)
+        for i, j in combinations(range(len(configs)), 2)
+        for seed_index, seed in enumerate(seeds)
+    ]
+
+    # matches[(i, j)][seed_index] = (ai1の勝利数, ai2の勝利数, 引き分け数)
+    matches = {pair: [None] * len(seeds) for pair in combinations(range(len(configs)), 2)}
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        results = map(_play_task, tasks)
+        for i, j, seed_index, counts in results:
+            matches[(i, j)][seed_index] = counts
+    else:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for i, j, seed_index, counts in executor.map(_play_task, tasks, chunksize=chunksize):
+                matches[(i, j)][seed_index] = counts
+
+    return {
+        'leaderboard': _build_leaderboard(configs, matches),
+        'matches': [
+            {
+                'ai1': config_name(configs[i]),
+                'ai2': config_name(configs[j]),
+                'ai1_wins': sum(c[0] for c in per_seed),
+                'ai2_wins': sum(c[1] for c in per_seed),
+                'draws': sum(c[2] for c in per_seed),
+                'ai1_win_rates': [c[0] / n_rounds if n_rounds else 0.0 for c in per_seed],
+            }
+            for (i, j), per_seed in matches.items()
+        ],
+    }
+
+
+def _build_leaderboard(configs: Sequence[Dict[str, Any]],
+                       matches: Dict[Tuple[int, int], List[Tuple[int, int, int]]]) -> List[Dict[str, Any]]:
+    """対戦結果をAIごとに集計して勝率順に並べる"""
+    totals = [{'name': config_name(config), 'wins': 0, 'losses': 0, 'draws': 0} for config in configs]
+    for (i, j), per_seed in matches.items():
+        for ai1_wins, ai2_wins, draws in per_seed:
+            totals[i]['wins'] += ai1_wins
+            totals[i]['losses'] += ai2_wins
+            totals[i]['draws'] += draws
+            totals[j]['wins'] += ai2_wins
+            totals[j]['losses'] += ai1_wins
+            totals[j]['draws'] += draws
+
+    for total in totals:
+        rounds = total['wins'] + total['losses'] + total['draws']
+        total['win_rate'] = total['wins'] / rounds if rounds else 0.0
+    return sorted(totals, key=lambda t: t['win_rate'], reverse=True)
+
+
+def print_leaderboard(results: Dict[str, Any]) -> None:
+    """リーダーボードを表示"""
+    print("\n=== リーダーボード ===")
+    for rank, row in enumerate(results['leaderboard'], 1):
+        print(f"{rank}. {row['name']}: 勝率 {row['win_rate']:.3f} "
+              f"({row['wins']}勝 {row['losses']}敗 {row['draws']}分)")
+
+    print("\n=== 対戦結果 ===")
+    for match in results['matches']:
+        rates = ", ".join(f"{rate:.3f}" for rate in match['ai1_win_rates'])
+        print(f"{match['ai1']} vs {match['ai2']}: "
+              f"{match['ai1_wins']}勝 {match['ai2_wins']}敗 {match['draws']}分 "
+              f"(シードごとの勝率: {rates})")
+
+
+def parse_bayesian(value: str) -> Dict[str, Any]:
+    """'max_history:decay_start' 形式の文字列をベイズAIの設定に変換"""
+    max_history, decay_start = value.split(':')
+    return {'type': 'bayesian', 'max_history': int(max_history), 'decay_start': int(decay_start)}
+
+
+def load_configs(path: str) -> List[Dict[str, Any]]:
+    """JSON ファイルからAI設定のリストを読み込む
+
+    例: [{"type": "bayesian", "max_history": 30, "decay_start": 20},
+         {"type": "pattern", "name": "逆回り", "patterns": {"win": "210", "lose": "120"}}]
+    """
+    import json
+
+    with open(path, encoding='utf-8') as f:
+        configs = json.load(f)
+    if not isinstance(configs, list) or not all(isinstance(c, dict) and 'type' in c for c in configs):
+        raise ValueError(f"AI設定は 'type' を持つオブジェクトのリストで指定してください: {path}")
+    return configs
+
+
+def main(argv=None):
+    # ワーカープロセスはこのモジュールを読み込むだけなので、argparse はここで読み込む
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AIの総当たりトーナメント")
+    parser.add_argument('--rounds', type=int, default=10_000, help="1試合あたりのラウンド数")
+    parser.add_argument('--seeds', type=int, default=4, help="組み合わせごとのシード数")
+    parser.add_argument('--master-seed', type=int, default=None,
+                        help="各シードを導出するマスターシード（省略時はシードに 0, 1, 2, ... を使う）")
+    parser.add_argument('--workers', type=int, default=None, help="ワーカープロセス数")
+    parser.add_argument('--bayesian', type=parse_bayesian, action='append', default=[],
+                        metavar='MAX_HISTORY:DECAY_START', help="参加させるベイズAIの設定")
+    parser.add_argument('--pattern', action='store_true', help="パターンAIを参加させる")
+    parser.add_argument('--config', default=None, metavar='PATH',
+                        help="参加させるAI設定のリストを書いた JSON ファイル（独自のパターンAIなど）")
+    args = parser.parse_args(argv)
+
+    configs = load_configs(args.config) if args.config else []
+    configs.extend(args.bayesian)
+    if args.pattern:
+        configs.append({'type': 'pattern'})
+    if not configs:
+        configs = DEFAULT_CONFIGS
+
+    if args.master_seed is None:
+        seeds = list(range(args.seeds))
+    else:
+        seeds = [derive_seed(args.master_seed, 'tournament', index) for index in range(args.seeds)]
+    results = run_tournament(configs, args.rounds, seeds, workers=args.workers)
+    print_leaderboard(results)
+
+
+if __name__ == "__main__":
+    main()
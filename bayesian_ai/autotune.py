@@ -0,0 +1,400 @@
+"""max_history / decay_start を対戦しながら自動で選ぶベイズAI
+
+JankenBattle は JankenAI(max_history=30, decay_start=20) を使い、クラスの既定値は 50 / 40 だが、
+相手によってどの長さの履歴が良いかは違う。AutoTuneJankenAI は複数の設定（シャドウ）を同じ手の流れで
+同時に学習させ、各シャドウが「もし自分の予測で手を出していたら」の勝率を記録する。
+いま使っている設定（ライブ）より明らかに勝率の高いシャドウがあれば、そのシャドウに切り替える。
+シャドウは切り替える前から同じ手の流れを学習しているので、切り替えた直後から予測できる。
+
+シャドウを JankenAI として並べると、履歴のリングバッファや入力の変換がシャドウの数だけ必要になる。
+ここでは次のように共有して、シャドウごとには遷移ごと（9個ずつ）の配列だけを持つ。
+
+    履歴       全シャドウで1つの遷移コードのリングバッファ（長さは最大の max_history）と、
+               同じ遷移が次に出現した通し番号を持つ。各シャドウは末尾の max_history 件を自分の履歴とみなす
+    出現回数   履歴内の遷移ごとの件数と最初に出現した通し番号は decay_start によらないので、
+               同じ max_history のシャドウで共有する（_Window）
+    重み       シャドウ（設定）ごとに持つ。linear では減衰区間に出入りする遷移だけを更新し（_Shadow）、
+               採点・学習・予測は1ラウンドにつき全シャドウを1回のループで行う
+
+各シャドウの重みと予測は、同じ設定の JankenAI に同じ手を学習させた場合と一致する
+（benchmarks/bench_autotune.py で確認できる）。共有するのは履歴と出現回数だけで、重みの更新・予測・採点は
+シャドウごとに Python のループで行うので、1ラウンドの時間はシャドウの数にほぼ比例する
+（20個で JankenAI 1個の約13倍、JankenAI を20個別々に動かす場合の約6割）。
+"""
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from bayesian_ai.decay import decay_table
+from janken_core.hands import BEATS, HANDS, OUTCOME, WIN, LOSE
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+
+
+# 相手の手に勝つ手・負ける手（仮の成績の採点用）
+_WIN_HAND = tuple(next(hand for hand in HANDS if OUTCOME[hand][opp] == WIN) for opp in HANDS)
+_LOSE_HAND = tuple(next(hand for hand in HANDS if OUTCOME[hand][opp] == LOSE) for opp in HANDS)
+# 最近の成績に足す量がこれを超えたら、全シャドウの最近の成績を割って1に戻す
+_RENORMALIZE = 1e100
+
+
+class TuneConfig(NamedTuple):
+    """シャドウの設定（JankenAI のコンストラクタ引数と同じ）"""
+    max_history: int
+    decay_start: int
+    schedule: str = 'linear'
+    decay_rate: Optional[float] = None
+
+
+# 既定のシャドウの設定（JankenBattle の 30/20 とクラスの既定値 50/40 を含む20個）
+DEFAULT_CONFIGS = (
+    (5, 3), (10, 5), (10, 8), (15, 10), (20, 10), (20, 15), (30, 10), (30, 20), (30, 25), (40, 30),
+    (50, 25), (50, 40), (50, 45), (60, 50), (80, 40), (80, 60), (100, 50), (100, 80), (150, 100), (200, 150),
+)
+
+
+def normalize_config(config: Any) -> TuneConfig:
+    """(max_history, decay_start[, schedule[, decay_rate]]) のタプル・リストや辞書を TuneConfig にする"""
+    if isinstance(config, dict):
+        return TuneConfig(**config)
+    return TuneConfig(*config)
+
+
+class _Window:
+    """同じ max_history のシャドウで共有する、履歴内の遷移ごとの件数と最初に出現した通し番号"""
+
+    __slots__ = ('max_history', 'size', 'occurrences', 'first_seq')
+
+    def __init__(self, max_history: int):
+        self.max_history = max_history
+        self.size = 0
+        self.occurrences = [0] * 9
+        self.first_seq = [0] * 9
+
+
+class _Shadow:
+    """1つの設定の重みと、仮の成績
+
+    linear では、インデックス j（0が最も古い）が減衰区間にある遷移の重みは scale - (j - decay_start + 1)、
+    つまり通し番号 s の遷移なら scale - s + offset（offset = 最も古い遷移の通し番号 + decay_start - 1）になる。
+    そこで遷移ごとに「減衰区間にある件数」と「その通し番号の合計」だけを持ち、重みは予測するときに
+    scale * 件数 - 通し番号の合計 + 減衰区間の件数 * offset で求める。履歴が1件ずれても
+    減衰区間に出入りする遷移は高々3件なので、JankenAI のように9個の重みを全て足し直す必要がない。
+    それ以外のスケジュールは JankenAI と同じく重みそのものを差分で更新する。
+    """
+
+    __slots__ = ('config', 'window', 'max_history', 'window_start', 'linear', 'scale', 'table', 'shifts',
+                 'weights', 'region_counts', 'region_sums', 'offset',
+                 'proposal', 'wins', 'losses', 'rounds', 'recent_wins', 'recent_rounds')
+
+    def __init__(self, config: TuneConfig, window: _Window):
+        self.config = config
+        self.window = window
+        self.max_history = config.max_history
+        # 減衰区間（インデックス >= decay_start）の開始位置
+        self.window_start = min(max(config.decay_start, 0), config.max_history)
+        self.linear = config.schedule == 'linear'
+        decay = decay_table(config.schedule, config.max_history, config.decay_start, config.decay_rate)
+        self.scale = decay.scale
+        self.table = decay.weights
+        self.shifts = decay.shifts
+        # linear 以外: 重み付き出現回数（scale 倍した整数）
+        self.weights = [0] * 9
+        # linear: 減衰区間にある遷移の件数と通し番号の合計
+        self.region_counts = [0] * 9
+        self.region_sums = [0] * 9
+        self.offset = self.window_start - 1
+        # 次のラウンドで出す予定の手（データがない場合は None）
+        self.proposal: Optional[int] = None
+        # 通算の仮の成績（proposal が None のラウンドは数えない）
+        self.wins = self.losses = self.rounds = 0
+        # 最近の仮の成績（古いラウンドほど score_decay 倍ずつ小さく数える、比だけに意味がある）
+        self.recent_wins = self.recent_rounds = 0.0
+
+    def scaled_weights(self) -> List[int]:
+        """遷移ごとの重み付き出現回数（scale 倍した整数、JankenAI._weights と同じ値）"""
+        if not self.linear:
+            return list(self.weights)
+        occurrences = self.window.occurrences
+        return [self.scale * occurrences[code] - self.region_sums[code] + self.region_counts[code] * self.offset
+                for code in range(9)]
+
+    def recent_win_rate(self) -> float:
+        """最近の仮の勝率（まだ予測していない場合は0）"""
+        return self.recent_wins / self.recent_rounds if self.recent_rounds else 0.0
+
+
+class AutoTuneJankenAI:
+    """複数の設定のベイズAIを同時に学習させ、最近の勝率が最も良い設定で手を出すAI"""
+
+    display_name = "自動調整ベイズAI"
+
+    def __init__(self, configs: Optional[Iterable[Any]] = None, initial: Any = (30, 20),
+                 score_decay: float = 0.95, margin: float = 0.1, min_rounds: int = 20, rng=None):
+        """
+        初期化
+
+        Args:
+            configs: シャドウの設定のリスト（(max_history, decay_start) など、Noneの場合は DEFAULT_CONFIGS）
+            initial: 最初に使う設定（configs にない場合は追加する）
+            score_decay: 最近の勝率を計算するときに、過去の成績を1ラウンドごとに減衰させる係数
+            margin: ライブより最近の勝率がこれだけ高いシャドウがあれば切り替える
+            min_rounds: 切り替えてから次に切り替えられるまでの最小ラウンド数
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+        """
+        self.hands = HANDS
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        self.score_decay = score_decay
+        self.margin = margin
+        self.min_rounds = min_rounds
+
+        configs = [normalize_config(config) for config in (DEFAULT_CONFIGS if configs is None else configs)]
+        initial = normalize_config(initial)
+        if initial not in configs:
+            configs.append(initial)
+        configs = list(dict.fromkeys(configs))
+        if any(config.max_history < 0 for config in configs):
+            raise ValueError("max_history は0以上にしてください")
+
+        windows: Dict[int, _Window] = {}
+        self._shadows: List[_Shadow] = []
+        for config in configs:
+            if config.max_history not in windows:
+                windows[config.max_history] = _Window(config.max_history)
+            self._shadows.append(_Shadow(config, windows[config.max_history]))
+        # 履歴が空の max_history = 0 は学習しない
+        self._windows = [window for window in windows.values() if window.max_history > 0]
+        self._live = self._shadows[configs.index(initial)]
+
+        # 全シャドウで共有する履歴（通し番号 % _capacity の位置に格納）
+        self._capacity = max(1, max(config.max_history for config in configs))
+        self._codes = array('b', bytes(self._capacity))
+        # 同じ遷移が次に出現した通し番号（古い遷移を捨てたときの順序の引き継ぎ用）
+        self._next_seq = array('q', bytes(8 * self._capacity))
+        # 遷移ごとに最後に出現した通し番号（未出現は -1）
+        self._last_seq = [-1] * 9
+        self._seq = 0
+
+        self.last_hand = None
+        self.rounds_played = 0
+        # 切り替えの記録: (ラウンド数, 切り替え前の設定, 切り替え後の設定)
+        self.switches: List[tuple] = []
+        self._last_switch = 0
+        # 最近の成績に足す量（1ラウンドごとに 1 / score_decay 倍になる）
+        self._gain = 1.0
+
+    @property
+    def config(self) -> TuneConfig:
+        """いま手を出すのに使っている設定"""
+        return self._live.config
+
+    @property
+    def configs(self) -> List[TuneConfig]:
+        """シャドウの設定の一覧"""
+        return [shadow.config for shadow in self._shadows]
+
+    def predict_next_hand(self):
+        """ライブの設定の予測に勝つ手を出す（データがない場合はランダム）
+
+        Returns:
+            Hand: 出す手
+        """
+        hand = self._live.proposal
+        return self._random_hand() if hand is None else hand
+
+    def update_model(self, user_hand):
+        """ユーザーの手を学習（JankenAI.update_model と同じく、直前の手をユーザーの手にする）
+
+        Args:
+            user_hand: ユーザーの手（整数コード 0〜2）
+        """
+        self._learn(user_hand, user_hand)
+
+    def _learn(self, opp: int, last_hand: int) -> None:
+        """相手の手で全シャドウを採点・学習し、直前の手を last_hand にして次の予測を作る
+
+        採点・学習・予測はシャドウごとに1回のループでまとめて行い、最近の勝率が最も高いシャドウが
+        ライブより margin 以上良ければ切り替える。
+        """
+        if not 0 <= opp <= 2:
+            return
+        seq = self._seq
+        capacity = self._capacity
+        codes = self._codes
+        code = None
+        if self.last_hand is not None and self._windows:
+            code = self.last_hand * 3 + opp
+            self._update_windows(code)
+        self.last_hand = last_hand
+        self.rounds_played += 1
+
+        # 最近の成績は、過去を score_decay 倍するかわりに今回の分を 1 / score_decay 倍ずつ大きくして足す
+        # （勝率は比なので同じになり、シャドウごとに掛け算をしなくて済む）
+        gain = self._gain / self.score_decay
+        if gain > _RENORMALIZE:
+            for shadow in self._shadows:
+                shadow.recent_wins /= gain
+                shadow.recent_rounds /= gain
+            gain = 1.0
+        self._gain = gain
+        win_hand = _WIN_HAND[opp]
+        lose_hand = _LOSE_HAND[opp]
+
+        base = last_hand * 3
+        middle = base + 1
+        top = base + 2
+        best_shadow = None
+        best_rate = -1.0
+        for shadow in self._shadows:
+            # 前回の予測を採点
+            proposal = shadow.proposal
+            if proposal is not None:
+                shadow.rounds += 1
+                shadow.recent_rounds += gain
+                if proposal == win_hand:
+                    shadow.wins += 1
+                    shadow.recent_wins += gain
+                elif proposal == lose_hand:
+                    shadow.losses += 1
+                rate = shadow.recent_wins / shadow.recent_rounds
+                if rate > best_rate:
+                    best_shadow, best_rate = shadow, rate
+
+            max_history = shadow.max_history
+            if not max_history:
+                continue
+            window = shadow.window
+            occurrences = window.occurrences
+
+            # 遷移を追加（共有の履歴はまだ書き換えていないので、捨てる遷移を読める）し、
+            # 直前の手の行の3つの重みを求める（履歴にない遷移は None）
+            if shadow.linear:
+                counts = shadow.region_counts
+                sums = shadow.region_sums
+                if code is not None:
+                    window_start = shadow.window_start
+                    if seq < max_history:
+                        # 末尾に追加するだけ（インデックス seq が減衰区間なら数える）
+                        if seq >= window_start:
+                            counts[code] += 1
+                            sums[code] += seq
+                    else:
+                        oldest = seq - max_history
+                        if window_start == 0:
+                            # 捨てる遷移は減衰区間にあった
+                            evicted = codes[oldest % capacity]
+                            counts[evicted] -= 1
+                            sums[evicted] -= oldest
+                        elif window_start < max_history:
+                            # インデックス decay_start にあった遷移は減衰区間の外に出る
+                            leaving = oldest + window_start
+                            leaving_code = codes[leaving % capacity]
+                            counts[leaving_code] -= 1
+                            sums[leaving_code] -= leaving
+                        if window_start < max_history:
+                            counts[code] += 1
+                            sums[code] += seq
+                        shadow.offset = oldest + window_start
+                offset = shadow.offset
+                scale = shadow.scale
+                occurrence = occurrences[base]
+                weight0 = scale * occurrence - sums[base] + counts[base] * offset if occurrence else None
+                occurrence = occurrences[middle]
+                weight1 = scale * occurrence - sums[middle] + counts[middle] * offset if occurrence else None
+                occurrence = occurrences[top]
+                weight2 = scale * occurrence - sums[top] + counts[top] * offset if occurrence else None
+            else:
+                weights = shadow.weights
+                if code is not None:
+                    table = shadow.table
+                    if seq < max_history:
+                        weights[code] += table[seq]
+                    else:
+                        weights[codes[(seq - max_history) % capacity]] -= table[0]
+                        oldest = seq - max_history + 1
+                        for index, delta in shadow.shifts:
+                            weights[codes[(oldest + index) % capacity]] += delta
+                        weights[code] += table[max_history - 1]
+                weight0 = weights[base] if occurrences[base] else None
+                weight1 = weights[middle] if occurrences[middle] else None
+                weight2 = weights[top] if occurrences[top] else None
+
+            # 次の予測（JankenAI.predict_next_hand と同じく、最も重みの大きい手、同じなら先に出現した手）
+            first_seq = window.first_seq
+            best_code, best_weight = (None, 0) if weight0 is None else (base, weight0)
+            if weight1 is not None and (best_code is None or weight1 > best_weight or (
+                    weight1 == best_weight and first_seq[middle] < first_seq[best_code])):
+                best_code, best_weight = middle, weight1
+            if weight2 is not None and (best_code is None or weight2 > best_weight or (
+                    weight2 == best_weight and first_seq[top] < first_seq[best_code])):
+                best_code = top
+            shadow.proposal = None if best_code is None else BEATS[best_code - base]
+
+        if code is not None:
+            # 共有の履歴に追加（前回の出現がまだバッファにあれば、次の出現として記録）
+            last = self._last_seq[code]
+            if last >= 0 and last > seq - capacity:
+                self._next_seq[last % capacity] = seq
+            self._last_seq[code] = seq
+            codes[seq % capacity] = code
+            self._seq = seq + 1
+
+        live = self._live
+        if (best_shadow is not None and best_shadow is not live
+                and self.rounds_played - self._last_switch >= self.min_rounds
+                and best_rate >= live.recent_win_rate() + self.margin):
+            self.switches.append((self.rounds_played, live.config, best_shadow.config))
+            self._live = best_shadow
+            self._last_switch = self.rounds_played
+
+    def _update_windows(self, code: int) -> None:
+        """同じ max_history のシャドウで共有する出現回数に遷移を1件追加する（古い遷移を捨てる）"""
+        seq = self._seq
+        capacity = self._capacity
+        codes = self._codes
+        for window in self._windows:
+            occurrences = window.occurrences
+            if window.size < window.max_history:
+                window.size += 1
+            else:
+                evicted_slot = (seq - window.max_history) % capacity
+                evicted = codes[evicted_slot]
+                occurrences[evicted] -= 1
+                if occurrences[evicted]:
+                    window.first_seq[evicted] = self._next_seq[evicted_slot]
+            if not occurrences[code]:
+                window.first_seq[code] = seq
+            occurrences[code] += 1
+
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = predict_next_hand
+
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を受け取り、全シャドウで学習
+
+        シャドウはそれぞれ別の手を予測していても、実際に出した手（own）からの遷移を学習する。
+
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        self._learn(opp, own)
+
+    def get_history_info(self):
+        """現在の状態を取得（デバッグ用）"""
+        return {
+            'config': tuple(self.config),
+            'rounds_played': self.rounds_played,
+            'switches': len(self.switches),
+            'shadows': [
+                {'config': tuple(shadow.config),
+                 'win_rate': shadow.wins / shadow.rounds if shadow.rounds else 0.0,
+                 'recent_win_rate': shadow.recent_win_rate()}
+                for shadow in self._shadows
+            ],
+        }
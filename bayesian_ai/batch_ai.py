@@ -0,0 +1,198 @@
+import numpy as np
+
+from bayesian_ai.decay import decay_table
+from janken_core.hands import BEATS
+
+class BatchJankenAI:
+    """B個の独立したベイズ推論AI（JankenAI）をまとめて1回の配列演算で進めるクラス
+
+    全てのゲームは同じタイミングで1手ずつ進む（ロックステップ）前提で、
+    履歴の長さや通し番号はゲーム間で共有する。
+    """
+
+    def __init__(self, batch_size, max_history=50, decay_start=40, rng=None,
+                 schedule='linear', decay_rate=None):
+        """
+        初期化
+
+        Args:
+            batch_size: 同時に扱うゲーム数
+            max_history: 保持する最大履歴数
+            decay_start: 重みの減衰を開始するインデックス
+            rng: データがないときの手を選ぶ numpy.random.Generator（省略時は新規作成）
+            schedule: 重みの減衰スケジュール（JankenAI と同じ）
+            decay_rate: 減衰の強さ（JankenAI と同じ）
+        """
+        self.batch_size = batch_size
+        self.max_history = max_history
+        self.decay_start = decay_start
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        # JankenAI と同じく、重みは 1/_scale 単位の整数で保持し、同じ表を使う
+        self._decay = decay_table(schedule, max_history, decay_start, decay_rate)
+        self._scale = self._decay.scale
+        self._window_start = min(max(decay_start, 0), max_history)
+        self._uniform_shift = schedule == 'linear'
+        self._weight_table = np.array(self._decay.weights, dtype=np.int64)
+
+        self._rows = np.arange(batch_size)
+        # 遷移 (prev, curr) は prev * 3 + curr の整数コードで扱う
+        self._weights = np.zeros((batch_size, 9), dtype=np.int64)
+        self._window_counts = np.zeros((batch_size, 9), dtype=np.int64)
+        self._occurrences = np.zeros((batch_size, 9), dtype=np.int64)
+        self._first_seq = np.zeros((batch_size, 9), dtype=np.int64)
+        self._last_seq = np.zeros((batch_size, 9), dtype=np.int64)
+
+        # 履歴のリングバッファ（通し番号 % max_history の位置に格納）
+        self._codes = np.zeros((batch_size, max_history), dtype=np.int8)
+        self._next_seq = np.zeros((batch_size, max_history), dtype=np.int64)
+        self._seq = 0
+        self._size = 0
+
+        # 直前の手（まだない場合は -1）
+        self.last_hand = np.full(batch_size, -1, dtype=np.int8)
+
+        self._beats = np.array(BEATS, dtype=np.int8)
+
+        # 1次元のビューと、各ゲームの行の先頭位置
+        self._weights_flat = self._weights.reshape(-1)
+        self._window_counts_flat = self._window_counts.reshape(-1)
+        self._occurrences_flat = self._occurrences.reshape(-1)
+        self._first_seq_flat = self._first_seq.reshape(-1)
+        self._last_seq_flat = self._last_seq.reshape(-1)
+        self._next_seq_flat = self._next_seq.reshape(-1)
+        self._offsets9 = self._rows * 9
+        self._offsets_history = self._rows * max_history
+
+    @property
+    def weights(self):
+        """重み付きの遷移回数を (B, 3, 3) の配列で返す（weights[b, prev, curr]）"""
+        return (self._weights / self._scale).reshape(self.batch_size, 3, 3)
+
+    def _append_transitions(self, codes):
+        """全ゲームに遷移を1件ずつ追加し、重みを差分だけ更新する
+
+        (B, 9) や (B, max_history) の配列は1次元のビューに行の先頭位置を足した添字で参照する
+        （2次元の添字や真偽値での絞り込みより速い）
+
+        Args:
+            codes: 遷移コード（prev * 3 + curr）の配列 (B,)
+        """
+        max_history = self.max_history
+        seq = self._seq
+        slot = seq % max_history
+        weights = self._weights_flat
+        window_counts = self._window_counts_flat
+        occurrences = self._occurrences_flat
+        first_seq = self._first_seq_flat
+        table = self._weight_table
+        index = self._offsets9 + codes
+
+        if self._size < max_history:
+            weights[index] += table[self._size]
+            if self._size >= self._window_start:
+                window_counts[index] += 1
+            self._size += 1
+        else:
+            # 最も古い遷移（インデックス0）を捨てる
+            evicted = self._offsets9 + self._codes[:, slot]
+            weights[evicted] -= table[0]
+            if self._window_start == 0:
+                window_counts[evicted] -= 1
+            occurrences[evicted] -= 1
+            first_seq[evicted] = np.where(occurrences[evicted] > 0, self._next_seq[:, slot], first_seq[evicted])
+
+            if self._uniform_shift:
+                # 減衰区間にある遷移はインデックスが1つ前にずれて重みが 1/_scale 増える
+                self._weights += self._window_counts
+                if 0 < self._window_start < max_history:
+                    leaving = self._codes[:, (seq - max_history + self._window_start) % max_history]
+                    window_counts[self._offsets9 + leaving] -= 1
+            else:
+                # 表で隣と重みが違うインデックスに来た遷移だけ、その差を足す
+                oldest = seq - max_history + 1
+                for shift_index, delta in self._decay.shifts:
+                    weights[self._offsets9 + self._codes[:, (oldest + shift_index) % max_history]] += delta
+
+            weights[index] += table[max_history - 1]
+            if max_history - 1 >= self._window_start:
+                window_counts[index] += 1
+
+        # 出現順を記録（同じ重みのときは先に出現した手を優先するため）
+        # 初めて出現した遷移は first_seq を、それ以外は前回の出現の next_seq を seq にする
+        seen = occurrences[index] > 0
+        link = self._offsets_history + self._last_seq_flat[index] % max_history
+        next_seq = self._next_seq_flat
+        next_seq[link] = np.where(seen, seq, next_seq[link])
+        first_seq[index] = np.where(seen, first_seq[index], seq)
+        self._last_seq_flat[index] = seq
+        occurrences[index] += 1
+
+        self._codes[:, slot] = codes
+        self._seq = seq + 1
+
+    def update(self, hands):
+        """全ゲームの相手の手を学習データとしてモデルを更新
+
+        Args:
+            hands: 各ゲームの相手の手（整数コード 0〜2）の配列 (B,)
+        """
+        hands = np.asarray(hands, dtype=np.int64)
+        if self.max_history > 0 and self.last_hand[0] >= 0:
+            self._append_transitions(self.last_hand.astype(np.int64) * 3 + hands)
+        self.last_hand = hands.astype(np.int8)
+
+    def observe(self, own, opp):
+        """全ゲームのラウンドの結果を学習（JankenAI.observe と同じく、直前の自分の手 -> 相手の手 を記録）
+
+        Args:
+            own: 各ゲームで自分が出した手の配列 (B,)
+            opp: 各ゲームで相手が出した手の配列 (B,)
+        """
+        if self.max_history > 0 and self.last_hand[0] >= 0:
+            self._append_transitions(self.last_hand.astype(np.int64) * 3 + opp)
+        self.last_hand = np.asarray(own, dtype=np.int8)
+
+    def _random_hands(self, missing):
+        """missing が True のゲームの手をランダムに選ぶ"""
+        return self.rng.integers(0, 3, size=int(missing.sum()), dtype=np.int8)
+
+    def predict(self, random_hands=None):
+        """全ゲームについて相手の次の手を予測し、それに勝つ手を返す
+
+        Args:
+            random_hands: データがないゲームの手を選ぶ関数（ゲームごとの真偽値の配列を受け取り、
+                True のゲームの手を返す、省略時は rng から選ぶ）
+
+        Returns:
+            numpy.ndarray: 各ゲームで出す手（整数コード）の配列 (B,)
+        """
+        random_hands = random_hands or self._random_hands
+        if self.last_hand[0] < 0:
+            return random_hands(np.ones(self.batch_size, dtype=bool))
+
+        # 直前の手から続く3通りの遷移を順に比べ、最も重みの大きい手（同じ重みなら履歴内で先に出現した手）を選ぶ
+        base = self._offsets9 + self.last_hand.astype(np.int64) * 3
+        occurrences, weights, first_seq = self._occurrences_flat, self._weights_flat, self._first_seq_flat
+        best_present = occurrences[base] > 0
+        best_weight = weights[base]
+        best_first = first_seq[base]
+        predicted = np.zeros(self.batch_size, dtype=np.int8)
+        for offset in (1, 2):
+            index = base + offset
+            present = occurrences[index] > 0
+            weight = weights[index]
+            first = first_seq[index]
+            better = present & (~best_present | (weight > best_weight)
+                                | ((weight == best_weight) & (first < best_first)))
+            predicted[better] = offset
+            best_present |= present
+            best_weight = np.where(better, weight, best_weight)
+            best_first = np.where(better, first, best_first)
+
+        hands = self._beats[predicted]
+        # 十分なデータがないゲームはランダムに選択
+        missing = ~best_present
+        if missing.any():
+            hands[missing] = random_hands(missing)
+        return hands
@@ -0,0 +1,92 @@
+"""ベイズ推論AIの重みの減衰スケジュール
+
+履歴のインデックス（0が最も古い）ごとの重みを整数の表として一度だけ計算し、
+同じ設定（スケジュール, max_history, decay_start, decay_rate）のAIで同じ表を共有する。
+
+    linear       decay_start 以降、1件ごとに同じ量だけ重みが下がる（従来の _calculate_weight）
+    exponential  decay_start 以降、1件ごとに重みが decay_rate 倍になる（既定 0.9）
+    step         decay_start 以降の重みが一律 decay_rate になる（既定 0.5）
+
+独自のスケジュールは register_schedule で追加できる。
+"""
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# linear 以外のスケジュールで、重み1.0を表す整数
+TABLE_SCALE = 1 << 16
+
+
+class DecayTable(NamedTuple):
+    """インデックスごとの重みの表（同じ設定のAIで共有する）"""
+    # 重み1.0に当たる整数
+    scale: int
+    # weights[index] = インデックスの重み（scale 倍した整数）
+    weights: Tuple[int, ...]
+    # 最も古い履歴を捨てて全体が1つ前にずれたときに重みが変わる (新しいインデックス, 増分) の一覧
+    shifts: Tuple[Tuple[int, int], ...]
+
+
+def _linear(max_history: int, decay_start: int, decay_rate: Optional[float]) -> Tuple[int, List[int]]:
+    scale = max(1, max_history - decay_start + 1)
+    return scale, [scale if index < decay_start else max(0, scale - (index - decay_start + 1))
+                   for index in range(max_history)]
+
+
+def _exponential(max_history: int, decay_start: int, decay_rate: Optional[float]) -> Tuple[int, List[int]]:
+    rate = 0.9 if decay_rate is None else decay_rate
+    return TABLE_SCALE, [TABLE_SCALE if index < decay_start
+                         else round(TABLE_SCALE * rate ** (index - decay_start + 1))
+                         for index in range(max_history)]
+
+
+def _step(max_history: int, decay_start: int, decay_rate: Optional[float]) -> Tuple[int, List[int]]:
+    weight = round(TABLE_SCALE * (0.5 if decay_rate is None else decay_rate))
+    return TABLE_SCALE, [TABLE_SCALE if index < decay_start else weight for index in range(max_history)]
+
+
+# スケジュールの名前 -> (max_history, decay_start, decay_rate) から (scale, 重みのリスト) を返す関数
+_SCHEDULES: Dict[str, Callable[[int, int, Optional[float]], Tuple[int, List[int]]]] = {
+    'linear': _linear,
+    'exponential': _exponential,
+    'step': _step,
+}
+
+
+def register_schedule(name: str, function: Callable[[int, int, Optional[float]], Tuple[int, List[int]]]) -> None:
+    """減衰スケジュールを登録
+
+    Args:
+        name: スケジュールの名前
+        function: (max_history, decay_start, decay_rate) を受け取り、
+            (重み1.0に当たる整数, インデックスごとの重みの整数のリスト) を返す関数
+    """
+    _SCHEDULES[name] = function
+    decay_table.cache_clear()
+
+
+def available_schedules():
+    """登録されているスケジュールの名前の一覧を返す"""
+    return sorted(_SCHEDULES)
+
+
+@lru_cache(maxsize=None)
+def decay_table(schedule: str = 'linear', max_history: int = 50, decay_start: int = 40,
+                decay_rate: Optional[float] = None) -> DecayTable:
+    """設定に対応する重みの表を返す（同じ設定なら同じオブジェクト）
+
+    Args:
+        schedule: スケジュールの名前
+        max_history: 保持する最大履歴数
+        decay_start: 重みの減衰を開始するインデックス
+        decay_rate: スケジュールごとの減衰の強さ（Noneの場合は既定値）
+    """
+    if schedule not in _SCHEDULES:
+        raise ValueError(f"不明な減衰スケジュールです: {schedule}")
+    scale, weights = _SCHEDULES[schedule](max_history, decay_start, decay_rate)
+    weights = tuple(int(weight) for weight in weights)
+    if len(weights) != max_history or any(weight < 0 for weight in weights):
+        raise ValueError(f"減衰スケジュール {schedule} の重みの表が不正です")
+    shifts = tuple((index, weights[index] - weights[index + 1])
+                   for index in range(max_history - 1)
+                   if weights[index] != weights[index + 1])
+    return DecayTable(scale, weights, shifts)
@@ -0,0 +1,172 @@
+from array import array
+
+from janken_core.hands import HANDS, BEATS
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+
+class HistoryMatchJankenAI:
+    """相手の直近の手の並びと最も長く一致する過去の並びを探し、その次に出た手から予測するAI
+
+    相手の手の列の接尾辞オートマトン（suffix automaton）を1手ずつ追加しながら作る。
+    列全体を表す状態の接尾辞リンクは「それより前にも出現した、最も長い接尾辞」を表すので、
+    その状態の以前の出現位置の次の手を予測に使う。出現位置は状態ごとに1つだけ持ち、その状態と一致したときに
+    いまの位置に更新する。接尾辞リンクをたどった先の短い状態までは更新しないので、使う出現は
+    最も新しいものとは限らない（全て更新すると、同じ並びを繰り返す相手では1手ごとに履歴の長さに比例する時間がかかる）。
+    追加も予測も1手あたり償却O(1)で、履歴を走査しないため、何百万手の履歴でも1手の時間は変わらない。
+
+    状態の数は履歴の手数の2倍以下で、各状態は遷移（3個）・接尾辞リンク・長さ・最後の出現位置を
+    整数の配列に持つ。手数が max_history に達したら、直近 keep 手だけでオートマトンを作り直す
+    （作り直しは max_history - keep 手ごとなので、これも1手あたり償却O(1)）。
+    """
+
+    display_name = "履歴照合AI"
+
+    def __init__(self, max_history=100_000, keep=None, min_match=1, rng=None):
+        """
+        初期化
+
+        Args:
+            max_history: 保持する最大履歴数（手数）
+            keep: 作り直すときに残す直近の手数（Noneの場合は max_history の半分）
+            min_match: 予測に使う一致の最小の長さ（これより短い場合はランダム）
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+        """
+        if max_history < 2:
+            raise ValueError("max_history は2以上を指定してください")
+        keep = max_history // 2 if keep is None else keep
+        if not 0 <= keep < max_history:
+            raise ValueError("keep は0以上 max_history 未満を指定してください")
+
+        self.hands = HANDS
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        self.max_history = max_history
+        self.keep = keep
+        self.min_match = min_match
+
+        # 予測した相手の次の手（データがない場合は None）と、そのときの一致の長さ・一致した以前の出現位置
+        self._predicted = None
+        self.match_length = 0
+        self._match_end = -1
+        # 作り直した回数
+        self.rebuilds = 0
+        self._reset(array('b'))
+
+    def _reset(self, moves):
+        """moves（相手の手の列）だけからオートマトンを作り直す"""
+        # 状態0は空の列（初期状態）
+        # _next[state * 3 + hand] = 遷移先の状態（なしは -1）
+        self._next = array('i', [-1, -1, -1])
+        self._link = array('i', [-1])
+        self._length = array('i', [0])
+        # 状態が表す列が以前に出現した位置（列の最後の手の位置。最も新しい出現とは限らない）
+        self._end = array('i', [-1])
+        self._last = 0
+        self._moves = array('b')
+        for hand in moves:
+            self._extend(hand)
+
+    def _extend(self, hand):
+        """相手の手を1つ追加し、それより前にも出現した最も長い接尾辞の次の手を返す（なければ None）"""
+        moves = self._moves
+        position = len(moves)
+        moves.append(hand)
+        next_state, link, length, end = self._next, self._link, self._length, self._end
+
+        current = len(link)
+        length.append(length[self._last] + 1)
+        link.append(0)
+        end.append(position)
+        next_state.extend((-1, -1, -1))
+
+        state = self._last
+        while state != -1 and next_state[state * 3 + hand] == -1:
+            next_state[state * 3 + hand] = current
+            state = link[state]
+        if state != -1:
+            target = next_state[state * 3 + hand]
+            if length[state] + 1 == length[target]:
+                link[current] = target
+            else:
+                # target を分割し、短い側（長さ length[state] + 1）の状態を作る
+                clone = len(link)
+                length.append(length[state] + 1)
+                link.append(link[target])
+                end.append(end[target])
+                base = target * 3
+                next_state.extend(next_state[base:base + 3])
+                while state != -1 and next_state[state * 3 + hand] == target:
+                    next_state[state * 3 + hand] = clone
+                    state = link[state]
+                link[target] = clone
+                link[current] = clone
+        self._last = current
+
+        # 接尾辞リンクの先は、いまの位置より前にも出現した最も長い接尾辞
+        suffix = link[current]
+        self.match_length = length[suffix]
+        previous = end[suffix]
+        # 出現位置をいまの位置に更新する（次にこの状態と一致したときは、いまの出現の次の手を使う）
+        end[suffix] = position
+        if suffix == 0:
+            self._match_end = -1
+            return None
+        self._match_end = previous
+        return moves[previous + 1]
+
+    def update_model(self, user_hand):
+        """ユーザーの手を学習データとしてモデルを更新
+
+        Args:
+            user_hand: ユーザーの手（整数コード 0〜2）
+        """
+        if not 0 <= user_hand <= 2:
+            return
+
+        if len(self._moves) >= self.max_history:
+            # 古い手を捨てて、直近 keep 手だけで作り直す
+            self._reset(self._moves[len(self._moves) - self.keep:])
+            self.rebuilds += 1
+        predicted = self._extend(user_hand)
+        self._predicted = predicted if self.match_length >= self.min_match else None
+
+    def predict_next_hand(self):
+        """ユーザーの次の手を予測
+
+        Returns:
+            Hand: 予測に基づいた手
+        """
+        if self._predicted is None:
+            # 一致する並びがない場合はランダムに選択
+            return self._random_hand()
+        # 予測した手に勝つ手を選択
+        return BEATS[self._predicted]
+
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = predict_next_hand
+
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を受け取り、相手の手を学習
+
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        self.update_model(opp)
+
+    def get_history_info(self):
+        """現在の履歴情報を取得（デバッグ用）"""
+        return {
+            'history_size': len(self._moves),
+            'states': len(self._link),
+            'match_length': self.match_length,
+            'rebuilds': self.rebuilds,
+            # オートマトンと履歴の配列の大きさ（バイト）
+            'table_bytes': sum(len(table) * table.itemsize
+                               for table in (self._next, self._link, self._length, self._end, self._moves)),
+        }
@@ -1,30 +1,82 @@
-import numpy as np
+from array import array
 from collections import defaultdict, deque
-import random
+import math
+import struct
+
+from bayesian_ai.decay import decay_table
+from janken_core.hands import HANDS, BEATS, INPUT_TO_HAND, LABEL_TO_HAND
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+from janken_core.snapshot import HEADER, KIND_BAYESIAN, pack_header, unpack_header
+
+# スナップショット本体: max_history, decay_start, 減衰スケジュールの名前, decay_rate（なしはNaN）,
+# last_hand（なしは-1）, 履歴数, 重み付き遷移回数（_scale 倍）9個
+# このあとに履歴の遷移コードが古い順に1バイトずつ続く
+_SNAPSHOT_BODY = struct.Struct('<ii16sdbxI9q')
+# バージョン1の本体（減衰スケジュールなし = linear）
+_SNAPSHOT_BODY_V1 = struct.Struct('<iibxI9q')
 
 class JankenAI:
-    def __init__(self, max_history=50, decay_start=40):
+    display_name = "ベイズAI"
+    
+    def __init__(self, max_history=50, decay_start=40, schedule='linear', decay_rate=None, rng=None,
+                 prior=None, prior_strength=1.0):
         """
         初期化
         
         Args:
             max_history: 保持する最大履歴数
             decay_start: 重みの減衰を開始するインデックス
+            schedule: 重みの減衰スケジュール（'linear', 'exponential', 'step'）
+            decay_rate: 減衰の強さ（exponential: 1件ごとの倍率, step: 減衰区間の重み、Noneの場合は既定値）
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+            prior: 集団の事前分布（PopulationPrior など alphas(strength) を持つもの、Noneの場合は使わない）
+            prior_strength: 事前分布の強さ（直前の手ごとの擬似的な回数の合計）
         """
-        # 手の定義（絵文字付き）
-        self.hands = ['✊ グー', '✌️ チョキ', '✋ パー']
-        self.hand_to_num = {'✊ グー': 0, '✌️ チョキ': 1, '✋ パー': 2}
-        self.num_to_hand = {0: '✊ グー', 1: '✌️ チョキ', 2: '✋ パー'}
-        self.input_to_hand = {'1': '✊ グー', '2': '✌️ チョキ', '3': '✋ パー'}
-        
-        # マルコフ連鎖の遷移確率を保持する辞書
-        # transition_counts[(prev_hand, current_hand)] = 重み付き出現回数
-        self.transition_counts = defaultdict(lambda: defaultdict(float))
-        
-        # 履歴を保持するキュー
-        self.history = deque(maxlen=max_history)
+        # 手の定義（整数コード 0: グー, 1: チョキ, 2: パー）
+        self.hands = HANDS
+        
+        # 乱数生成器（インスタンスごとに持ち、random モジュールの状態は使わない）
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        
+        # 集団の事前分布（共有されているものを参照するだけで、コピーしない）
+        self.prior = prior
+        self.prior_strength = prior_strength
+        
+        # 履歴の設定
         self.max_history = max_history
         self.decay_start = decay_start
+        self.schedule = schedule
+        self.decay_rate = decay_rate
+        
+        # インデックスごとの重みの表（同じ設定のAIで共有する）
+        # 重みは 1/_scale 単位の整数で保持する（浮動小数の誤差で予測が変わらないように）
+        self._decay = decay_table(schedule, max_history, decay_start, decay_rate)
+        self._table = self._decay.weights
+        self._scale = self._decay.scale
+        # linear では減衰区間の重みが1件ごとに 1/_scale ずつ下がるので、
+        # 履歴がずれたときは減衰区間の件数を足すだけで済む
+        self._uniform_shift = schedule == 'linear'
+        # 減衰区間（インデックス >= decay_start）の開始位置
+        self._window_start = min(max(decay_start, 0), max_history)
+        
+        # 遷移 (prev, curr) は prev * 3 + curr の整数コードで扱う
+        # _weights[code] = 重み付き出現回数（_scale 倍した整数）
+        self._weights = [0] * 9
+        # 減衰区間に入っている遷移の件数
+        self._window_counts = [0] * 9
+        # 履歴内の遷移ごとの件数と、最初・最後に出現した通し番号
+        self._occurrences = [0] * 9
+        self._first_seq = [0] * 9
+        self._last_seq = [0] * 9
+        
+        # 履歴を保持するリングバッファ（通し番号 % max_history の位置に格納）
+        self._codes = array('b', bytes(max_history))
+        # 同じ遷移が次に出現した通し番号（古い遷移を捨てたときの順序の引き継ぎ用）
+        self._next_seq = array('q', bytes(8 * max_history))
+        # これまでに追加した遷移の総数
+        self._seq = 0
+        self._size = 0
         
         # 直前の手を記録
         self.last_hand = None
@@ -38,42 +90,97 @@ class JankenAI:
         Returns:
             float: 計算された重み（0.0 〜 1.0）
         """
-        if index < self.decay_start:
-            return 1.0
-        # 20件目から30件目にかけて重みを1.0から0.0まで直線的に減少
-        weight = 1.0 - (index - self.decay_start + 1) / (self.max_history - self.decay_start + 1)
-        return max(0.0, weight)
+        return self._table[index] / self._scale
+    
+    def _scaled_weight(self, index):
+        """_calculate_weight(index) を _scale 倍した整数を返す"""
+        return self._table[index]
+    
+    def _append_transition(self, code):
+        """遷移を1件追加し、重みを差分だけ更新する（履歴の長さによらずO(1)）
+        
+        Args:
+            code: 遷移コード（prev * 3 + curr）
+        """
+        seq = self._seq
+        max_history = self.max_history
+        slot = seq % max_history
+        table = self._table
+        weights = self._weights
+        window_counts = self._window_counts
+        window_start = self._window_start
+        
+        if self._size < max_history:
+            # 末尾に追加するだけなので既存の遷移の重みは変わらない
+            weights[code] += table[self._size]
+            if self._size >= window_start:
+                window_counts[code] += 1
+            self._size += 1
+        else:
+            # 最も古い遷移（インデックス0）を捨てる
+            evicted = self._codes[slot]
+            weights[evicted] -= table[0]
+            if window_start == 0:
+                window_counts[evicted] -= 1
+            self._occurrences[evicted] -= 1
+            if self._occurrences[evicted]:
+                self._first_seq[evicted] = self._next_seq[slot]
+            
+            # 残りの遷移はインデックスが1つずつ前にずれる
+            oldest = seq - max_history + 1
+            if self._uniform_shift:
+                # 減衰区間にある遷移はそれぞれ 1/_scale だけ重みが増える
+                for i in range(9):
+                    weights[i] += window_counts[i]
+                # インデックス decay_start にあった遷移は減衰区間の外に出る
+                if 0 < window_start < max_history:
+                    window_counts[self._codes[(oldest + window_start - 1) % max_history]] -= 1
+            else:
+                # 表で隣と重みが違うインデックスに来た遷移だけ、その差を足す
+                codes = self._codes
+                for index, delta in self._decay.shifts:
+                    weights[codes[(oldest + index) % max_history]] += delta
+            
+            # 新しい遷移をインデックス max_history - 1 に追加
+            weights[code] += table[max_history - 1]
+            if max_history - 1 >= window_start:
+                window_counts[code] += 1
+        
+        # 出現順を記録（同じ重みのときは先に出現した手を優先するため）
+        if self._occurrences[code]:
+            self._next_seq[self._last_seq[code] % self.max_history] = seq
+        else:
+            self._first_seq[code] = seq
+        self._last_seq[code] = seq
+        self._occurrences[code] += 1
+        
+        self._codes[slot] = code
+        self._seq = seq + 1
     
     def update_model(self, user_hand):
         """ユーザーの手を学習データとしてモデルを更新
         
         Args:
-            user_hand: ユーザーの手（文字列または数値インデックス）
+            user_hand: ユーザーの手（整数コード、入力文字列または表示ラベル）
         """
-        # 手の形式を統一（数値インデックスの場合は文字列に変換）
-        if isinstance(user_hand, int) and 0 <= user_hand <= 2:
-            user_hand = self.num_to_hand[user_hand]
-        elif user_hand in ['0', '1', '2']:
-            user_hand = self.num_to_hand[int(user_hand)]
-        elif user_hand in self.input_to_hand:
-            user_hand = self.input_to_hand[user_hand]
-            
-        # 手が有効でない場合は無視
-        if user_hand not in self.hand_to_num:
+        # 手の形式を整数コードに統一
+        if isinstance(user_hand, int):
+            if not 0 <= user_hand <= 2:
+                return
+        elif user_hand in ('0', '1', '2'):
+            user_hand = int(user_hand)
+        elif user_hand in INPUT_TO_HAND:
+            user_hand = INPUT_TO_HAND[user_hand]
+        elif user_hand in LABEL_TO_HAND:
+            user_hand = LABEL_TO_HAND[user_hand]
+        else:
+            # 手が有効でない場合は無視
             return
         
         # 履歴に追加
-        if self.last_hand is not None:
-            self.history.append((self.last_hand, user_hand))
-            
-            # 遷移確率を更新
-            # 古い遷移確率をリセット
-            self.transition_counts = defaultdict(lambda: defaultdict(float))
-            
-            # 履歴を元に重み付きで遷移確率を再計算
-            for i, (prev, curr) in enumerate(self.history):
-                weight = self._calculate_weight(i)
-                self.transition_counts[prev][curr] += weight
+        if self.last_hand is not None and self.max_history > 0:
+            code = self.last_hand * 3 + user_hand
+            self._append_transition(code)
         
         self.last_hand = user_hand
     
@@ -81,34 +188,187 @@ class JankenAI:
         """ユーザーの次の手を予測
         
         Returns:
-            str: 予測に基づいた手（絵文字付き）
+            Hand: 予測に基づいた手
         """
-        if self.last_hand is None or not self.transition_counts[self.last_hand]:
+        if self.last_hand is None:
             # 十分なデータがない場合はランダムに選択
-            return random.choice(self.hands)
-            
-        try:
-            # 直前の手から次に出そうな手を予測
-            next_hand_probs = self.transition_counts[self.last_hand]
-            if not next_hand_probs:
-                return random.choice(self.hands)
-                
-            # 最も確率の高い手を選択
-            next_hand = max(next_hand_probs.items(), key=lambda x: x[1])[0]
-            
-            # 予測した手に勝つ手を選択
-            predicted_hand_num = self.hand_to_num[next_hand]
-            # グー(0) < パー(2), チョキ(1) < グー(0), パー(2) < チョキ(1)
-            winning_hand_num = (predicted_hand_num - 1) % 3
-            return self.num_to_hand[winning_hand_num]
+            return self._random_hand()
+        if self.prior is not None:
+            return self._predict_with_prior()
+        
+        # 直前の手から次に出そうな手を予測
+        # 最も重みの大きい手を選択（同じ重みなら履歴内で先に出現した手）
+        base = self.last_hand * 3
+        best_code = None
+        for code in range(base, base + 3):
+            if not self._occurrences[code]:
+                continue
+            if (best_code is None
+                    or self._weights[code] > self._weights[best_code]
+                    or (self._weights[code] == self._weights[best_code]
+                        and self._first_seq[code] < self._first_seq[best_code])):
+                best_code = code
+        
+        if best_code is None:
+            return self._random_hand()
+        
+        # 予測した手に勝つ手を選択
+        return BEATS[best_code - base]
+    
+    def _predict_with_prior(self):
+        """集団の事前分布をディリクレ事前分布として足した回数から予測
+        
+        事後分布の平均は（重み付き回数 + 事前分布のパラメータ）に比例するので、その最大の手を選ぶ
+        （同じ値なら履歴内で先に出現した手、履歴にない手どうしなら手の番号順）
+        """
+        alphas = self.prior.alphas(self.prior_strength)
+        base = self.last_hand * 3
+        scale = self._scale
+        best_code = None
+        best_score = 0.0
+        for code in range(base, base + 3):
+            score = self._weights[code] / scale + alphas[code]
+            if score <= 0:
+                continue
+            if (best_code is None or score > best_score
+                    or (score == best_score and self._occurrences[code]
+                        and (not self._occurrences[best_code]
+                             or self._first_seq[code] < self._first_seq[best_code]))):
+                best_code, best_score = code, score
+        
+        if best_code is None:
+            return self._random_hand()
+        return BEATS[best_code - base]
+    
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = predict_next_hand
+    
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+    
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を学習
+        
+        相手の手を学習したあと、直前の手を自分が出した手に置き換える（従来の JankenBattle と同じ動作）
+        
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        if self.last_hand is not None and self.max_history > 0:
+            self._append_transition(self.last_hand * 3 + opp)
+        self.last_hand = own
+    
+    def to_snapshot(self):
+        """学習状態をスナップショット（bytes）に変換
+        
+        Returns:
+            bytes: ヘッダー、設定、3x3の重み、履歴の遷移コードを並べたもの
+        """
+        start = self._seq - self._size
+        if self._size and start % self.max_history:
+            # リングバッファを古い順に並べ直す
+            split = start % self.max_history
+            codes = self._codes[split:] + self._codes[:split]
+        else:
+            codes = self._codes[:self._size]
+        last_hand = -1 if self.last_hand is None else int(self.last_hand)
+        decay_rate = math.nan if self.decay_rate is None else self.decay_rate
+        return (pack_header(KIND_BAYESIAN)
+                + _SNAPSHOT_BODY.pack(self.max_history, self.decay_start, self.schedule.encode(),
+                                      decay_rate, last_hand, self._size, *self._weights)
+                + codes.tobytes())
+    
+    @classmethod
+    def from_snapshot(cls, data, max_history=None, decay_start=None, schedule=None, decay_rate=None,
+                      prior=None, prior_strength=1.0):
+        """スナップショットから学習状態を復元
+        
+        保存時と違う設定を指定した場合は、保存されている履歴を新しい設定で学習し直す
+        （max_history を超える古い履歴は捨てる）。
+        
+        Args:
+            data: to_snapshot で作成したスナップショット
+            max_history: 保持する最大履歴数（Noneの場合は保存時の値）
+            decay_start: 重みの減衰を開始するインデックス（Noneの場合は保存時の値）
+            schedule: 重みの減衰スケジュール（Noneの場合は保存時の値）
+            decay_rate: 減衰の強さ（schedule も decay_rate もNoneの場合は保存時の値）
+            prior: 集団の事前分布（スナップショットには保存されないので、使う場合は指定する）
+            prior_strength: 事前分布の強さ
             
-        except Exception as e:
-            # エラーが発生した場合はランダムな手を返す
-            return random.choice(self.hands)
+        Returns:
+            JankenAI: 復元したAI
+        """
+        _, version = unpack_header(data, KIND_BAYESIAN)
+        body = _SNAPSHOT_BODY_V1 if version == 1 else _SNAPSHOT_BODY
+        if len(data) < HEADER.size + body.size:
+            raise ValueError("スナップショットが短すぎます")
+        if version == 1:
+            saved_max_history, saved_decay_start, last_hand, size, *weights = \
+                body.unpack_from(data, HEADER.size)
+            saved_schedule, saved_decay_rate = 'linear', None
+        else:
+            saved_max_history, saved_decay_start, saved_schedule, saved_decay_rate, last_hand, size, *weights = \
+                body.unpack_from(data, HEADER.size)
+            saved_schedule = saved_schedule.rstrip(b'\0').decode()
+            saved_decay_rate = None if math.isnan(saved_decay_rate) else saved_decay_rate
+        offset = HEADER.size + body.size
+        if len(data) != offset + size:
+            raise ValueError("スナップショットの履歴の長さが合いません")
+        
+        if max_history is None:
+            max_history = saved_max_history
+        if decay_start is None:
+            decay_start = saved_decay_start
+        if schedule is None and decay_rate is None:
+            schedule, decay_rate = saved_schedule, saved_decay_rate
+        elif schedule is None:
+            schedule = saved_schedule
+        ai = cls(max_history=max_history, decay_start=decay_start, schedule=schedule, decay_rate=decay_rate,
+                 prior=prior, prior_strength=prior_strength)
+        
+        # 履歴を古い順に追加し直す（最大 max_history 件なので古い遷移を捨てる処理は起きない）
+        codes = data[offset + max(0, size - max_history):] if max_history > 0 else b''
+        append = ai._append_transition
+        for code in codes:
+            if code > 8:
+                raise ValueError(f"不正な遷移コードです: {code}")
+            append(code)
+        
+        saved_config = (saved_max_history, saved_decay_start, saved_schedule, saved_decay_rate)
+        if (max_history, decay_start, schedule, decay_rate) == saved_config and ai._weights != weights:
+            raise ValueError("スナップショットの重みが履歴と一致しません")
+        
+        ai.last_hand = None if last_hand < 0 else HANDS[last_hand]
+        return ai
+    
+    @property
+    def history(self):
+        """履歴を (prev_hand, curr_hand) のdequeとして返す（古い順）"""
+        history = deque(maxlen=self.max_history)
+        for seq in range(self._seq - self._size, self._seq):
+            prev, curr = divmod(self._codes[seq % self.max_history], 3)
+            history.append((HANDS[prev], HANDS[curr]))
+        return history
+    
+    @property
+    def transition_counts(self):
+        """重み付きの遷移回数を transition_counts[prev_hand][curr_hand] の形で返す"""
+        transition_counts = defaultdict(lambda: defaultdict(float))
+        codes = [code for code in range(9) if self._occurrences[code]]
+        for code in sorted(codes, key=lambda c: self._first_seq[c]):
+            prev, curr = divmod(code, 3)
+            transition_counts[HANDS[prev]][HANDS[curr]] = self._weights[code] / self._scale
+        return transition_counts
             
     def get_history_info(self):
         """現在の履歴情報を取得（デバッグ用）"""
         return {
-            'history_size': len(self.history),
-            'recent_weights': [self._calculate_weight(i) for i in range(min(10, len(self.history)))] if self.history else []
+            'history_size': self._size,
+            # transition_counts に含まれる遷移の種類の数
+            'transition_entries': sum(1 for count in self._occurrences if count),
+            'recent_weights': [weight / self._scale for weight in self._table[:min(10, self._size)]]
         }
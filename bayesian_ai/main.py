@@ -1,13 +1,9 @@
+from janken_core.hands import INPUT_TO_HAND, OUTCOME, WIN, LOSE, hand_label
+
 from .janken_ai import JankenAI
 
 def get_user_hand():
     """ユーザーからの入力を取得"""
-    hand_mapping = {
-        '1': '✊ グー',
-        '2': '✌️ チョキ',
-        '3': '✋ パー'
-    }
-    
     while True:
         print("\n手を選んでください")
         print("1: ✊ グー")
@@ -20,25 +16,20 @@ def get_user_hand():
         if user_input == 'q':
             return None
             
-        if user_input in hand_mapping:
-            return hand_mapping[user_input]
+        if user_input in INPUT_TO_HAND:
+            return INPUT_TO_HAND[user_input]
         else:
             print("無効な入力です。1から3の数字を入力するか、qで終了してください。")
 
 def judge(ai_hand, user_hand):
     """勝敗を判定"""
-    # 絵文字を除いた部分で比較
-    ai_hand_plain = ai_hand.split()[-1]
-    user_hand_plain = user_hand.split()[-1]
-    
-    if ai_hand_plain == user_hand_plain:
-        return "🤝 引き分け"
-    elif (ai_hand_plain == 'グー' and user_hand_plain == 'チョキ') or \
-         (ai_hand_plain == 'チョキ' and user_hand_plain == 'パー') or \
-         (ai_hand_plain == 'パー' and user_hand_plain == 'グー'):
+    outcome = OUTCOME[ai_hand][user_hand]
+    if outcome == WIN:
         return "🤖 AIの勝ち"
-    else:
+    elif outcome == LOSE:
         return "🎉 あなたの勝ち"
+    else:
+        return "🤝 引き分け"
 
 def main():
     print("🎮 ベイズ推論じゃんけんAI スタート！")
@@ -57,8 +48,8 @@ def main():
         ai_hand = ai.predict_next_hand()
         
         # 結果を表示
-        print(f"\nあなた: {user_hand}")
-        print(f"AI: {ai_hand}")
+        print(f"\nあなた: {hand_label(user_hand)}")
+        print(f"AI: {hand_label(ai_hand)}")
         print(f"結果: {judge(ai_hand, user_hand)}")
         
         # モデルを更新
@@ -0,0 +1,188 @@
+from array import array
+
+from janken_core.hands import HANDS, BEATS
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+
+class NGramJankenAI:
+    """直近k手の並びから相手の次の手を予測するAI（k次のマルコフ連鎖）
+
+    「直近k手 + 次の手」を3進数の整数コードにして、大きさ 3^(k+1) の平らな配列で数える。
+    重みは JankenAI._calculate_weight と同じ減衰（decay_start 以降のインデックスで
+    直線的に減少）で、1/_scale 単位の整数として扱う。
+
+    減衰区間の重みはインデックスに対して直線なので、コードごとに
+    「減衰区間の外の件数」「減衰区間の件数」「減衰区間の通し番号の合計」を持っておけば
+    予測に必要な3つのコードの重みだけをその場で計算できる。
+    そのため学習も予測も k や max_history によらず1手あたりO(1)になる。
+    """
+
+    display_name = "高次マルコフAI"
+
+    def __init__(self, order=2, max_history=50, decay_start=40, rng=None):
+        """
+        初期化
+
+        Args:
+            order: 予測に使う直近の手の数（k）
+            max_history: 保持する最大履歴数
+            decay_start: 重みの減衰を開始するインデックス
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+        """
+        if order < 1:
+            raise ValueError("order は1以上を指定してください")
+
+        self.hands = HANDS
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        self.order = order
+        self.max_history = max_history
+        self.decay_start = decay_start
+
+        self._scale = max(1, max_history - decay_start + 1)
+        self._window_start = min(max(decay_start, 0), max_history)
+
+        # 直近k手を表す3進数のコード（0 〜 3^k - 1）と、これまでに見た手の数
+        self._contexts = 3 ** order
+        self._context = 0
+        self._moves_seen = 0
+
+        # コード = context * 3 + 次の手 ごとの集計（大きさ 3^(k+1) の平らな配列）
+        size = self._contexts * 3
+        self._head_counts = array('i', bytes(4 * size))
+        self._window_counts = array('i', bytes(4 * size))
+        self._window_seq_sums = array('q', bytes(8 * size))
+        # 1手ごとの読み書きは Python の整数で返る memoryview 経由で行う
+        self._head = memoryview(self._head_counts)
+        self._window = memoryview(self._window_counts)
+        self._seq_sums = memoryview(self._window_seq_sums)
+
+        # 履歴のリングバッファ（通し番号 % max_history の位置にコードを格納）
+        self._codes = array('i', bytes(4 * max(1, max_history)))
+        self._ring = memoryview(self._codes)
+        self._seq = 0
+        self._size = 0
+
+    def _weight(self, code):
+        """コードの重み付き出現回数（_scale 倍した整数）を計算"""
+        # 減衰区間でのインデックス i の重みは _scale + decay_start - 1 - i
+        # i = 通し番号 - 最も古い通し番号 なので、件数と通し番号の合計から求まる
+        oldest = self._seq - self._size
+        offset = self._scale + self.decay_start - 1 + oldest
+        return (self._scale * self._head[code]
+                + offset * self._window[code]
+                - self._seq_sums[code])
+
+    def _append(self, code):
+        """(直近k手, 次の手) を1件履歴に追加"""
+        max_history = self.max_history
+        window_start = self._window_start
+        seq = self._seq
+        ring = self._ring
+
+        if self._size == max_history:
+            # 最も古い履歴（インデックス0）を捨てる
+            oldest = seq - max_history
+            evicted = ring[oldest % max_history]
+            if window_start > 0:
+                self._head[evicted] -= 1
+            else:
+                self._window[evicted] -= 1
+                self._seq_sums[evicted] -= oldest
+
+            # インデックス decay_start にあった履歴は減衰区間の外に出る
+            if 0 < window_start < max_history:
+                crossing_seq = oldest + window_start
+                crossing = ring[crossing_seq % max_history]
+                self._window[crossing] -= 1
+                self._seq_sums[crossing] -= crossing_seq
+                self._head[crossing] += 1
+            index = max_history - 1
+        else:
+            index = self._size
+            self._size += 1
+
+        if index >= window_start:
+            self._window[code] += 1
+            self._seq_sums[code] += seq
+        else:
+            self._head[code] += 1
+
+        ring[seq % max_history] = code
+        self._seq = seq + 1
+
+    def update_model(self, user_hand):
+        """ユーザーの手を学習データとしてモデルを更新
+
+        Args:
+            user_hand: ユーザーの手（整数コード 0〜2）
+        """
+        if not 0 <= user_hand <= 2:
+            return
+
+        if self._moves_seen >= self.order and self.max_history > 0:
+            self._append(self._context * 3 + user_hand)
+
+        # 直近k手のコードを1手ずらす
+        self._context = (self._context * 3 + user_hand) % self._contexts
+        self._moves_seen += 1
+
+    def predict_distribution(self):
+        """直近k手に続く手ごとの重み付き出現回数を返す
+
+        Returns:
+            list: [グー, チョキ, パー] の重み（データがない場合は全て0）
+        """
+        if self._moves_seen < self.order:
+            return [0.0, 0.0, 0.0]
+        base = self._context * 3
+        return [self._weight(base + hand) / self._scale for hand in range(3)]
+
+    def predict_next_hand(self):
+        """ユーザーの次の手を予測
+
+        Returns:
+            Hand: 予測に基づいた手
+        """
+        if self._moves_seen < self.order:
+            return self._random_hand()
+
+        base = self._context * 3
+        best_hand = None
+        best_weight = 0
+        for hand in range(3):
+            weight = self._weight(base + hand)
+            if weight > best_weight:
+                best_hand, best_weight = hand, weight
+
+        if best_hand is None:
+            # この並びのデータがない場合はランダムに選択
+            return self._random_hand()
+
+        # 予測した手に勝つ手を選択
+        return BEATS[best_hand]
+
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = predict_next_hand
+
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を受け取り、相手の手を学習
+
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        self.update_model(opp)
+
+    def get_history_info(self):
+        """現在の履歴情報を取得（デバッグ用）"""
+        return {
+            'history_size': self._size,
+            'order': self.order,
+            'table_size': len(self._head_counts),
+        }
@@ -0,0 +1,151 @@
+"""全プレイヤーの対戦から作る、ベイズAIの集団の事前分布
+
+JankenAI は空の遷移回数から学習を始めるため、新しいプレイヤーとの最初のうちはランダムに手を出すしかない。
+PopulationPrior は全プレイヤーの「AIの直前の手 -> プレイヤーの手」の遷移回数を集計し、
+各プレイヤーのAIがディリクレ事前分布（擬似的な回数）として予測に足せるようにする。
+
+回数は共有メモリ（multiprocessing.shared_memory）上の NumPy 配列に1つだけ置く。
+作成したプロセス（サーバーなど）だけが対戦の終わりに回数を足し、他のワーカープロセスは
+名前を指定して読み取り専用で参照する。セッションごとのAIは参照を持つだけなので、メモリはほとんど増えない。
+
+共有メモリの内容（リトルエンディアン）:
+    int64    更新の通し番号（書き込み中は奇数。読む側は前後で同じ偶数なら整合しているとみなす）
+    float64  遷移 (prev, curr) ごとの回数 9個（code = prev * 3 + curr）
+"""
+import sys
+from multiprocessing import shared_memory
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+_COUNTS_OFFSET = 8
+_SIZE = _COUNTS_OFFSET + 9 * 8
+
+
+class PopulationPrior:
+    """共有メモリ上の集団の遷移回数"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        """create または attach で作成する"""
+        self._shm = shm
+        self.owner = owner
+        self._sequence = np.ndarray((1,), dtype='<i8', buffer=shm.buf)
+        self._counts = np.ndarray((9,), dtype='<f8', buffer=shm.buf, offset=_COUNTS_OFFSET)
+        if not owner:
+            self._sequence.flags.writeable = False
+            self._counts.flags.writeable = False
+        # alphas の結果を通し番号と強さごとに覚えておく（回数が変わるまで計算し直さない）
+        self._cached_sequence = -1
+        self._cached_strength = None
+        self._cached_alphas: Tuple[float, ...] = (0.0,) * 9
+
+    @property
+    def name(self) -> str:
+        """共有メモリの名前（attach に渡す）"""
+        return self._shm.name
+
+    @classmethod
+    def create(cls, name: Optional[str] = None,
+               counts: Optional[Sequence[float]] = None) -> 'PopulationPrior':
+        """共有メモリを作成して書き込める事前分布を返す
+
+        Args:
+            name: 共有メモリの名前（Noneの場合は自動で決める）
+            counts: 初期の遷移回数9個（Noneの場合は0）
+        """
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_SIZE)
+        prior = cls(shm, owner=True)
+        prior._sequence[0] = 0
+        prior._counts[:] = 0.0 if counts is None else np.asarray(counts, dtype=np.float64)
+        return prior
+
+    @classmethod
+    def attach(cls, name: str) -> 'PopulationPrior':
+        """作成済みの共有メモリを読み取り専用で参照する（ワーカープロセス用）"""
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            from multiprocessing import resource_tracker
+            # fork したワーカーは作成したプロセスの resource_tracker を共有しているので、登録を外すと
+            # 作成したプロセスの登録まで消えてしまう。自分の resource_tracker を使う場合だけ外す
+            inherited = resource_tracker._resource_tracker._fd is not None
+            shm = shared_memory.SharedMemory(name=name)
+            if not inherited:
+                # 参照するだけのプロセスが終了したときに共有メモリが削除されないようにする
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, owner=False)
+
+    def add_counts(self, counts: Sequence[float]) -> None:
+        """遷移回数9個を足す（作成したプロセスだけが呼べる）"""
+        if not self.owner:
+            raise PermissionError("参照しているだけの事前分布には書き込めません")
+        sequence = self._sequence
+        sequence[0] += 1
+        self._counts += np.asarray(counts, dtype=np.float64)
+        sequence[0] += 1
+
+    def add_rounds(self, player_hands: Iterable[int], ai_hands: Iterable[int]) -> None:
+        """1つの対戦の各ラウンドの手から「AIの直前の手 -> プレイヤーの手」の遷移を数えて足す"""
+        counts = [0] * 9
+        prev = None
+        for player_hand, ai_hand in zip(player_hands, ai_hands):
+            if prev is not None:
+                counts[prev * 3 + player_hand] += 1
+            prev = ai_hand
+        self.add_counts(counts)
+
+    def counts(self) -> Tuple[float, ...]:
+        """整合した遷移回数9個を返す（書き込み中なら終わるまで読み直す）"""
+        sequence = self._sequence
+        while True:
+            before = int(sequence[0])
+            if before % 2:
+                continue
+            counts = tuple(self._counts.tolist())
+            if int(sequence[0]) == before:
+                return counts
+
+    def alphas(self, strength: float) -> Tuple[float, ...]:
+        """ディリクレ事前分布のパラメータ9個を返す
+
+        直前の手ごと（3個ずつ）に回数を合計 strength になるよう正規化する（データがない行は0）。
+        回数が変わっていなければ前回の結果をそのまま返すので、毎手呼んでも軽い。
+        """
+        sequence = int(self._sequence[0])
+        if sequence == self._cached_sequence and strength == self._cached_strength:
+            return self._cached_alphas
+        counts = self.counts()
+        alphas = []
+        for base in (0, 3, 6):
+            row = counts[base:base + 3]
+            total = sum(row)
+            alphas.extend(strength * count / total if total > 0 else 0.0 for count in row)
+        self._cached_sequence, self._cached_strength = sequence, strength
+        self._cached_alphas = tuple(alphas)
+        return self._cached_alphas
+
+    def save(self, path: str) -> None:
+        """遷移回数をファイル（.npy）に保存"""
+        np.save(path, np.array(self.counts()))
+
+    @staticmethod
+    def load_counts(path: str) -> Tuple[float, ...]:
+        """save で保存した遷移回数を読み込む（create の counts に渡す）"""
+        counts = np.load(path)
+        if counts.shape != (9,):
+            raise ValueError(f"遷移回数の形が不正です: {counts.shape}")
+        return tuple(counts.tolist())
+
+    def close(self) -> None:
+        """共有メモリの参照を閉じる（作成したプロセスの場合は共有メモリを削除する）"""
+        # NumPy 配列がバッファを参照しているうちは閉じられないので先に手放す
+        self._sequence = self._counts = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> 'PopulationPrior':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
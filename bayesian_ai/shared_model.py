@@ -0,0 +1,207 @@
+"""複数のスレッドから同時に使えるベイズAIの共有モデル
+
+JankenAI は履歴や重みをロックなしで書き換えるため、Web のフロントエンドのように
+複数のスレッドで1つのモデル（全プレイヤーから学習する集団モデルなど）を共有すると、
+更新が競合して回数が壊れる。SharedTransitionModel は次のようにして競合を避ける。
+
+    書き込み   遷移コードをスレッドごとに決まるストライプ（ロック + 未反映のリスト）に追加するだけ
+               （ロックはストライプの数だけあるので、スレッド同士がほとんど待たない）
+    反映       反映スレッド（または flush）が各ストライプのリストを丸ごと取り出し、
+               まとめて集計してから新しいスナップショットを作る
+    読み取り   スナップショットは作成後に変更しない（イミュータブル）ので、ロックなしで参照を読むだけでよい
+               （書き込みや反映を待たず、いつも整合した回数が見える）
+
+プレイヤーごとの直前の手は SharedJankenAI（対戦ループから使うAI）が持ち、共有モデルには遷移だけを渡す。
+"""
+import itertools
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+from janken_core.hands import BEATS
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+
+
+class ModelSnapshot(NamedTuple):
+    """ある時点の共有モデルの状態（作成後は変更しない）"""
+    # 反映した回数（スナップショットを作るたびに1増える）
+    version: int
+    # counts[code] = 遷移 (prev, curr) の回数（code = prev * 3 + curr）
+    counts: Tuple[int, ...]
+    # 遷移が最初に反映された順番（未出現は -1、同じ回数のときは先に出現した遷移を優先する）
+    first_seen: Tuple[int, ...]
+    # 反映した遷移の総数
+    total: int
+
+    def predict(self, last_hand: int) -> Optional[int]:
+        """直前の手から相手の次の手を予測し、それに勝つ手を返す（データがない場合は None）"""
+        base = last_hand * 3
+        best = None
+        for code in range(base, base + 3):
+            if self.first_seen[code] < 0:
+                continue
+            if (best is None or self.counts[code] > self.counts[best]
+                    or (self.counts[code] == self.counts[best]
+                        and self.first_seen[code] < self.first_seen[best])):
+                best = code
+        return None if best is None else BEATS[best - base]
+
+
+_EMPTY = ModelSnapshot(0, (0,) * 9, (-1,) * 9, 0)
+
+
+class _Stripe:
+    """書き込み用のストライプ（ロックと未反映の遷移コード）"""
+
+    __slots__ = ('lock', 'pending')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+
+
+class SharedTransitionModel:
+    """複数のスレッドから記録・予測できる遷移回数のモデル"""
+
+    def __init__(self, stripes: int = 16, batch_size: int = 1024):
+        """
+        初期化
+
+        Args:
+            stripes: 書き込み用のストライプの数（同時に書き込むスレッド数くらいにする）
+            batch_size: 1つのストライプにこの数だけ溜まったら反映スレッドを起こす
+        """
+        self.batch_size = batch_size
+        self._stripes = tuple(_Stripe() for _ in range(stripes))
+        # スレッドごとのストライプの番号（初めて記録したときに順番に割り当てる。
+        # threading.get_ident() はアラインされたアドレスなので、そのまま剰余を取ると同じストライプに偏る）
+        self._local = threading.local()
+        self._next_stripe = itertools.count()
+        # 反映は1つのスレッドずつ行う（集計中の回数を書き換えるのは反映するスレッドだけ）
+        self._apply_lock = threading.Lock()
+        self._counts = [0] * 9
+        self._first_seen = [-1] * 9
+        self._seen = 0
+        self._snapshot = _EMPTY
+
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def record(self, code: int) -> None:
+        """遷移を1件記録（反映されるまではスナップショットに含まれない）
+
+        Args:
+            code: 遷移コード（prev * 3 + curr）
+        """
+        try:
+            stripe = self._local.stripe
+        except AttributeError:
+            stripe = self._local.stripe = self._stripes[next(self._next_stripe) % len(self._stripes)]
+        with stripe.lock:
+            stripe.pending.append(code)
+            full = len(stripe.pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def snapshot(self) -> ModelSnapshot:
+        """現在のスナップショットを返す（ロックを取らない）"""
+        return self._snapshot
+
+    def flush(self) -> ModelSnapshot:
+        """未反映の遷移をまとめて反映し、新しいスナップショットを返す"""
+        with self._apply_lock:
+            batch = []
+            for stripe in self._stripes:
+                # リストを入れ替えるだけなので、書き込むスレッドを待たせるのは一瞬
+                with stripe.lock:
+                    pending, stripe.pending = stripe.pending, []
+                batch.extend(pending)
+            if not batch:
+                return self._snapshot
+
+            counts, first_seen = self._counts, self._first_seen
+            for code in batch:
+                counts[code] += 1
+                if first_seen[code] < 0:
+                    first_seen[code] = self._seen
+                    self._seen += 1
+            snapshot = self._snapshot
+            self._snapshot = ModelSnapshot(snapshot.version + 1, tuple(counts), tuple(first_seen),
+                                           snapshot.total + len(batch))
+            return self._snapshot
+
+    def start(self, interval: float = 0.01) -> 'SharedTransitionModel':
+        """反映スレッドを開始（interval 秒ごと、またはストライプが batch_size に達したときに反映する）"""
+        if self._thread is None:
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,),
+                                            name='shared-model-apply', daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self, interval: float) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self) -> None:
+        """反映スレッドを止め、残りの遷移を反映する"""
+        if self._thread is not None:
+            self._closed.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def __enter__(self) -> 'SharedTransitionModel':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class SharedJankenAI:
+    """共有モデルから予測するプレイヤーごとのAI（対戦ループから使う）
+
+    JankenAI と同じく「直前の自分の手 -> 相手の手」の遷移を学習し、最も回数の多い遷移に勝つ手を出す。
+    学習した遷移は共有モデルに記録され、全プレイヤーのAIで共有される。
+    """
+    display_name = "共有ベイズAI"
+
+    def __init__(self, model: SharedTransitionModel, rng=None):
+        """
+        初期化
+
+        Args:
+            model: 共有モデル
+            rng: データがないときに手を選ぶ乱数生成器（省略時は新規作成）
+        """
+        self.model = model
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        self.last_hand = None
+
+    def choose(self):
+        """共有モデルのスナップショットから次の手を決める"""
+        if self.last_hand is None:
+            return self._random_hand()
+        hand = self.model.snapshot().predict(self.last_hand)
+        return self._random_hand() if hand is None else hand
+
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を共有モデルに記録
+
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        if self.last_hand is not None:
+            self.model.record(self.last_hand * 3 + opp)
+        self.last_hand = own
@@ -0,0 +1 @@
+# ベンチマーク用パッケージ
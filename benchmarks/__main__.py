@@ -0,0 +1,54 @@
+"""ベンチマークスイートを実行
+
+実行方法:
+    python -m benchmarks                                  # 計測して表示
+    python -m benchmarks --output results.json            # 結果をJSONに保存
+    python -m benchmarks --baseline baseline.json         # 基準と比較（悪化があれば終了コード1）
+"""
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks.suite import compare, run_suite
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="じゃんけんAIのベンチマークスイート")
+    parser.add_argument('--output', default=None, metavar='PATH', help="結果を書き出すJSONファイル")
+    parser.add_argument('--baseline', default=None, metavar='PATH', help="比較する基準のJSONファイル")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="悪化とみなす割合（既定: 0.1 = 10%%）")
+    parser.add_argument('--quick', action='store_true', help="計測回数を減らして短時間で実行")
+    args = parser.parse_args(argv)
+
+    results = run_suite(quick=args.quick)
+
+    for name, metric in results.items():
+        print(f"{name:<50} {metric['value']:>14,.3f} {metric['unit']}")
+
+    if args.output:
+        report = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n結果を {args.output} に保存しました。")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n=== 基準より {args.tolerance:.0%} 以上悪化した項目 ===")
+            for name, diff in regressions.items():
+                print(f"{name}: {diff['baseline']:,.3f} -> {diff['current']:,.3f} ({diff['change']:+.1%})")
+            return 1
+        print("\n基準と比べて悪化した項目はありません。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""対戦の統計の集計（ai_battle.analytics）の正しさと速度を調べる
+
+1. 一致の確認: 途中でラウンド番号が途切れる対戦ログを、いろいろなチャンクの大きさで集計したレポートが、
+   1ラウンドずつ数える単純な集計と一致することを確認する
+2. 速度: 大きな対戦ログを書き出し、analyze_log で集計するのにかかる時間を計測する
+
+実行方法:
+    python -m benchmarks.bench_analytics
+    python -m benchmarks.bench_analytics --rounds 100000000 --path /tmp/big.jklg
+"""
+import argparse
+import os
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ai_battle.analytics import MAX_STREAK_BIN, MatchAnalyzer, analyze_log
+from ai_battle.round_log import RoundLogWriter
+from janken_core.hands import OUTCOME
+
+
+def _games(seed: int, n_games: int = 5) -> List[Tuple[int, np.ndarray]]:
+    """確認に使う対戦（最初のラウンド番号, コードの配列）のリスト（偏りのある手で連続記録が長くなるようにする）"""
+    rng = np.random.default_rng(seed)
+    games = []
+    first_round = 0
+    for _ in range(n_games):
+        length = int(rng.integers(1, 3_000))
+        hand1 = np.where(rng.random(length) < 0.7, 0, rng.integers(0, 3, length))
+        hand2 = np.where(rng.random(length) < 0.6, 1, rng.integers(0, 3, length))
+        games.append((first_round, (hand1 * 3 + hand2).astype(np.int8)))
+        first_round += length + int(rng.integers(0, 3))
+    return games
+
+
+def _reference(games: List[Tuple[int, np.ndarray]], window: int) -> Dict[str, Any]:
+    """1ラウンドずつ数える単純な集計（レポートの主な値だけ）"""
+    outcomes = [0, 0, 0]
+    own = [[0] * 3 for _ in range(3)]
+    cross = [[0] * 3 for _ in range(3)]
+    windows: List[List[int]] = []
+    streaks = [[0] * (MAX_STREAK_BIN + 1) for _ in range(3)]
+    longest = [0, 0, 0]
+    rounds = 0
+    previous = None
+    last_round = None
+    run_result, run_length = None, 0
+
+    def close_run():
+        if run_length:
+            streaks[run_result][min(run_length, MAX_STREAK_BIN + 1) - 1] += 1
+            longest[run_result] = max(longest[run_result], run_length)
+
+    for first_round, codes in games:
+        for offset, code in enumerate(codes.tolist()):
+            round_number = first_round + offset
+            hand1, hand2 = divmod(code, 3)
+            result = OUTCOME[hand1][hand2]
+            continuous = last_round is not None and round_number == last_round + 1
+            outcomes[result] += 1
+            if rounds % window == 0:
+                windows.append([0, 0, 0])
+            windows[-1][result] += 1
+            if continuous:
+                own[previous // 3][hand1] += 1
+                cross[previous // 3][hand2] += 1
+            if continuous and result == run_result:
+                run_length += 1
+            else:
+                close_run()
+                run_result, run_length = result, 1
+            previous = code
+            last_round = round_number
+            rounds += 1
+    close_run()
+    return {'outcomes': outcomes, 'own': own, 'cross': cross, 'windows': windows,
+            'streaks': streaks, 'longest': longest}
+
+
+def verify(seeds=range(3), window: int = 500) -> None:
+    """チャンクの大きさによらず単純な集計と一致することを確認（失敗した場合は AssertionError）"""
+    for seed in seeds:
+        games = _games(seed)
+        expected = _reference(games, window)
+        codes = np.concatenate([game_codes for _, game_codes in games])
+        rounds = np.concatenate([np.arange(first, first + len(game_codes)) for first, game_codes in games])
+        for chunk_rounds in (1, 7, 499, 500, 4_096, len(codes)):
+            analyzer = MatchAnalyzer(window=window)
+            for start in range(0, len(codes), chunk_rounds):
+                analyzer.update_codes(codes[start:start + chunk_rounds], rounds[start:start + chunk_rounds])
+            report = analyzer.report()
+            where = f"seed={seed} chunk_rounds={chunk_rounds}"
+            assert list(report['outcomes'].values()) == expected['outcomes'], where
+            assert report['transitions']['ai1->ai1']['counts'] == expected['own'], where
+            assert report['transitions']['ai1->ai2']['counts'] == expected['cross'], where
+            windows = report['windows']
+            assert [list(row) for row in zip(windows['draws'], windows['ai1_wins'], windows['ai2_wins'])] \
+                == expected['windows'], where
+            for result, key in enumerate(('draw', 'ai1', 'ai2')):
+                streak = report['streaks'][key]
+                assert streak['longest'] == expected['longest'][result], where
+                histogram = expected['streaks'][result]
+                assert streak['histogram'] == histogram[:len(streak['histogram'])], where
+                assert not any(histogram[len(streak['histogram']):]), where
+
+
+def write_log(path: str, rounds: int, chunk_rounds: int = 1 << 22, seed: int = 0) -> None:
+    """ランダムな手の対戦ログを書き出す"""
+    rng = np.random.default_rng(seed)
+    with RoundLogWriter(path) as writer:
+        for start in range(0, rounds, chunk_rounds):
+            size = min(chunk_rounds, rounds - start)
+            writer.write_codes(start, rng.integers(0, 9, size, dtype=np.int8))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="対戦の統計の集計の一致の確認と速度")
+    parser.add_argument('--rounds', type=int, default=10_000_000, help="速度を計測する対戦ログのラウンド数")
+    parser.add_argument('--path', default=None, help="対戦ログを書き出すファイル（省略時は一時ファイル）")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    verify()
+    print(f"一致の確認: OK ({time.perf_counter() - start:.2f}秒)")
+
+    path = args.path or os.path.join(tempfile.mkdtemp(), 'bench.jklg')
+    start = time.perf_counter()
+    write_log(path, args.rounds)
+    print(f"対戦ログの書き出し: {args.rounds:,}ラウンド ({time.perf_counter() - start:.2f}秒)")
+    try:
+        start = time.perf_counter()
+        report = analyze_log(path)
+        elapsed = time.perf_counter() - start
+        print(f"集計: {report['rounds']:,}ラウンド {elapsed:.2f}秒 ({report['rounds'] / elapsed:,.0f} ラウンド/秒)")
+    finally:
+        if args.path is None:
+            os.remove(path)
+            os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
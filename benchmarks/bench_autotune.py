@@ -0,0 +1,145 @@
+"""自動調整ベイズAI（AutoTuneJankenAI）の正しさ・速度・効果を調べる
+
+1. 一致の確認: 各シャドウの重み・出現回数・予測が、同じ設定の JankenAI に同じ手を学習させた場合と
+   一致することを、いくつかの相手と減衰スケジュールで確認する
+2. 速度: 20個のシャドウを持つ AutoTuneJankenAI と、JankenAI を20個別々に動かした場合の1ラウンドあたりの時間
+3. 効果: 固定の JankenAI(30, 20) と AutoTuneJankenAI の、いくつかの相手に対する勝率
+
+実行方法:
+    python -m benchmarks.bench_autotune
+    python -m benchmarks.bench_autotune --rounds 5000
+"""
+import argparse
+import random
+import time
+from typing import Callable, Dict
+
+from ai_battle.battle import JankenBattle
+from bayesian_ai.autotune import DEFAULT_CONFIGS, AutoTuneJankenAI
+from bayesian_ai.janken_ai import JankenAI
+from bayesian_ai.ngram_ai import NGramJankenAI
+from ensemble_ai.janken_ai import EnsembleJankenAI
+from janken_core.hands import BEATS, OUTCOME
+from pattern_ai.janken_ai import PatternJankenAI
+
+# 一致の確認に使う設定（減衰スケジュールや max_history = decay_start などの端を含む）
+VERIFY_CONFIGS = DEFAULT_CONFIGS + (
+    (1, 0), (7, 0), (12, 12), (40, 10, 'exponential'), (40, 30, 'exponential', 0.8),
+    (25, 5, 'step'), (60, 20, 'step', 0.25),
+)
+
+
+def _opponents() -> Dict[str, Callable[[random.Random], Callable[[int], int]]]:
+    """一致の確認に使う相手（乱数生成器を受け取り、AIの直前の手から次の手を返す関数を返す）"""
+    def uniform(rng):
+        return lambda last: rng.randrange(3)
+
+    def beat_last(rng):
+        return lambda last: BEATS[last] if last is not None and rng.random() < 0.6 else rng.randrange(3)
+
+    def phases(rng):
+        # 50ラウンドごとに傾向が変わる相手
+        state = {'round': 0}
+
+        def play(last):
+            state['round'] += 1
+            phase = state['round'] // 50 % 3
+            if phase == 0 or last is None:
+                return rng.randrange(3)
+            return BEATS[last] if phase == 1 else (last + rng.choice((0, 0, 2))) % 3
+        return play
+    return {'uniform': uniform, 'beat_last': beat_last, 'phases': phases}
+
+
+def verify(rounds: int = 2_000, seeds=range(3)) -> None:
+    """各シャドウが JankenAI と一致することを確認（失敗した場合は AssertionError）"""
+    for name, make_opponent in _opponents().items():
+        for seed in seeds:
+            tuner = AutoTuneJankenAI(configs=VERIFY_CONFIGS, rng=random.Random(seed))
+            references = {config: JankenAI(*config) for config in tuner.configs}
+            opponent = make_opponent(random.Random(-seed - 1))
+            last = None
+            for round_index in range(rounds):
+                own = tuner.choose()
+                opp = opponent(last)
+                tuner.observe(own, opp, OUTCOME[own][opp])
+                last = own
+                for shadow in tuner._shadows:
+                    ai = references[shadow.config]
+                    ai.observe(own, opp, OUTCOME[own][opp])
+                    where = f"{name} seed={seed} round={round_index} config={tuple(shadow.config)}"
+                    assert ai._weights == shadow.scaled_weights(), where
+                    assert list(ai._occurrences) == shadow.window.occurrences, where
+                    for code in range(9):
+                        if ai._occurrences[code]:
+                            assert ai._first_seq[code] == shadow.window.first_seq[code], where
+                    if shadow.proposal is not None:
+                        assert ai.predict_next_hand() == shadow.proposal, where
+
+
+def bench_rounds(rounds: int) -> Dict[str, float]:
+    """1ラウンド（choose + observe）あたりのマイクロ秒"""
+    rng = random.Random(0)
+    opps = [rng.randrange(3) for _ in range(rounds)]
+
+    def run(ais):
+        start = time.perf_counter()
+        for opp in opps:
+            for ai in ais:
+                own = ai.choose()
+                ai.observe(own, opp, OUTCOME[own][opp])
+        return (time.perf_counter() - start) / rounds * 1e6
+
+    return {
+        'JankenAI x1': run([JankenAI(30, 20, rng=random.Random(0))]),
+        f'JankenAI x{len(DEFAULT_CONFIGS)}': run([JankenAI(*config, rng=random.Random(0))
+                                                  for config in DEFAULT_CONFIGS]),
+        f'AutoTuneJankenAI({len(DEFAULT_CONFIGS)})': run([AutoTuneJankenAI(rng=random.Random(0))]),
+    }
+
+
+def win_rates(rounds: int, seeds=range(5)) -> Dict[str, Dict[str, float]]:
+    """固定の JankenAI(30, 20) と AutoTuneJankenAI の、相手ごとの平均勝率"""
+    opponents = {
+        'pattern': PatternJankenAI,
+        'ngram': NGramJankenAI,
+        'ensemble': EnsembleJankenAI,
+    }
+    results = {}
+    for opponent_name, opponent in opponents.items():
+        row = {}
+        for ai_name, make_ai in (('JankenAI(30, 20)', lambda: JankenAI(30, 20)),
+                                 ('AutoTuneJankenAI', AutoTuneJankenAI)):
+            wins = 0
+            for seed in seeds:
+                battle = JankenBattle(mode='aivsai', ai1=make_ai(), ai2=opponent(),
+                                      keep_history=False, seed=seed)
+                wins += battle.simulate(rounds)['ai1']
+            row[ai_name] = wins / (rounds * len(seeds))
+        results[opponent_name] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="自動調整ベイズAIの一致の確認・速度・効果")
+    parser.add_argument('--rounds', type=int, default=2_000, help="1回の対戦のラウンド数")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    verify(args.rounds)
+    print(f"一致の確認: OK ({len(VERIFY_CONFIGS)}個の設定, {time.perf_counter() - start:.2f}秒)")
+
+    print("1ラウンドあたりの時間:")
+    timings = bench_rounds(args.rounds * 5)
+    single = timings['JankenAI x1']
+    for name, micros in timings.items():
+        print(f"  {name:>24} {micros:8.2f} µs  (JankenAI x1 の {micros / single:5.1f}倍)")
+
+    print("勝率（AI1）:")
+    for opponent_name, row in win_rates(args.rounds).items():
+        cells = " / ".join(f"{name} {rate:.3f}" for name, rate in row.items())
+        print(f"  vs {opponent_name:<9} {cells}")
+
+
+if __name__ == "__main__":
+    main()
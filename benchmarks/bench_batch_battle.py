@@ -0,0 +1,48 @@
+"""ベイズAI vs パターンAI の対戦速度を、1ゲームずつの JankenBattle と配列演算の BatchBattle で比べる
+
+実行方法:
+    python -m benchmarks.bench_batch_battle
+    python -m benchmarks.bench_batch_battle --rounds 500 --batch 1024 --batch 4096
+"""
+import argparse
+import time
+
+import numpy as np
+
+from ai_battle.batch_battle import BatchBattle
+from ai_battle.battle import JankenBattle
+
+BATCH_SIZES = [256, 1_024, 4_096, 16_384, 65_536]
+
+
+def bench_scalar(rounds: int) -> float:
+    """JankenBattle.simulate の1秒あたりのラウンド数"""
+    battle = JankenBattle(mode='aivsai', keep_history=False, seed=0)
+    start = time.perf_counter()
+    battle.simulate(rounds)
+    return rounds / (time.perf_counter() - start)
+
+
+def bench_batch(batch_size: int, rounds: int) -> float:
+    """BatchBattle（numpy の乱数）の1秒あたりのラウンド数（全ゲームの合計）"""
+    battle = BatchBattle(batch_size, rng=np.random.default_rng(0))
+    start = time.perf_counter()
+    battle.run(rounds)
+    return batch_size * rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JankenBattle と BatchBattle の対戦速度の比較")
+    parser.add_argument('--rounds', type=int, default=200, help="1ゲームのラウンド数")
+    parser.add_argument('--batch', type=int, action='append', default=None, help="計測するバッチのゲーム数")
+    args = parser.parse_args()
+
+    scalar = bench_scalar(args.rounds * 1_000)
+    print(f"{'JankenBattle.simulate':>24} {scalar:>14,.0f} ラウンド/秒")
+    for batch_size in args.batch or BATCH_SIZES:
+        rate = bench_batch(batch_size, args.rounds)
+        print(f"{f'BatchBattle({batch_size})':>24} {rate:>14,.0f} ラウンド/秒 ({rate / scalar:.1f}倍)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""ベイズAIの update_model の1手あたりのコストを max_history と減衰スケジュールごとに計測する
+
+実行方法:
+    python -m benchmarks.bench_bayesian_update
+    python -m benchmarks.bench_bayesian_update --schedule linear --schedule step
+"""
+import argparse
+import random
+import time
+
+from bayesian_ai.janken_ai import JankenAI
+
+MAX_HISTORIES = [30, 1_000, 10_000, 100_000, 1_000_000]
+# exponential は重みが0になるまでの区間で1件ごとに重みが変わるので、その件数だけ時間がかかる
+SCHEDULES = ['linear', 'step', 'exponential']
+
+
+def bench_update(max_history: int, moves: int, schedule: str = 'linear') -> float:
+    """履歴が満杯の状態で update_model を moves 回呼んだときの1手あたりの時間を返す
+
+    Args:
+        max_history: 保持する最大履歴数
+        moves: 計測する手数
+        schedule: 重みの減衰スケジュール
+
+    Returns:
+        float: 1手あたりの時間（マイクロ秒）
+    """
+    ai = JankenAI(max_history=max_history, decay_start=max_history * 2 // 3, schedule=schedule)
+    rng = random.Random(0)
+    hands = ai.hands
+
+    # 減衰区間を含めて履歴を満杯にしてから計測する
+    for _ in range(max_history + 1):
+        ai.update_model(rng.choice(hands))
+
+    stream = [rng.choice(hands) for _ in range(moves)]
+    start = time.perf_counter()
+    for hand in stream:
+        ai.update_model(hand)
+    elapsed = time.perf_counter() - start
+    return elapsed / moves * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="update_model の1手あたりのコスト")
+    parser.add_argument('--moves', type=int, default=100_000, help="計測する手数")
+    parser.add_argument('--schedule', action='append', default=None, choices=SCHEDULES,
+                        help="計測する減衰スケジュール（省略時は全て）")
+    args = parser.parse_args()
+
+    print(f"{'schedule':>12} {'max_history':>12} {'us/move':>10}")
+    for schedule in args.schedule or SCHEDULES:
+        for max_history in MAX_HISTORIES:
+            print(f"{schedule:>12} {max_history:>12} {bench_update(max_history, args.moves, schedule):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
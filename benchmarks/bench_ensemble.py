@@ -0,0 +1,39 @@
+"""アンサンブルAIの1手あたりの速度を予測器の数ごとに計測する
+
+実行方法:
+    python -m benchmarks.bench_ensemble
+"""
+import argparse
+import random
+import time
+
+from ensemble_ai.janken_ai import EnsembleJankenAI
+
+
+def bench_moves(max_order: int, moves: int) -> float:
+    """markov(1..max_order) + frequency + pattern で predict/update を繰り返したときの1秒あたりの手数"""
+    ai = EnsembleJankenAI(orders=range(1, max_order + 1))
+    rng = random.Random(0)
+    stream = [rng.randrange(3) for _ in range(moves)]
+
+    start = time.perf_counter()
+    for hand in stream:
+        ai.predict_next_hand()
+        ai.update_model(hand)
+    return moves / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="アンサンブルAIの予測器の数ごとの速度")
+    parser.add_argument('--moves', type=int, default=100_000, help="計測する手数")
+    parser.add_argument('--max-order', type=int, default=8, help="markov 予測器の最大次数")
+    args = parser.parse_args()
+
+    print(f"{'予測器の数':>8} {'手/秒':>12}")
+    for max_order in range(1, args.max_order + 1):
+        n_predictors = max_order + 2
+        print(f"{n_predictors:>8} {bench_moves(max_order, args.moves):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
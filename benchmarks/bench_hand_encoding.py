@@ -0,0 +1,72 @@
+"""手の表現（表示ラベルの文字列 vs 整数コード）ごとの勝敗判定と対戦ラウンドの速度を比較する
+
+実行方法:
+    python -m benchmarks.bench_hand_encoding
+"""
+import argparse
+import random
+import time
+
+from ai_battle.battle import JankenBattle
+from janken_core.hands import HAND_LABELS
+
+
+def legacy_judge(hand1: str, hand2: str) -> str:
+    """以前の文字列比較による勝敗判定（比較用）"""
+    hand1_plain = hand1.split()[-1]
+    hand2_plain = hand2.split()[-1]
+
+    if hand1_plain == hand2_plain:
+        return 'draw'
+
+    if (hand1_plain == 'グー' and hand2_plain == 'チョキ') or \
+       (hand1_plain == 'チョキ' and hand2_plain == 'パー') or \
+       (hand1_plain == 'パー' and hand2_plain == 'グー'):
+        return 'ai1'
+    else:
+        return 'ai2'
+
+
+def bench_judge(rounds: int) -> dict:
+    """文字列と整数コードの勝敗判定を1秒あたりの回数で比較"""
+    rng = random.Random(0)
+    codes = [(rng.randrange(3), rng.randrange(3)) for _ in range(rounds)]
+    labels = [(HAND_LABELS[a], HAND_LABELS[b]) for a, b in codes]
+    battle = JankenBattle(mode='aivsai', seed=0)
+
+    start = time.perf_counter()
+    for hand1, hand2 in labels:
+        legacy_judge(hand1, hand2)
+    legacy = rounds / (time.perf_counter() - start)
+
+    judge = battle.judge
+    start = time.perf_counter()
+    for hand1, hand2 in codes:
+        judge(hand1, hand2)
+    coded = rounds / (time.perf_counter() - start)
+
+    return {'legacy_string': legacy, 'int_code': coded}
+
+
+def bench_rounds(rounds: int) -> float:
+    """AI vs AI モードの play_round を1秒あたりのラウンド数で計測"""
+    battle = JankenBattle(mode='aivsai', seed=0)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        battle.play_round()
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="手の表現ごとの速度比較")
+    parser.add_argument('--rounds', type=int, default=200_000, help="計測するラウンド数")
+    args = parser.parse_args()
+
+    judge = bench_judge(args.rounds)
+    print(f"judge (文字列):   {judge['legacy_string']:>12,.0f} 回/秒")
+    print(f"judge (整数コード): {judge['int_code']:>12,.0f} 回/秒")
+    print(f"play_round:        {bench_rounds(args.rounds):>12,.0f} ラウンド/秒")
+
+
+if __name__ == "__main__":
+    main()
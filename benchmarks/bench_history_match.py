@@ -0,0 +1,137 @@
+"""履歴照合AI（HistoryMatchJankenAI）の正しさと、履歴が長くなったときの1手あたりの時間を調べる
+
+1. 一致の確認: 1手ごとの一致の長さが「それより前にも出現した最も長い接尾辞」の長さ（全探索で求めたもの）と同じで、
+   AIが使った出現位置に実際にその接尾辞が出現していて、予測した手がその次の手であることを確認する
+   （作り直しが起きる設定も含む）。使った出現が最も新しい出現だった割合も数える
+2. 速度: 履歴の手数ごとの1手あたりの時間を、毎手履歴を全探索する方法と比べる
+
+実行方法:
+    python -m benchmarks.bench_history_match
+    python -m benchmarks.bench_history_match --moves 2000000
+"""
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from bayesian_ai.history_match_ai import HistoryMatchJankenAI
+
+
+def _streams(length: int, seed: int) -> List[Tuple[str, List[int]]]:
+    """確認に使う相手の手の列"""
+    rng = random.Random(seed)
+    uniform = [rng.randrange(3) for _ in range(length)]
+    cycle = [(i // 2 + (rng.random() < 0.1)) % 3 for i in range(length)]
+    motif = [rng.randrange(3) for _ in range(17)]
+    repeated = [motif[i % 17] if rng.random() < 0.95 else rng.randrange(3) for i in range(length)]
+    return [('uniform', uniform), ('cycle', cycle), ('repeated', repeated)]
+
+
+def _brute_force(moves: List[int]) -> int:
+    """moves の接尾辞のうち、それより前（最後の位置以外で終わる位置）にも出現した最も長いものの長さ"""
+    n = len(moves)
+    for length in range(n - 1, 0, -1):
+        suffix = moves[n - length:]
+        for end in range(length - 1, n - 1):
+            if moves[end - length + 1:end + 1] == suffix:
+                return length
+    return 0
+
+
+def verify(length: int = 250, seeds=range(2)) -> float:
+    """一致の長さと予測を全探索と比べる（失敗した場合は AssertionError）
+
+    Returns:
+        float: 予測に使った出現が最も新しい出現だった割合
+    """
+    matches = most_recent = 0
+    for seed in seeds:
+        for name, moves in _streams(length, seed):
+            for max_history, keep in ((length + 1, None), (67, 30), (40, 0)):
+                ai = HistoryMatchJankenAI(max_history=max_history, keep=keep, rng=random.Random(seed))
+                window: List[int] = []
+                for index, hand in enumerate(moves):
+                    if len(window) >= max_history:
+                        window = window[len(window) - ai.keep:] if ai.keep else []
+                    window.append(hand)
+                    ai.update_model(hand)
+                    where = f"{name} seed={seed} max_history={max_history} index={index}"
+                    expected = _brute_force(window)
+                    assert ai.match_length == expected, (where, ai.match_length, expected)
+                    predicted: Optional[int] = ai._predicted
+                    if expected:
+                        suffix = window[len(window) - expected:]
+                        end = ai._match_end
+                        assert expected - 1 <= end < len(window) - 1, (where, end)
+                        assert window[end - expected + 1:end + 1] == suffix, (where, end)
+                        assert predicted == window[end + 1], (where, predicted, window[end + 1])
+                        latest = max(other for other in range(expected - 1, len(window) - 1)
+                                     if window[other - expected + 1:other + 1] == suffix)
+                        matches += 1
+                        most_recent += end == latest
+                    else:
+                        assert predicted is None, where
+    return most_recent / matches
+
+
+def _linear_scan_predict(moves: List[int], max_length: int = 32) -> Optional[int]:
+    """毎手、履歴を後ろから全探索して最も長く一致する位置を探す（比較用の単純な方法）"""
+    n = len(moves)
+    best_length, best_end = 0, -1
+    for end in range(n - 2, -1, -1):
+        length = 0
+        while length < max_length and length <= end and moves[end - length] == moves[n - 1 - length]:
+            length += 1
+        if length > best_length:
+            best_length, best_end = length, end
+    return None if best_end < 0 else moves[best_end + 1]
+
+
+def bench(moves: int, checkpoints: List[int]) -> List[Tuple[int, float, int]]:
+    """手数が checkpoints に達するごとに、直前の区間の1手あたりのマイクロ秒と表の大きさ（バイト）を返す"""
+    rng = random.Random(0)
+    ai = HistoryMatchJankenAI(max_history=moves + 1)
+    results = []
+    done = 0
+    for checkpoint in checkpoints:
+        count = checkpoint - done
+        hands = [rng.randrange(3) if rng.random() < 0.3 else (i // 3) % 3 for i in range(count)]
+        update = ai.update_model
+        start = time.perf_counter()
+        for hand in hands:
+            update(hand)
+        micros = (time.perf_counter() - start) / count * 1e6
+        results.append((checkpoint, micros, ai.get_history_info()['table_bytes']))
+        done = checkpoint
+    return results
+
+
+def bench_linear_scan(history: int, probes: int = 20) -> float:
+    """全探索で1手予測するのにかかるマイクロ秒"""
+    rng = random.Random(0)
+    moves = [rng.randrange(3) for _ in range(history)]
+    start = time.perf_counter()
+    for _ in range(probes):
+        _linear_scan_predict(moves)
+    return (time.perf_counter() - start) / probes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="履歴照合AIの一致の確認と速度")
+    parser.add_argument('--moves', type=int, default=1_000_000, help="速度を計測する総手数")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    most_recent = verify()
+    print(f"一致の確認: OK ({time.perf_counter() - start:.2f}秒, 最も新しい出現を使った割合 {most_recent:.1%})")
+
+    checkpoints = [size for size in (1_000, 10_000, 100_000, 1_000_000, 10_000_000) if size < args.moves]
+    checkpoints.append(args.moves)
+    print(f"{'履歴の手数':>12} {'接尾辞オートマトン':>18} {'全探索':>12} {'表の大きさ':>14}")
+    for checkpoint, micros, table_bytes in bench(args.moves, checkpoints):
+        scan = f"{bench_linear_scan(checkpoint):,.0f} µs" if checkpoint <= 100_000 else "-"
+        print(f"{checkpoint:>12,} {micros:>15.2f} µs {scan:>12} {table_bytes / 2**20:>11.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""集団の事前分布で、新しいプレイヤーとの序盤の勝率がどれだけ上がるかを調べる
+
+「AIの直前の手に勝つ手を出しやすい」という癖を持つプレイヤーの集団を作り、
+前半のプレイヤーとの対戦から PopulationPrior を作ってから、後半の新しいプレイヤーと
+最初の数ラウンドだけ対戦させて、事前分布なし / ありのベイズAIの勝率を比べる。
+あわせて、別のプロセスから共有メモリの事前分布を読み取り専用で参照できることと、
+AI1つあたりのメモリが事前分布の有無で変わらないことを確認する。
+
+実行方法:
+    python -m benchmarks.bench_population_prior
+    python -m benchmarks.bench_population_prior --players 2000 --rounds 10 --bias 0.5
+"""
+import argparse
+import random
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from bayesian_ai.janken_ai import JankenAI
+from bayesian_ai.population_prior import PopulationPrior
+from janken_core.hands import BEATS, OUTCOME, WIN
+
+
+class BiasedPlayer:
+    """確率 bias でAIの直前の手に勝つ手を出し、それ以外はランダムに出すプレイヤー"""
+
+    def __init__(self, bias: float, rng: random.Random):
+        self.bias = bias
+        self.rng = rng
+        self.last_ai_hand: Optional[int] = None
+
+    def choose(self) -> int:
+        if self.last_ai_hand is not None and self.rng.random() < self.bias:
+            return BEATS[self.last_ai_hand]
+        return self.rng.randrange(3)
+
+
+def play(ai: JankenAI, player: BiasedPlayer, rounds: int) -> Tuple[int, list, list]:
+    """rounds ラウンド対戦し、(AIの勝利数, プレイヤーの手, AIの手) を返す"""
+    wins = 0
+    player_hands, ai_hands = [], []
+    for _ in range(rounds):
+        ai_hand = ai.choose()
+        player_hand = player.choose()
+        outcome = OUTCOME[ai_hand][player_hand]
+        wins += outcome == WIN
+        ai.observe(ai_hand, player_hand, outcome)
+        player.last_ai_hand = ai_hand
+        player_hands.append(player_hand)
+        ai_hands.append(ai_hand)
+    return wins, player_hands, ai_hands
+
+
+def early_win_rate(players: int, rounds: int, bias: float, prior: Optional[PopulationPrior],
+                   seed: int) -> float:
+    """新しいプレイヤー players 人と rounds ラウンドずつ対戦したときのAIの勝率"""
+    wins = 0
+    for index in range(players):
+        ai = JankenAI(max_history=30, decay_start=20, rng=random.Random(seed + index), prior=prior)
+        wins += play(ai, BiasedPlayer(bias, random.Random(-seed - index)), rounds)[0]
+    return wins / (players * rounds)
+
+
+def _read_in_worker(name: str) -> Tuple[float, ...]:
+    """ワーカープロセスで共有メモリの事前分布を参照する"""
+    prior = PopulationPrior.attach(name)
+    try:
+        return prior.counts()
+    finally:
+        prior.close()
+
+
+def _ai_size(prior: Optional[PopulationPrior]) -> int:
+    """AI1つを作ったときに増えるメモリ（バイト）"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    ai = JankenAI(max_history=30, decay_start=20, prior=prior)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del ai
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="集団の事前分布による序盤の勝率の変化")
+    parser.add_argument('--players', type=int, default=1_000, help="事前分布を作るプレイヤー数（評価も同じ人数）")
+    parser.add_argument('--history-rounds', type=int, default=100, help="事前分布を作る対戦のラウンド数")
+    parser.add_argument('--rounds', type=int, default=10, help="評価する序盤のラウンド数")
+    parser.add_argument('--bias', type=float, default=0.5, help="プレイヤーがAIの直前の手に勝つ手を出す確率")
+    args = parser.parse_args()
+
+    with PopulationPrior.create() as prior:
+        # 前半のプレイヤーとの対戦が終わるたびに事前分布に足す
+        for index in range(args.players):
+            ai = JankenAI(max_history=30, decay_start=20, rng=random.Random(index))
+            _, player_hands, ai_hands = play(ai, BiasedPlayer(args.bias, random.Random(10**6 + index)),
+                                             args.history_rounds)
+            prior.add_rounds(player_hands, ai_hands)
+
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            shared = executor.submit(_read_in_worker, prior.name).result()
+        assert shared == prior.counts(), (shared, prior.counts())
+        print(f"別のプロセスから参照した遷移回数: {[round(count) for count in shared]}")
+
+        seed = 2 * 10**6
+        without = early_win_rate(args.players, args.rounds, args.bias, None, seed)
+        with_prior = early_win_rate(args.players, args.rounds, args.bias, prior, seed)
+        print(f"最初の{args.rounds}ラウンドの勝率: 事前分布なし {without:.3f} / あり {with_prior:.3f}")
+        print(f"AI1つあたりのメモリ: 事前分布なし {_ai_size(None):,} バイト / あり {_ai_size(prior):,} バイト")
+
+
+if __name__ == "__main__":
+    main()
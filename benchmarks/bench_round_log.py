@@ -0,0 +1,46 @@
+"""対戦ログ（RoundLogWriter）を書き出すときの simulate の速度低下を計測する
+
+実行方法:
+    python -m benchmarks.bench_round_log
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ai_battle.battle import JankenBattle
+from ai_battle.round_log import RoundLogWriter
+
+
+def bench_simulate(rounds: int, log_path=None) -> float:
+    """simulate の1秒あたりのラウンド数を返す"""
+    round_log = RoundLogWriter(log_path) if log_path is not None else None
+    battle = JankenBattle(mode='aivsai', keep_history=False, round_log=round_log)
+    start = time.perf_counter()
+    battle.simulate(rounds, seed=0)
+    if round_log is not None:
+        round_log.close()
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="対戦ログの書き出しによる速度低下")
+    parser.add_argument('--rounds', type=int, default=1_000_000, help="計測するラウンド数")
+    parser.add_argument('--repeat', type=int, default=5, help="繰り返し回数（最速の値を使う）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, 'rounds.log')
+        # 計測のぶれを打ち消すため、ログなし・ありを交互に実行する
+        plain = logged = 0.0
+        for _ in range(args.repeat):
+            plain = max(plain, bench_simulate(args.rounds))
+            logged = max(logged, bench_simulate(args.rounds, log_path))
+
+    print(f"ログなし: {plain:>12,.0f} ラウンド/秒")
+    print(f"ログあり: {logged:>12,.0f} ラウンド/秒")
+    print(f"オーバーヘッド: {(plain / logged - 1) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""複数のスレッドで1つのモデルを共有したときの正しさと速度を調べる
+
+1. ストレステスト: 多数のスレッドが SharedTransitionModel に記録しながらスナップショットを読み、
+   スナップショットが常に整合していること（回数の合計 = total、version と total が減らないこと）と、
+   最後に全ての記録が1件も失われずに反映されていること、スレッドが全てのストライプに分かれていることを確認する
+2. スループット: 1 / 4 / 16 スレッドで、各スレッドがプレイヤー1人分のAI（choose + observe）を動かしたときの
+   1秒あたりの手数を、1つの JankenAI をグローバルなロックで守った場合と比べる
+
+実行方法:
+    python -m benchmarks.bench_shared_model
+    python -m benchmarks.bench_shared_model --moves 50000 --threads 1 --threads 4 --threads 16
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, List
+
+from bayesian_ai.janken_ai import JankenAI
+from bayesian_ai.shared_model import SharedJankenAI, SharedTransitionModel
+from janken_core.hands import OUTCOME
+
+THREAD_COUNTS = [1, 4, 16]
+
+
+def _run_threads(n_threads: int, target: Callable[[int], None]) -> float:
+    """n_threads 個のスレッドで target(スレッドの番号) を同時に開始し、全て終わるまでの秒数を返す"""
+    barrier = threading.Barrier(n_threads + 1)
+
+    def run(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def stress(n_threads: int = 16, records: int = 20_000) -> None:
+    """ストレステスト（失敗した場合は AssertionError）"""
+    # スレッドの切り替えを頻繁にして競合を起こりやすくする
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    model = SharedTransitionModel(stripes=4, batch_size=64).start(interval=0.001)
+    errors: List[str] = []
+    stripes_used = set()
+
+    def writer(index):
+        rng = random.Random(index)
+        last_version = last_total = 0
+        for i in range(records):
+            model.record(rng.randrange(9))
+            if i % 16 == 0:
+                snapshot = model.snapshot()
+                if sum(snapshot.counts) != snapshot.total:
+                    errors.append(f"回数の合計が total と一致しません: {snapshot}")
+                if snapshot.version < last_version or snapshot.total < last_total:
+                    errors.append("スナップショットが古くなりました")
+                last_version, last_total = snapshot.version, snapshot.total
+        stripes_used.add(id(model._local.stripe))
+
+    try:
+        _run_threads(n_threads, writer)
+        model.close()
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    expected = Counter()
+    for index in range(n_threads):
+        rng = random.Random(index)
+        expected.update(rng.randrange(9) for _ in range(records))
+    snapshot = model.snapshot()
+    assert not errors, errors[:3]
+    assert len(stripes_used) == min(n_threads, len(model._stripes)), stripes_used
+    assert snapshot.total == n_threads * records, (snapshot.total, n_threads * records)
+    assert list(snapshot.counts) == [expected[code] for code in range(9)], (snapshot.counts, expected)
+
+
+def _play(ai, moves: int, rng: random.Random) -> None:
+    """ランダムに手を出すプレイヤーと moves 手対戦させる"""
+    choose, observe = ai.choose, ai.observe
+    for _ in range(moves):
+        own = choose()
+        opp = rng.randrange(3)
+        observe(own, opp, OUTCOME[own][opp])
+
+
+def bench_shared(n_threads: int, moves: int) -> float:
+    """SharedJankenAI（プレイヤーごと）+ 共有モデルの1秒あたりの手数"""
+    model = SharedTransitionModel(stripes=max(16, n_threads)).start()
+    elapsed = _run_threads(n_threads, lambda index: _play(
+        SharedJankenAI(model, rng=random.Random(index)), moves, random.Random(index)))
+    model.close()
+    return n_threads * moves / elapsed
+
+
+def bench_global_lock(n_threads: int, moves: int) -> float:
+    """1つの JankenAI をグローバルなロックで守った場合の1秒あたりの手数"""
+    ai = JankenAI(max_history=1_000, decay_start=800, rng=random.Random(0))
+    lock = threading.Lock()
+
+    class Locked:
+        def choose(self):
+            with lock:
+                return ai.choose()
+
+        def observe(self, own, opp, outcome):
+            with lock:
+                ai.observe(own, opp, outcome)
+
+    elapsed = _run_threads(n_threads, lambda index: _play(Locked(), moves, random.Random(index)))
+    return n_threads * moves / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="共有モデルのストレステストとスループット")
+    parser.add_argument('--moves', type=int, default=20_000, help="スレッドごとの手数")
+    parser.add_argument('--threads', type=int, action='append', default=None, help="計測するスレッド数")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stress()
+    print(f"ストレステスト: OK ({time.perf_counter() - start:.2f}秒)")
+
+    print(f"{'threads':>8} {'共有モデル':>14} {'グローバルロック':>16}  (手/秒)")
+    for n_threads in args.threads or THREAD_COUNTS:
+        shared = bench_shared(n_threads, args.moves)
+        locked = bench_global_lock(n_threads, args.moves)
+        print(f"{n_threads:>8} {shared:>14,.0f} {locked:>16,.0f}")
+
+
+if __name__ == "__main__":
+    main()
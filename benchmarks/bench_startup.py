@@ -0,0 +1,89 @@
+"""起動時間（インポート時間とプロセスの実行時間）を計測する
+
+python -X importtime の出力から、最上位でインポートされたモジュールの累積時間を合計し、
+短い対戦を何度も別プロセスで起動する使い方でどれだけ時間がかかるかを調べる。
+
+実行方法:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 20 --top 15
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# 計測する起動方法（名前, python に渡す引数）
+SCENARIOS = [
+    ('import ai_battle.battle', ['-c', 'import ai_battle.battle']),
+    ('ベイズAI vs パターンAI を作成', ['-c', 'from ai_battle.battle import JankenBattle; JankenBattle()']),
+    ('python -m ai_battle --aivsai (100ラウンド)',
+     ['-m', 'ai_battle', '--aivsai', '--rounds', '100', '--quiet', '--seed', '0']),
+    ('python -m ai_battle.tournament --help', ['-m', 'ai_battle.tournament', '--help']),
+]
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int]]:
+    """-X importtime の出力を (モジュール名, 自身の時間, 累積時間) のリストにする（マイクロ秒）
+
+    名前の前の空白はインポートの深さを表すので、そのまま残す。
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        # 区切りの '|' の後ろの空白1つを除く
+        modules.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+    return modules
+
+
+def run_scenario(args: List[str]) -> Tuple[float, float, List[Tuple[str, int, int]]]:
+    """1回起動して (プロセスの実行時間[ms], インポート時間の合計[ms], モジュールごとの時間) を返す"""
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                               capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - start) * 1e3
+    modules = parse_importtime(completed.stderr)
+    # 最上位（名前の前に空白がない）のモジュールの累積時間の合計が、インポートにかかった時間
+    import_ms = sum(cumulative for name, _, cumulative in modules if not name.startswith(' ')) / 1e3
+    return wall_ms, import_ms, modules
+
+
+def bench_startup(repeat: int) -> Dict[str, Dict[str, object]]:
+    """各起動方法を repeat 回ずつ起動して中央値を返す"""
+    results = {}
+    for label, args in SCENARIOS:
+        runs = [run_scenario(args) for _ in range(repeat)]
+        modules = runs[-1][2]
+        results[label] = {
+            'wall_ms': statistics.median(run[0] for run in runs),
+            'import_ms': statistics.median(run[1] for run in runs),
+            'modules': modules,
+            'numpy': any(name.strip() == 'numpy' for name, _, _ in modules),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間の計測（python -X importtime）")
+    parser.add_argument('--repeat', type=int, default=10, help="起動方法ごとの起動回数")
+    parser.add_argument('--top', type=int, default=10, help="表示する時間のかかったモジュールの数")
+    args = parser.parse_args()
+
+    # Python 自体の起動時間（比較用）
+    baseline = statistics.median(run_scenario(['-c', 'pass'])[0] for _ in range(args.repeat))
+    print(f"python -c pass: {baseline:.1f} ms")
+
+    for label, result in bench_startup(args.repeat).items():
+        print(f"\n=== {label} ===")
+        print(f"プロセス: {result['wall_ms']:.1f} ms（Python 自体の起動を除くと {result['wall_ms'] - baseline:.1f} ms）")
+        print(f"インポート: {result['import_ms']:.1f} ms, numpy: {'読み込む' if result['numpy'] else '読み込まない'}")
+        own_modules = [m for m in result['modules'] if not m[0].startswith(' ')]
+        for name, _, cumulative in sorted(own_modules, key=lambda m: m[2], reverse=True)[:args.top]:
+            print(f"  {cumulative / 1e3:8.2f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""AIとバトルループの性能をまとめて計測するベンチマークスイート
+
+各計測は {名前: {'value': 値, 'unit': 単位, 'better': 'higher' または 'lower'}} の形で返す。
+"""
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+from ai_battle.battle import JankenBattle
+from bayesian_ai.janken_ai import JankenAI
+from pattern_ai.janken_ai import PatternJankenAI
+
+MAX_HISTORIES = [30, 1_000, 100_000]
+
+
+def _metric(value: float, unit: str, better: str) -> Dict[str, Any]:
+    return {'value': value, 'unit': unit, 'better': better}
+
+
+def _best_of(repeat: int, func: Callable[[], float]) -> float:
+    """func を repeat 回実行して最小の所要時間を返す"""
+    return min(func() for _ in range(repeat))
+
+
+def bench_bayesian(moves: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """JankenAI の update_model / predict_next_hand の1手あたりの時間"""
+    results = {}
+    rng = random.Random(0)
+    for max_history in MAX_HISTORIES:
+        ai = JankenAI(max_history=max_history, decay_start=max_history * 2 // 3)
+        # 履歴を満杯にしてから計測する
+        for _ in range(max_history + 1):
+            ai.update_model(rng.randrange(3))
+        stream = [rng.randrange(3) for _ in range(moves)]
+
+        def run_update():
+            start = time.perf_counter()
+            for hand in stream:
+                ai.update_model(hand)
+            return time.perf_counter() - start
+
+        def run_predict():
+            start = time.perf_counter()
+            for _ in range(moves):
+                ai.predict_next_hand()
+            return time.perf_counter() - start
+
+        results[f'bayesian.update_model[max_history={max_history}]'] = _metric(
+            _best_of(repeat, run_update) / moves * 1e6, 'us', 'lower')
+        results[f'bayesian.predict_next_hand[max_history={max_history}]'] = _metric(
+            _best_of(repeat, run_predict) / moves * 1e6, 'us', 'lower')
+    return results
+
+
+def bench_pattern(moves: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """PatternJankenAI の get_next_hand + update_sequence の1秒あたりの回数"""
+    ai = PatternJankenAI()
+    rng = random.Random(0)
+    results_stream = [rng.choice(('win', 'lose', 'draw')) for _ in range(moves)]
+
+    def run():
+        start = time.perf_counter()
+        for result in results_stream:
+            ai.last_hand = ai.get_next_hand()
+            ai.update_sequence(result)
+        return time.perf_counter() - start
+
+    return {'pattern.get_next_hand+update_sequence': _metric(
+        moves / _best_of(repeat, run), 'ops/s', 'higher')}
+
+
+def bench_judge(rounds: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """JankenBattle.judge の1秒あたりの回数"""
+    battle = JankenBattle(mode='aivsai')
+    judge = battle.judge
+    rng = random.Random(0)
+    pairs = [(rng.randrange(3), rng.randrange(3)) for _ in range(rounds)]
+
+    def run():
+        start = time.perf_counter()
+        for hand1, hand2 in pairs:
+            judge(hand1, hand2)
+        return time.perf_counter() - start
+
+    return {'battle.judge': _metric(rounds / _best_of(repeat, run), 'ops/s', 'higher')}
+
+
+def bench_play_round(rounds: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    """AI vs AI モードの play_round と simulate の1秒あたりのラウンド数（出力なし）"""
+    def run_play_round():
+        battle = JankenBattle(mode='aivsai', seed=0)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            battle.play_round()
+        return time.perf_counter() - start
+
+    def run_simulate():
+        battle = JankenBattle(mode='aivsai', keep_history=False)
+        start = time.perf_counter()
+        battle.simulate(rounds, seed=0)
+        return time.perf_counter() - start
+
+    return {
+        'battle.play_round': _metric(rounds / _best_of(repeat, run_play_round), 'rounds/s', 'higher'),
+        'battle.simulate': _metric(rounds / _best_of(repeat, run_simulate), 'rounds/s', 'higher'),
+    }
+
+
+def bench_memory(rounds: int) -> Dict[str, Dict[str, Any]]:
+    """履歴を残しながら長く対戦したときのピークメモリ（tracemalloc で計測）"""
+    tracemalloc.start()
+    try:
+        battle = JankenBattle(mode='aivsai', seed=0)
+        for _ in range(rounds):
+            battle.play_round()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'memory.play_round.peak': _metric(peak / 1e6, 'MB', 'lower'),
+        'memory.play_round.bytes_per_round': _metric(peak / rounds, 'B', 'lower'),
+    }
+
+
+def run_suite(quick: bool = False) -> Dict[str, Dict[str, Any]]:
+    """全ての計測を実行
+
+    Args:
+        quick: Trueの場合は計測回数を減らして短時間で終わらせる
+    """
+    scale = 10 if quick else 1
+    repeat = 1 if quick else 3
+
+    results = {}
+    results.update(bench_bayesian(50_000 // scale, repeat))
+    results.update(bench_pattern(200_000 // scale, repeat))
+    results.update(bench_judge(500_000 // scale, repeat))
+    results.update(bench_play_round(200_000 // scale, repeat))
+    results.update(bench_memory(200_000 // scale))
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            tolerance: float) -> Dict[str, Dict[str, Any]]:
+    """基準の結果と比べて、許容範囲を超えて悪化した項目を返す
+
+    Args:
+        results: 今回の結果
+        baseline: 基準の結果
+        tolerance: 許容する悪化の割合（0.1 なら10%）
+
+    Returns:
+        Dict[str, Dict[str, Any]]: 悪化した項目ごとの {'baseline', 'current', 'change'}
+    """
+    regressions = {}
+    for name, metric in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = metric['value']
+        if not old:
+            continue
+        change = (new - old) / old
+        worse = -change if metric['better'] == 'higher' else change
+        if worse > tolerance:
+            regressions[name] = {'baseline': old, 'current': new, 'change': change}
+    return regressions
@@ -0,0 +1 @@
+# Ensemble AI パッケージ
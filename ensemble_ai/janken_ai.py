@@ -0,0 +1,165 @@
+from janken_core.hands import HANDS, BEATS, OUTCOME, WIN, LOSE
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+
+# 勝敗コード（DRAW, WIN, LOSE）ごとの得点
+OUTCOME_SCORE = (0.0, 1.0, -1.0)
+
+class EnsembleJankenAI:
+    """複数の予測器を同時に動かし、最近の成績が最も良い予測器の手を出すAI
+
+    予測器:
+        - markov(k): 相手の直近k手に続いた手の回数から予測（k=1 が1次のマルコフ連鎖）
+        - frequency: 相手が出した手の回数から予測
+        - pattern: パターン認識AIと同じく、勝ったら次の手・負けたら前の手を出す
+
+    全ての予測器の状態は、相手の手を受け取るたびに1回の update_model でまとめて更新する。
+    どの予測器も履歴を走査しないため、1手あたりのコストは履歴の長さによらない。
+    """
+
+    display_name = "アンサンブルAI"
+
+    def __init__(self, orders=(1, 2, 3), use_frequency=True, use_pattern=True, score_decay=0.9, rng=None):
+        """
+        初期化
+
+        Args:
+            orders: markov 予測器で使う直近の手の数のリスト
+            use_frequency: frequency 予測器を使うかどうか
+            use_pattern: pattern 予測器を使うかどうか
+            score_decay: 予測器の得点を1手ごとに減衰させる係数
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+        """
+        self.hands = HANDS
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        self.orders = tuple(orders)
+        self.use_frequency = use_frequency
+        self.use_pattern = use_pattern
+        self.score_decay = score_decay
+
+        self.predictor_names = [f"markov({order})" for order in self.orders]
+        if use_frequency:
+            self.predictor_names.append("frequency")
+        if use_pattern:
+            self.predictor_names.append("pattern")
+
+        # 相手の直近の手（3進数のコード、一番下の桁が最新の手）
+        self._max_order = max(self.orders, default=0)
+        self._context_mod = 3 ** self._max_order
+        self._context = 0
+        self._moves_seen = 0
+        self._order_mods = [3 ** order for order in self.orders]
+        # markov(k) の回数表: counts[i][context_k * 3 + 次の手]
+        self._markov_counts = [[0] * (3 ** (order + 1)) for order in self.orders]
+        self._frequency = [0, 0, 0]
+
+        # 自分が前回出した手と、その勝敗コード
+        self._own_last = None
+        self._own_outcome = None
+
+        # 各予測器の得点と、次の手の提案
+        self.scores = [0.0] * len(self.predictor_names)
+        self._proposals = [None] * len(self.predictor_names)
+
+    def predict_next_hand(self):
+        """得点が最も高い予測器の手を出す
+
+        Returns:
+            Hand: 出す手
+        """
+        best = None
+        best_score = None
+        for i, proposal in enumerate(self._proposals):
+            if proposal is not None and (best_score is None or self.scores[i] > best_score):
+                best, best_score = proposal, self.scores[i]
+
+        hand = best if best is not None else self._random_hand()
+        self._own_last = hand
+        return hand
+
+    def update_model(self, user_hand):
+        """相手の手を受け取り、全ての予測器の得点と状態をまとめて更新
+
+        Args:
+            user_hand: 相手の手（整数コード 0〜2）
+        """
+        if not 0 <= user_hand <= 2:
+            return
+
+        # 前回の各提案を相手の手で採点
+        decay = self.score_decay
+        scores = self.scores
+        for i, proposal in enumerate(self._proposals):
+            scores[i] *= decay
+            if proposal is not None:
+                scores[i] += OUTCOME_SCORE[OUTCOME[proposal][user_hand]]
+
+        if self._own_last is not None:
+            self._own_outcome = OUTCOME[self._own_last][user_hand]
+
+        # 回数表を更新して文脈を1手ずらし、そのまま次の提案を作る
+        context = self._context
+        seen = self._moves_seen
+        proposals = self._proposals
+        new_context = (context * 3 + user_hand) % self._context_mod if self._max_order else 0
+        for i, order in enumerate(self.orders):
+            counts = self._markov_counts[i]
+            mod = self._order_mods[i]
+            if seen >= order:
+                counts[(context % mod) * 3 + user_hand] += 1
+            proposals[i] = None
+            if seen + 1 >= order:
+                base = (new_context % mod) * 3
+                proposals[i] = self._counter(counts[base], counts[base + 1], counts[base + 2])
+        self._context = new_context
+        self._moves_seen = seen + 1
+
+        i = len(self.orders)
+        if self.use_frequency:
+            self._frequency[user_hand] += 1
+            proposals[i] = self._counter(*self._frequency)
+            i += 1
+        if self.use_pattern:
+            proposals[i] = self._pattern_hand()
+
+    @staticmethod
+    def _counter(rock, scissors, paper):
+        """最も回数の多い手に勝つ手を返す（データがない場合はNone）"""
+        if rock >= scissors and rock >= paper:
+            if rock == 0:
+                return None
+            return BEATS[0]
+        return BEATS[1] if scissors >= paper else BEATS[2]
+
+    def _pattern_hand(self):
+        """パターン認識AIと同じ規則で次の手を決める（引き分けならNone）"""
+        if self._own_outcome == WIN:
+            return HANDS[(self._own_last + 1) % 3]
+        if self._own_outcome == LOSE:
+            return HANDS[(self._own_last - 1) % 3]
+        return None
+
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = predict_next_hand
+
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を受け取り、相手の手を学習
+
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        self.update_model(opp)
+
+    def get_history_info(self):
+        """現在の状態を取得（デバッグ用）"""
+        return {
+            'moves_seen': self._moves_seen,
+            'scores': dict(zip(self.predictor_names, self.scores)),
+        }
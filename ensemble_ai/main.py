@@ -0,0 +1,61 @@
+from janken_core.hands import INPUT_TO_HAND, OUTCOME, WIN, LOSE, hand_label
+
+from .janken_ai import EnsembleJankenAI
+
+def get_user_hand():
+    """ユーザーからの入力を取得"""
+    while True:
+        print("\n手を選んでください")
+        print("1: ✊ グー")
+        print("2: ✌️ チョキ")
+        print("3: ✋ パー")
+        print("q: 終了")
+        print("選択: ", end="")
+        user_input = input().strip().lower()
+        
+        if user_input == 'q':
+            return None
+            
+        if user_input in INPUT_TO_HAND:
+            return INPUT_TO_HAND[user_input]
+        else:
+            print("無効な入力です。1から3の数字を入力するか、qで終了してください。")
+
+def judge(ai_hand, user_hand):
+    """勝敗を判定"""
+    outcome = OUTCOME[ai_hand][user_hand]
+    if outcome == WIN:
+        return "🤖 AIの勝ち"
+    elif outcome == LOSE:
+        return "🎉 あなたの勝ち"
+    else:
+        return "🤝 引き分け"
+
+def main():
+    print("🎮 アンサンブルじゃんけんAI スタート！")
+    print("-----------------------------------")
+    
+    ai = EnsembleJankenAI()
+    
+    while True:
+        # ユーザーの手を取得
+        user_hand = get_user_hand()
+        if user_hand is None:
+            print("ゲームを終了します。")
+            break
+            
+        # AIの手を決定
+        ai_hand = ai.predict_next_hand()
+        
+        # 結果を表示
+        print(f"\nあなた: {hand_label(user_hand)}")
+        print(f"AI: {hand_label(ai_hand)}")
+        print(f"結果: {judge(ai_hand, user_hand)}")
+        
+        # モデルを更新
+        ai.update_model(user_hand)
+        
+        print("-----------------------------------")
+
+if __name__ == "__main__":
+    main()
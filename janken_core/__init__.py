@@ -0,0 +1 @@
+# 共通部品パッケージ
@@ -0,0 +1,50 @@
+from enum import IntEnum
+
+
+class Hand(IntEnum):
+    """じゃんけんの手（0: グー, 1: チョキ, 2: パー）"""
+    ROCK = 0
+    SCISSORS = 1
+    PAPER = 2
+
+
+# 手の一覧（整数コードでそのまま引けるようにタプルで保持）
+HANDS = (Hand.ROCK, Hand.SCISSORS, Hand.PAPER)
+
+# 表示用のラベル（画面に出すときだけ使う）
+HAND_LABELS = ('✊ グー', '✌️ チョキ', '✋ パー')
+LABEL_TO_HAND = {label: hand for hand, label in zip(HANDS, HAND_LABELS)}
+
+# キーボード入力から手への対応
+INPUT_TO_HAND = {'1': Hand.ROCK, '2': Hand.SCISSORS, '3': Hand.PAPER}
+
+# 勝敗コード（1つ目の手から見た結果）
+DRAW = 0
+WIN = 1
+LOSE = 2
+
+# OUTCOME[hand1][hand2] = hand1 から見た勝敗コード
+# 相手の手が自分の手の「次」（(hand2 - hand1) % 3 == 1）なら勝ち
+OUTCOME = tuple(
+    tuple((hand2 - hand1) % 3 for hand2 in range(3))
+    for hand1 in range(3)
+)
+
+# 両者の手を hand1 * 3 + hand2 の1つのコードにまとめたときの勝敗表
+OUTCOME_BY_CODE = tuple(OUTCOME[code // 3][code % 3] for code in range(9))
+
+# BEATS[hand] = hand に勝つ手
+# グー(0) < パー(2), チョキ(1) < グー(0), パー(2) < チョキ(1)
+BEATS = tuple(HANDS[(hand - 1) % 3] for hand in range(3))
+
+
+def hand_label(hand) -> str:
+    """手を表示用のラベルに変換
+
+    Args:
+        hand: 手の整数コード（0〜2）
+
+    Returns:
+        str: 絵文字付きのラベル
+    """
+    return HAND_LABELS[hand]
@@ -0,0 +1,66 @@
+"""AIごとの乱数生成器
+
+各AIは random モジュールの関数（プロセス全体で共有される状態）ではなく、
+インスタンスごとの乱数生成器から手を選ぶ。乱数生成器には random.Random と
+NumPy の Generator のどちらも渡せる。
+
+マスターシードからAI・対戦ごとのシードを derive_seed で導出すると、
+どのプロセスでどの順番に実行しても同じ乱数列になる。
+"""
+import random
+from typing import Any, Callable, Optional
+
+from janken_core.hands import HANDS, Hand
+
+
+def derive_seed(seed: Any, *keys: Any) -> int:
+    """マスターシードとキー（AIの位置や組み合わせの番号など）から64ビットのシードを導出
+
+    文字列を種にした random.Random（SHA-512 で種を作る）を使うため、
+    PYTHONHASHSEED やプロセスによらず同じ値になる。
+    """
+    return random.Random(repr((seed,) + keys)).getrandbits(64)
+
+
+def make_rng(seed: Optional[int] = None, *keys: Any) -> random.Random:
+    """乱数生成器を作成
+
+    Args:
+        seed: シード（Noneの場合はOSの乱数で初期化）
+        *keys: 指定した場合は derive_seed(seed, *keys) をシードにする
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random(derive_seed(seed, *keys) if keys else seed)
+
+
+def reseed_rng(rng: Any, seed: int) -> Any:
+    """rng と同じ種類の乱数生成器をシードで作り直す
+
+    NumPy の Generator は同じ BitGenerator で、random.Random（とそのサブクラス）は同じクラスで作り直すので、
+    AIに渡した乱数生成器の種類が JankenBattle.reseed で変わらない。
+
+    Args:
+        rng: いまの乱数生成器（random.Random、numpy.random.Generator、または random モジュール）
+        seed: シード
+    """
+    if hasattr(rng, 'bit_generator'):
+        # numpy.random.Generator
+        return type(rng)(type(rng.bit_generator)(seed))
+    if isinstance(rng, random.Random):
+        return type(rng)(seed)
+    return make_rng(seed)
+
+
+def hand_chooser(rng: Any) -> Callable[[], Hand]:
+    """乱数生成器から手をランダムに1つ選ぶ関数を作成
+
+    Args:
+        rng: random.Random（または random モジュール）か numpy.random.Generator
+    """
+    if hasattr(rng, 'integers'):
+        # numpy.random.Generator
+        integers = rng.integers
+        return lambda: HANDS[int(integers(3))]
+    choice = rng.choice
+    return lambda: choice(HANDS)
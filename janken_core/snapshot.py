@@ -0,0 +1,77 @@
+"""AIの学習状態を保存・復元するためのバイナリ形式（スナップショット）
+
+スナップショットは、次の共通ヘッダーと、AIの種類ごとの本体から成る。
+
+    ヘッダー（8バイト、リトルエンディアン）
+        magic   4s  b'JKSN'
+        version u2  形式のバージョン（FORMAT_VERSION）
+        kind    u1  AIの種類（KIND_BAYESIAN, KIND_PATTERN）
+        (予約)  1バイト
+
+本体の中身は各AIの to_snapshot / from_snapshot が決める。
+形式を変えたときは FORMAT_VERSION を上げ、古いバージョンも読めるようにしておく
+（SUPPORTED_VERSIONS にないバージョンは ValueError にする）。
+
+    バージョン1  最初の形式
+    バージョン2  ベイズAIの本体に減衰スケジュールを追加
+"""
+import struct
+from importlib import import_module
+from typing import Tuple
+
+MAGIC = b'JKSN'
+FORMAT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+HEADER = struct.Struct('<4sHBx')
+
+# AIの種類
+KIND_BAYESIAN = 1
+KIND_PATTERN = 2
+
+# 種類 -> 'モジュール名:クラス名'（読み込むときに初めてインポートする）
+_KINDS = {
+    KIND_BAYESIAN: 'bayesian_ai.janken_ai:JankenAI',
+    KIND_PATTERN: 'pattern_ai.janken_ai:PatternJankenAI',
+}
+
+
+def pack_header(kind: int) -> bytes:
+    """スナップショットのヘッダーを作成"""
+    return HEADER.pack(MAGIC, FORMAT_VERSION, kind)
+
+
+def unpack_header(data: bytes, expected_kind: int = None) -> Tuple[int, int]:
+    """ヘッダーを検証してAIの種類とバージョンを返す
+
+    Args:
+        data: スナップショット
+        expected_kind: 期待するAIの種類（Noneの場合は検証しない）
+
+    Returns:
+        Tuple[AIの種類, バージョン]（本体は data[HEADER.size:] から始まる）
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("スナップショットが短すぎます")
+    magic, version, kind = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("スナップショットの形式ではありません")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"対応していないスナップショットのバージョンです: {version}")
+    if expected_kind is not None and kind != expected_kind:
+        raise ValueError(f"AIの種類が違います: {kind}（期待値 {expected_kind}）")
+    return kind, version
+
+
+def load_snapshot(data: bytes, **options):
+    """スナップショットからAIを復元（AIの種類はヘッダーから判断）
+
+    Args:
+        data: スナップショット
+        **options: from_snapshot に渡す引数（max_history など）
+    """
+    kind, _ = unpack_header(data)
+    if kind not in _KINDS:
+        raise ValueError(f"不明なAIの種類です: {kind}")
+    module_name, class_name = _KINDS[kind].split(':')
+    cls = getattr(import_module(module_name), class_name)
+    return cls.from_snapshot(data, **options)
@@ -0,0 +1,101 @@
+"""AIの共通インターフェース（戦略）と、名前からAIを作成するレジストリ
+
+対戦ループからは、AIを次の2つのメソッドだけで扱う。
+
+    choose() -> int
+        次に出す手（整数コード）を返す
+    observe(own, opp, outcome) -> None
+        ラウンドの結果を受け取る（own: 自分の手, opp: 相手の手, outcome: 自分から見た勝敗コード）
+
+レジストリには 'モジュール名:クラス名' を登録しておき、作成するときに初めてインポートする。
+そのため、使わないAI（と、そのAIだけが必要とするパッケージ）は読み込まれない。
+"""
+from importlib import import_module
+from typing import Any, Callable, Dict, Protocol, Union
+
+
+class Strategy(Protocol):
+    """対戦ループから呼ばれるAIのインターフェース"""
+
+    def choose(self) -> int:
+        ...
+
+    def observe(self, own: int, opp: int, outcome: int) -> None:
+        ...
+
+
+# 戦略の名前 -> 'モジュール名:クラス名' または AIを返す関数
+_REGISTRY: Dict[str, Union[str, Callable[..., Any]]] = {
+    'bayesian': 'bayesian_ai.janken_ai:JankenAI',
+    'pattern': 'pattern_ai.janken_ai:PatternJankenAI',
+    'ngram': 'bayesian_ai.ngram_ai:NGramJankenAI',
+    'ensemble': 'ensemble_ai.janken_ai:EnsembleJankenAI',
+    'autotune': 'bayesian_ai.autotune:AutoTuneJankenAI',
+    'history': 'bayesian_ai.history_match_ai:HistoryMatchJankenAI',
+}
+
+
+def register_strategy(name: str, target: Union[str, Callable[..., Any]]) -> None:
+    """戦略をレジストリに登録
+
+    Args:
+        name: 戦略の名前
+        target: 'モジュール名:クラス名' の文字列、またはAIを返す関数
+    """
+    _REGISTRY[name] = target
+
+
+def available_strategies():
+    """登録されている戦略の名前の一覧を返す"""
+    return sorted(_REGISTRY)
+
+
+def create_strategy(name: str, **options) -> Strategy:
+    """名前からAIを作成
+
+    Args:
+        name: 戦略の名前
+        **options: AIのコンストラクタに渡す引数
+
+    Returns:
+        Strategy: 作成したAI
+    """
+    if name not in _REGISTRY:
+        raise ValueError(f"不明なAIの種類です: {name}")
+
+    target = _REGISTRY[name]
+    if isinstance(target, str):
+        module_name, class_name = target.split(':')
+        try:
+            module = import_module(module_name)
+        except ModuleNotFoundError as e:
+            missing = e.name or ''
+            if module_name == missing or module_name.startswith(missing + '.'):
+                # AIのモジュール自体が見つからない場合はそのまま伝える
+                raise
+            # AIが追加のパッケージ（numpy など）を必要としていてインストールされていない場合
+            raise ImportError(f"AI '{name}' を使うにはパッケージ '{e.name}' が必要です"
+                              f"（pip install -r requirements.txt でインストールできます）") from e
+        target = getattr(module, class_name)
+    return target(**options)
+
+
+def resolve_strategy(spec: Any, **options) -> Strategy:
+    """名前またはAIのインスタンスから、対戦に使うAIを決める
+
+    Args:
+        spec: 戦略の名前、またはAIのインスタンス
+        **options: 名前で指定した場合にコンストラクタに渡す引数
+
+    Returns:
+        Strategy: choose と observe を持つAI
+    """
+    strategy = create_strategy(spec, **options) if isinstance(spec, str) else spec
+    if not callable(getattr(strategy, 'choose', None)) or not callable(getattr(strategy, 'observe', None)):
+        raise TypeError(f"{type(strategy).__name__} は choose / observe を持っていません")
+    return strategy
+
+
+def strategy_name(strategy: Any) -> str:
+    """AIの表示名を返す"""
+    return getattr(strategy, 'display_name', type(strategy).__name__)
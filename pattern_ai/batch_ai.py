@@ -0,0 +1,70 @@
+import numpy as np
+
+from pattern_ai.patterns import pattern_table
+
+class BatchPatternAI:
+    """B個の独立したパターンAI（PatternJankenAI）をまとめて1回の配列演算で進めるクラス
+
+    PatternJankenAI と同じ (last_hand, result, step) -> 次の手 の表を配列にして使い、
+    ゲームごとの状態は表の位置とシーケンスの終わりの位置だけを持つ。
+    """
+
+    def __init__(self, batch_size, patterns=None, rng=None):
+        """
+        初期化
+
+        Args:
+            batch_size: 同時に扱うゲーム数
+            patterns: 手のシーケンスのパターン（PatternJankenAI と同じ）
+            rng: シーケンスがないときの手を選ぶ numpy.random.Generator（省略時は新規作成）
+        """
+        self.batch_size = batch_size
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+        table = pattern_table(patterns)
+        self._stride = table.stride
+        self._table = np.array(table.hands, dtype=np.int8)
+        self._lengths = np.array(table.lengths, dtype=np.int64)
+
+        # 次に出す手の表の位置と、シーケンスの終わりの位置（同じならシーケンスは空）
+        self._pos = np.zeros(batch_size, dtype=np.int64)
+        self._end = np.zeros(batch_size, dtype=np.int64)
+        # 直前の手（まだない場合は -1）
+        self.last_hand = np.full(batch_size, -1, dtype=np.int8)
+
+    def _random_hands(self, missing):
+        """missing が True のゲームの手をランダムに選ぶ"""
+        return self.rng.integers(0, 3, size=int(missing.sum()), dtype=np.int8)
+
+    def choose(self, random_hands=None):
+        """全ゲームの次の手を返す
+
+        Args:
+            random_hands: シーケンスが空のゲームの手を選ぶ関数（BatchJankenAI.predict と同じ）
+
+        Returns:
+            numpy.ndarray: 各ゲームで出す手（整数コード）の配列 (B,)
+        """
+        pos = self._pos
+        active = pos != self._end
+        hands = self._table[np.where(active, pos, 0)]
+        missing = ~active
+        if missing.any():
+            hands[missing] = (random_hands or self._random_hands)(missing)
+        self._pos = pos + active
+        return hands
+
+    def observe(self, own, outcome):
+        """全ゲームのラウンドの結果を受け取り、シーケンスの先頭に移動
+
+        Args:
+            own: 各ゲームで自分が出した手の配列 (B,)
+            outcome: 各ゲームの自分から見た勝敗コードの配列 (B,)
+        """
+        own = np.asarray(own, dtype=np.int64)
+        outcome = np.asarray(outcome, dtype=np.int64)
+        length = self._lengths[outcome]
+        start = np.where(length > 0, (own * 3 + outcome) * self._stride, 0)
+        self._pos = start
+        self._end = start + length
+        self.last_hand = own.astype(np.int8)
@@ -1,48 +1,145 @@
-import random
+import struct
+
+from janken_core.hands import HANDS
+from janken_core.rng import hand_chooser, make_rng, reseed_rng
+from janken_core.snapshot import HEADER, KIND_PATTERN, pack_header, unpack_header
+from pattern_ai.patterns import RESULT_CODES, pattern_table
+
+# スナップショット本体: last_hand（なしは-1）, シーケンスの長さ（このあとに手が1バイトずつ続く）
+_SNAPSHOT_BODY = struct.Struct('<bB')
 
 class PatternJankenAI:
-    def __init__(self):
-        # 手の定義
-        self.hands = ['✊ グー', '✌️ チョキ', '✋ パー']
-        self.hand_to_num = {'✊ グー': 0, '✌️ チョキ': 1, '✋ パー': 2}
-        self.num_to_hand = {0: '✊ グー', 1: '✌️ チョキ', 2: '✋ パー'}
-        self.input_to_hand = {'1': '✊ グー', '2': '✌️ チョキ', '3': '✋ パー'}
+    display_name = "パターンAI"
+    
+    def __init__(self, patterns=None, rng=None):
+        """
+        初期化
+        
+        Args:
+            patterns: 手のシーケンスのパターン（pattern_ai.patterns の名前か、
+                {'win': '120', 'lose': '210', 'draw': ''} のような辞書、省略時は 'default'）
+            rng: 手をランダムに選ぶときの乱数生成器（random.Random または numpy.random.Generator、省略時は新規作成）
+        """
+        # 手の定義（整数コード 0: グー, 1: チョキ, 2: パー）
+        self.hands = HANDS
+        
+        # 乱数生成器（インスタンスごとに持ち、random モジュールの状態は使わない）
+        self.rng = rng if rng is not None else make_rng()
+        self._random_hand = hand_chooser(self.rng)
+        
+        # (last_hand, result, step) -> 次の手 の表（同じパターンのAIで共有する）
+        self.patterns = patterns
+        table = pattern_table(patterns)
+        self._stride = table.stride
+        self._table = table.hands
+        self._lengths = table.lengths
         
         # 状態管理
         self.last_hand = None
         self.last_result = None  # 'win', 'lose', 'draw'
-        self.sequence = []
+        # 次に出す手の表の位置と、シーケンスの終わりの位置（_pos == _end ならシーケンスは空）
+        self._pos = 0
+        self._end = 0
         
     def get_next_hand(self):
         """次の手を決定する"""
-        if not self.sequence:
+        pos = self._pos
+        if pos == self._end:
             # シーケンスが空の場合はランダムに手を選ぶ
-            return random.choice(self.hands)
+            return self._random_hand()
             
         # シーケンスに従って手を選ぶ
-        next_hand = self.sequence.pop(0)
-        return next_hand
+        self._pos = pos + 1
+        return self._table[pos]
     
     def update_sequence(self, result):
         """勝敗結果に基づいて次の手のシーケンスを更新
         
+        勝った場合のシーケンス（default）: グー → チョキ → パー → グー → ...
+        負けた場合のシーケンス（default）: グー → パー → チョキ → グー → ...
+        引き分けの場合はシーケンスをリセット
+        
         Args:
             result: 前回の結果 ('win', 'lose', 'draw')
         """
-        if result == 'win':
-            # 勝った場合のシーケンス: グー → チョキ → パー → グー → ...
-            self.sequence = [
-                self.num_to_hand[(self.hand_to_num[self.last_hand] + 1) % 3],  # チョキ
-                self.num_to_hand[(self.hand_to_num[self.last_hand] - 1) % 3],  # パー
-                self.num_to_hand[self.hand_to_num[self.last_hand]]             # グー
-            ]
-        elif result == 'lose':
-            # 負けた場合のシーケンス: グー → パー → チョキ → グー → ...
-            self.sequence = [
-                self.num_to_hand[(self.hand_to_num[self.last_hand] - 1) % 3],  # パー
-                self.num_to_hand[(self.hand_to_num[self.last_hand] + 1) % 3],  # チョキ
-                self.num_to_hand[self.hand_to_num[self.last_hand]]             # グー
-            ]
-        # 引き分けの場合はシーケンスをリセット
+        self.observe(self.last_hand, None, RESULT_CODES[result])
+    
+    @property
+    def sequence(self):
+        """残りのシーケンス（これから出す手のリスト）"""
+        return list(self._table[self._pos:self._end])
+    
+    @sequence.setter
+    def sequence(self, hands):
+        """残りのシーケンスを設定（表の中で同じ手が続く位置を探す）"""
+        hands = tuple(HANDS[hand] for hand in hands)
+        if not hands:
+            self._pos = self._end = 0
+            return
+        for outcome, length in enumerate(self._lengths):
+            for last_hand in HANDS:
+                end = (last_hand * 3 + outcome) * self._stride + length
+                if length >= len(hands) and self._table[end - len(hands):end] == hands:
+                    self._pos, self._end = end - len(hands), end
+                    return
+        raise ValueError("パターンに含まれないシーケンスです")
+    
+    # 対戦ループ（JankenBattle）から呼ばれるインターフェース
+    choose = get_next_hand
+    
+    def seed(self, seed):
+        """乱数生成器をシードで初期化し直す（JankenBattle はマスターシードから導出した値を渡す）"""
+        self.rng = reseed_rng(self.rng, seed)
+        self._random_hand = hand_chooser(self.rng)
+    
+    def observe(self, own, opp, outcome):
+        """ラウンドの結果を受け取り、次の手のシーケンスを更新
+        
+        Args:
+            own: 自分の手（整数コード）
+            opp: 相手の手（整数コード）
+            outcome: 自分から見た勝敗コード
+        """
+        self.last_hand = own
+        # 表の (own, outcome) の行の先頭に移動するだけで、リストは作らない
+        length = self._lengths[outcome]
+        if length:
+            pos = (own * 3 + outcome) * self._stride
+            self._pos = pos
+            self._end = pos + length
         else:
-            self.sequence = []
+            self._pos = self._end = 0
+    
+    def get_history_info(self):
+        """現在の状態を取得（デバッグ用）"""
+        return {
+            'sequence_length': len(self.sequence),
+        }
+    
+    def to_snapshot(self):
+        """状態をスナップショット（bytes）に変換"""
+        last_hand = -1 if self.last_hand is None else int(self.last_hand)
+        return (pack_header(KIND_PATTERN)
+                + _SNAPSHOT_BODY.pack(last_hand, len(self.sequence))
+                + bytes(self.sequence))
+    
+    @classmethod
+    def from_snapshot(cls, data, patterns=None):
+        """スナップショットから状態を復元
+        
+        Args:
+            data: スナップショット
+            patterns: 手のシーケンスのパターン（保存したときと同じものを指定する）
+        """
+        unpack_header(data, KIND_PATTERN)  # 本体はどのバージョンでも同じ
+        if len(data) < HEADER.size + _SNAPSHOT_BODY.size:
+            raise ValueError("スナップショットが短すぎます")
+        last_hand, length = _SNAPSHOT_BODY.unpack_from(data, HEADER.size)
+        sequence = data[HEADER.size + _SNAPSHOT_BODY.size:]
+        if len(sequence) != length or any(hand > 2 for hand in sequence):
+            raise ValueError("スナップショットのシーケンスが不正です")
+        
+        ai = cls(patterns=patterns)
+        ai.last_hand = None if last_hand < 0 else HANDS[last_hand]
+        ai.sequence = [HANDS[hand] for hand in sequence]
+        return ai
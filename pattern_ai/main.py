@@ -1,3 +1,5 @@
+from janken_core.hands import INPUT_TO_HAND, OUTCOME, WIN, LOSE, hand_label
+
 from .janken_ai import PatternJankenAI
 
 def get_user_hand():
@@ -15,25 +17,19 @@ def get_user_hand():
             return None
             
         if user_input in ['1', '2', '3']:
-            ai = PatternJankenAI()  # インスタンスを作成してマッピングにアクセス
-            return ai.input_to_hand[user_input]
+            return INPUT_TO_HAND[user_input]
         else:
             print("無効な入力です。1から3の数字を入力するか、qで終了してください。")
 
 def judge(ai_hand, user_hand):
     """勝敗を判定"""
-    # 絵文字を除いた部分で比較
-    ai_hand_plain = ai_hand.split()[-1]
-    user_hand_plain = user_hand.split()[-1]
-    
-    if ai_hand_plain == user_hand_plain:
-        return 'draw'
-    elif (ai_hand_plain == 'グー' and user_hand_plain == 'チョキ') or \
-         (ai_hand_plain == 'チョキ' and user_hand_plain == 'パー') or \
-         (ai_hand_plain == 'パー' and user_hand_plain == 'グー'):
+    outcome = OUTCOME[ai_hand][user_hand]
+    if outcome == WIN:
         return 'win'
-    else:
+    elif outcome == LOSE:
         return 'lose'
+    else:
+        return 'draw'
 
 def main():
     print("🎮 パターン認識じゃんけんAI スタート！")
@@ -55,8 +51,8 @@ def main():
         result = judge(ai_hand, user_hand)
         
         # 結果を表示
-        print(f"\nあなた: {user_hand}")
-        print(f"AI: {ai_hand}")
+        print(f"\nあなた: {hand_label(user_hand)}")
+        print(f"AI: {hand_label(ai_hand)}")
         
         if result == 'win':
             print("結果: 🤖 AIの勝ち")
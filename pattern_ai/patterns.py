@@ -0,0 +1,92 @@
+"""パターンAIの手のシーケンスと、状態遷移の表
+
+パターンAIは、前回の自分の手（last_hand）と勝敗（result）から決まるシーケンスに従って手を出す。
+シーケンスは前回の手からのずれ（0: 同じ手, 1: 次の手, 2: 2つ先の手）で指定し、
+(last_hand, result, step) -> 次の手 の表を一度だけ作って、同じパターンのAIで共有する。
+
+    default  勝ったら 1, 2, 0（グー → チョキ → パー → グー）、負けたら 2, 1, 0、引き分けならランダム
+
+独自のパターンは register_pattern で登録するか、設定（JSON など）から
+{'win': '120', 'lose': [2, 1, 0], 'draw': ''} のような辞書で直接渡せる。
+"""
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Tuple, Union
+
+from janken_core.hands import HANDS
+
+# 勝敗コードの順番（DRAW=0, WIN=1, LOSE=2）に並べた結果の名前
+RESULT_NAMES = ('draw', 'win', 'lose')
+RESULT_CODES = {name: code for code, name in enumerate(RESULT_NAMES)}
+
+# 勝敗コードごとの前回の手からのずれのシーケンス
+PatternSpec = Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...]]
+
+_PATTERNS: Dict[str, PatternSpec] = {
+    'default': ((), (1, 2, 0), (2, 1, 0)),
+}
+
+
+class PatternTable(NamedTuple):
+    """(last_hand, result, step) -> 次の手 の表（同じパターンのAIで共有する）"""
+    # 1つの (last_hand, result) に割り当てる表の幅（最も長いシーケンスの長さ）
+    stride: int
+    # hands[(last_hand * 3 + result) * stride + step] = 次の手
+    hands: Tuple[int, ...]
+    # 勝敗コードごとのシーケンスの長さ
+    lengths: Tuple[int, int, int]
+
+
+def register_pattern(name: str, patterns: Any) -> None:
+    """パターンを名前で登録
+
+    Args:
+        name: パターンの名前
+        patterns: 結果の名前 ('win', 'lose', 'draw') -> 前回の手からのずれのシーケンス
+    """
+    _PATTERNS[name] = normalize_patterns(patterns)
+
+
+def available_patterns():
+    """登録されているパターンの名前の一覧を返す"""
+    return sorted(_PATTERNS)
+
+
+def _normalize_sequence(result: str, sequence: Any) -> Tuple[int, ...]:
+    offsets = tuple(int(offset) for offset in sequence)
+    if any(offset not in (0, 1, 2) for offset in offsets):
+        raise ValueError(f"パターン '{result}' のずれは 0, 1, 2 で指定してください: {sequence!r}")
+    return offsets
+
+
+def normalize_patterns(patterns: Union[str, Dict[str, Any], None]) -> PatternSpec:
+    """パターンの名前または辞書を、勝敗コードの順に並べたずれのタプルにする
+
+    辞書のシーケンスは '120' のような文字列か整数のリストで、省略した結果はランダムに手を選ぶ
+    """
+    if patterns is None:
+        return _PATTERNS['default']
+    if isinstance(patterns, str):
+        if patterns not in _PATTERNS:
+            raise ValueError(f"不明なパターンです: {patterns}")
+        return _PATTERNS[patterns]
+    unknown = set(patterns) - set(RESULT_NAMES)
+    if unknown:
+        raise ValueError(f"不明な結果の名前です: {', '.join(sorted(unknown))}")
+    return tuple(_normalize_sequence(result, patterns.get(result, ())) for result in RESULT_NAMES)
+
+
+@lru_cache(maxsize=None)
+def _build_table(spec: PatternSpec) -> PatternTable:
+    stride = max(1, max(len(offsets) for offsets in spec))
+    hands = [HANDS[0]] * (9 * stride)
+    for last_hand in HANDS:
+        for result, offsets in enumerate(spec):
+            start = (last_hand * 3 + result) * stride
+            for step, offset in enumerate(offsets):
+                hands[start + step] = HANDS[(last_hand + offset) % 3]
+    return PatternTable(stride, tuple(hands), tuple(len(offsets) for offsets in spec))
+
+
+def pattern_table(patterns: Union[str, Dict[str, Any], None] = None) -> PatternTable:
+    """パターンの名前または辞書から状態遷移の表を返す（同じパターンなら同じオブジェクト）"""
+    return _build_table(normalize_patterns(patterns))